@@ -0,0 +1,145 @@
+"""
+Benchmarks runner with saved baseline numbers.
+
+Timings depend on the machine, so every benchmark also times a reference
+workload right before it and the baseline keeps the ratio of the two.
+A slower or busy runner slows down both and the ratio stays comparable.
+
+Run `pytest benchmarks` to compare with `baseline.json`
+or `pytest benchmarks --save-baseline` to update it.
+"""
+import json
+import os
+import timeit
+from typing import Any, Callable
+
+import pytest
+
+from tg_fun.account import AccountContext
+from tg_fun.settings import get_settings
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+_reference_size = 2000
+
+# benchmark name: per call seconds and the ratio to the reference workload
+_results: dict[str, tuple[float, float]] = {}
+# benchmarks only reported, they have no baseline
+_informational: set[str] = set()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Benchmarks options."""
+    parser.addoption('--save-baseline', action='store_true', help='save results as the new baseline')
+    parser.addoption(
+        '--bench-tolerance',
+        type=float,
+        default=2.0,
+        help='fail when slower than baseline by this factor relative to the reference workload',
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Save baseline if requested."""
+    if not session.config.getoption('--save-baseline') or not _results:
+        return
+
+    baseline = _load_baseline()
+    baseline.update({name: ratio for name, (_, ratio) in _results.items()})
+    for name in _informational:
+        baseline.pop(name, None)
+    with open(BASELINE_PATH, 'w') as baseline_file:
+        json.dump(dict(sorted(baseline.items())), baseline_file, indent=2)
+        baseline_file.write('\n')
+
+
+def pytest_terminal_summary(terminalreporter: Any) -> None:
+    """Show per call timings."""
+    if not _results:
+        return
+
+    baseline = _load_baseline()
+    terminalreporter.section('benchmarks (per call, x reference workload)')
+    for name, (per_call, ratio) in _results.items():
+        expected = baseline.get(name)
+        compare = f', baseline {expected:.3f}x' if expected else ''
+        if name in _informational:
+            compare = ', informational'
+        terminalreporter.write_line(f'{name}: {per_call * 1e6:.2f} us, {ratio:.3f}x{compare}')
+
+
+@pytest.fixture()
+def bench(request: pytest.FixtureRequest) -> Callable[..., float]:
+    """Measure best per call time and check its ratio to the reference workload against the baseline."""
+    def run(  # noqa: WPS430
+        func: Callable[[], Any],
+        number: int = 200,
+        repeat: int = 5,
+        reference: Callable[[], Any] = reference_workload,
+        informational: bool = False,
+    ) -> float:
+        # warm up, then time the reference in chunks of the same duration,
+        # so both are interrupted alike by other processes on a busy runner
+        chunk_seconds = timeit.timeit(func, number=number)
+        reference_number = max(1, round(chunk_seconds / timeit.timeit(reference, number=1)))
+        per_call, reference_per_call = _interleaved_best(
+            (func, number),
+            (reference, reference_number),
+            repeat=repeat,
+        )
+        ratio = per_call / reference_per_call
+        _results[request.node.name] = (per_call, ratio)
+        if informational:
+            _informational.add(request.node.name)
+            return per_call
+
+        expected = _load_baseline().get(request.node.name)
+        if expected and not request.config.getoption('--save-baseline'):
+            tolerance = request.config.getoption('--bench-tolerance')
+            assert ratio <= expected * tolerance, 'regression: {0:.3f}x reference workload, baseline {1:.3f}x'.format(
+                ratio,
+                expected,
+            )
+        return per_call
+
+    return run
+
+
+def reference_workload() -> None:
+    """Fixed pure Python work, the unit of benchmark timings."""
+    sorted(str(number) for number in range(_reference_size))
+
+
+class NullClient:
+    """Client without network calls."""
+
+    async def send_message(self, *args: Any, **kwargs: Any) -> None:
+        """Skip sending."""
+
+    async def get_input_entity(self, peer: Any) -> Any:
+        """Peer is used as is."""
+        return peer
+
+
+@pytest.fixture()
+def account(monkeypatch: pytest.MonkeyPatch) -> AccountContext:
+    """Benchmark account in fast mode without send throttling."""
+    app_settings = get_settings()
+    monkeypatch.setattr(app_settings, 'fast_mode', True)
+    monkeypatch.setattr(app_settings, 'send_rate_per_second', 1e9)
+    return AccountContext(session='benchmark', client=NullClient(), settings=app_settings)
+
+
+def _interleaved_best(*timed: tuple[Callable[[], Any], int], repeat: int) -> list[float]:
+    best = [float('inf')] * len(timed)
+    for _ in range(repeat):
+        for index, (func, number) in enumerate(timed):
+            best[index] = min(best[index], timeit.timeit(func, number=number) / number)
+    return best
+
+
+def _load_baseline() -> dict[str, float]:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as baseline_file:
+        return json.load(baseline_file)
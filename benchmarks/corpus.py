@@ -0,0 +1,64 @@
+"""Recorded game messages corpus with lightweight event stubs."""
+from types import SimpleNamespace
+from typing import Any
+
+TOWN_KEYBOARD = [['💖 Лечиться', '☠ Локации'], ['♟ Данжи', '🎒 Инвентарь']]
+LOCATIONS_KEYBOARD = [['🐣 Тихий лес', '🏛 В город']]
+FIGHT_ZONE_KEYBOARD = [['🐺 Искать монстра', '🔪 Атаковать'], ['🏛 В город']]
+DANGEON_KEYBOARD = [['♟ Вперед', '🏛 В город']]
+APPROVE_KEYBOARD = [['✅Да', '❌Нет']]
+CAPCHA_KEYBOARD = [['🍎', '🍌', '🍒'], ['🍇', '🍉', '🍋']]
+
+MATCHED_MESSAGES: list[tuple[str, list[list[str]] | None]] = [
+    ('Держи кнопочки!\nВыбери действие.', TOWN_KEYBOARD),
+    ('Пора в бой!\nВыбери локацию для охоты.', LOCATIONS_KEYBOARD),
+    ('Ты наткнулся на 🐺Волк (ур. 12)\n❤120/120 🔋14/20', FIGHT_ZONE_KEYBOARD),
+    ('На пути у вас встретился 🐗Кабан (ур. 13)\n❤98/120 🔋13/20', FIGHT_ZONE_KEYBOARD),
+    ('Вы ещё не нашли монстра, продолжайте поиски.\n❤98/120 🔋13/20', FIGHT_ZONE_KEYBOARD),
+    ('Ты одержал победу над 🐺Волк!\nПолучено: 35 опыта, 12 золота.\n❤76/120 🔋12/20', FIGHT_ZONE_KEYBOARD),
+    ('Ты дошел до локации 🏛Город.\nЗдесь можно отдохнуть и подлечиться.', TOWN_KEYBOARD),
+    ('Ты снова жив! Береги себя.\n❤120/120 🔋10/20', TOWN_KEYBOARD),
+    ('Здоровье пополнено.\n❤120/120', TOWN_KEYBOARD),
+    ('Вперед на встречу с монстрами!', DANGEON_KEYBOARD),
+    ('Какой данж запустим?\n/go_dange_10000 - Пещера', None),
+    ('Ты уверен что хочешь попробовать пройти данж?', APPROVE_KEYBOARD),
+    ('Поздравляем! Вы успешно прошли данж 🕳Пещера.', TOWN_KEYBOARD),
+    ('Прежде чем выполнять какие-то действия в игре, выбери фрукт 🍒', CAPCHA_KEYBOARD),
+    ('Недостаточно энергии для атаки.\n🔋0/20', FIGHT_ZONE_KEYBOARD),
+    ('+1 к энергии 🔋1/20', None),
+    ('К сожалению ты умер. Ты воскреснешь в 🏛Город через 5 минут.', None),
+]
+
+# nothing is matched here, so every state is checked and skip_turn_handler is chosen
+UNMATCHED_MESSAGES: list[tuple[str, list[list[str]] | None]] = [
+    (' '.join(['Торговец предлагает редкие товары за золото и рубины.'] * 20), None),
+    ('Рейтинг игроков обновлён. Загляни в таблицу лидеров!', TOWN_KEYBOARD),
+    ('Твой персонаж:\n❤120/120 🔋20/20\n' + '\n'.join(['⚔ Атака: 42, 🛡 Защита: 37'] * 30), FIGHT_ZONE_KEYBOARD),
+]
+
+MESSAGES = MATCHED_MESSAGES + UNMATCHED_MESSAGES
+
+
+def make_event(message: str, keyboard: list[list[str]] | None, message_id: int = 1) -> Any:
+    """Build event stub with the same attributes used by the handlers."""
+    buttons = None
+    if keyboard:
+        buttons = [
+            [SimpleNamespace(text=button_text, click=_click) for button_text in row]
+            for row in keyboard
+        ]
+    return SimpleNamespace(
+        message=SimpleNamespace(id=message_id, message=message, buttons=buttons, media=None),
+    )
+
+
+async def _click() -> None:
+    """Click without network calls."""
+
+
+def make_events(messages: list[tuple[str, list[list[str]] | None]] = MESSAGES) -> list[Any]:
+    """Build events for corpus messages."""
+    return [
+        make_event(message, keyboard, message_id)
+        for message_id, (message, keyboard) in enumerate(messages, start=1)
+    ]
@@ -0,0 +1,39 @@
+"""
+Show the slowest imports of a module in a fresh interpreter.
+
+Usage: python -m benchmarks.importtime [module] [--top N]
+"""
+import argparse
+import subprocess
+import sys
+
+
+def main() -> None:
+    """Run `python -X importtime` and print the slowest cumulative imports."""
+    parser = argparse.ArgumentParser(description='Slowest imports of the module.')
+    parser.add_argument('module', nargs='?', default='tg_fun.cli')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {args.module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        imports.append((int(cumulative), name.strip()))
+
+    total = next(cumulative for cumulative, name in reversed(imports) if name == args.module)
+    print(f'{args.module}: {total / 1000:.1f} ms')
+    for cumulative, name in sorted(imports, reverse=True)[:args.top]:
+        print(f'{cumulative / 1000:8.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main()
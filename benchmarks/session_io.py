@@ -0,0 +1,109 @@
+"""
+Compare disk writes of telegram session storages during an hour of farming.
+
+Telethon saves the session every minute with the update state and
+processes entities of every update. The hour is simulated, write
+syscalls and bytes are read from `/proc/self/io` (Linux only).
+
+Usage: python -m benchmarks.session_io [--events-per-minute N] [--flush-seconds S]
+"""
+import argparse
+import datetime
+import os
+import tempfile
+from types import SimpleNamespace
+from typing import Callable
+from unittest import mock
+
+from telethon.crypto import AuthKey
+from telethon.sessions import Session, SQLiteSession
+from telethon.tl import types
+
+from tg_fun import sessions
+
+_minutes = 60
+_new_user_every_minutes = 10
+
+
+class SimulatedClock:
+    """Monotonic clock moved by the simulation."""
+
+    def __init__(self) -> None:
+        """Start at zero."""
+        self.now = float(0)
+
+    def monotonic(self) -> float:
+        """Simulated seconds."""
+        return self.now
+
+
+def farm_hour(session: Session, clock: SimulatedClock, events_per_minute: int) -> None:
+    """Feed the session like telethon does for a busy game chat."""
+    me = types.User(id=1, access_hash=11, first_name='me', username='me')
+    bot = types.User(id=2, access_hash=22, first_name='game bot', username='game_bot', bot=True)
+    users = [me, bot]
+    pts = 0
+    for minute in range(_minutes):
+        if minute % _new_user_every_minutes == 0:
+            user_id = len(users) + 1
+            users.append(types.User(id=user_id, access_hash=user_id * 11, first_name=f'player {user_id}'))
+        for _ in range(events_per_minute):
+            pts += 1
+            session.process_entities(SimpleNamespace(users=users, chats=[]))
+        clock.now = (minute + 1) * 60
+        session.set_update_state(0, types.updates.State(pts, 0, datetime.datetime.now(datetime.timezone.utc), 1, 0))
+        session.save()
+    session.close()
+
+
+def write_counters() -> tuple[int, int]:
+    """Write syscalls and written bytes of this process."""
+    with open('/proc/self/io') as io_file:
+        counters = dict(line.split(': ') for line in io_file.read().splitlines())
+    return int(counters['syscw']), int(counters['wchar'])
+
+
+def measure(name: str, create: Callable[[], Session], clock: SimulatedClock, events_per_minute: int) -> None:
+    """Run the hour and print writes."""
+    clock.now = 0
+    session = create()
+    syscalls, written = write_counters()
+    farm_hour(session, clock, events_per_minute)
+    syscalls_after, written_after = write_counters()
+    print(f'{name:>7}: {syscalls_after - syscalls:6d} write calls, {(written_after - written) / 1024:8.1f} KiB per hour')
+
+
+def main() -> None:
+    """Run the hour for both storages."""
+    parser = argparse.ArgumentParser(description='Session storage disk writes per hour.')
+    parser.add_argument('--events-per-minute', type=int, default=30)
+    parser.add_argument('--flush-seconds', type=float, default=5 * 60)
+    args = parser.parse_args()
+
+    clock = SimulatedClock()
+    with tempfile.TemporaryDirectory() as directory, mock.patch.object(sessions, 'time', clock):
+        sqlite_path = os.path.join(directory, 'sqlite')
+        memory_path = os.path.join(directory, 'memory')
+
+        def create_sqlite() -> SQLiteSession:
+            session = SQLiteSession(sqlite_path)
+            session.set_dc(2, '149.154.167.51', 443)
+            session.auth_key = AuthKey(os.urandom(256))
+            session.save()
+            return session
+
+        def create_memory() -> sessions.FlushingMemorySession:
+            session = sessions.FlushingMemorySession(memory_path, args.flush_seconds)
+            session.set_dc(2, '149.154.167.51', 443)
+            session.auth_key = AuthKey(os.urandom(256))
+            return session
+
+        measure('sqlite', create_sqlite, clock, args.events_per_minute)
+        measure('memory', create_memory, clock, args.events_per_minute)
+
+        restored = sessions.FlushingMemorySession(memory_path, args.flush_seconds)
+        print(f'memory session restored with {len(restored._entities)} entities')  # noqa: WPS437
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare the compiled state classifier with the linear predicates chain.
+
+Usage: python -m benchmarks.state_classifier
+"""
+import timeit
+from typing import Any
+
+from benchmarks.corpus import make_events
+from tg_fun.game.parsers import EventView
+from tg_fun.game.state.classifier import StatePredicate
+from tg_fun.trainer import farming
+
+_ROUNDS = 2000
+
+
+def _classify_by_chain(event: Any) -> StatePredicate | None:
+    view = EventView(event)
+    for check_function, _ in farming._states_mapping:  # noqa: WPS437
+        if check_function(view):
+            return check_function
+    return None
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    events = make_events()
+    classifier = farming._state_classifier  # noqa: WPS437
+
+    for event in events:
+        if classifier.classify(EventView(event)) is not _classify_by_chain(event):
+            raise RuntimeError('Classifier mismatch for "{0}"'.format(event.message.message))
+
+    chain_time = timeit.timeit(lambda: [_classify_by_chain(event) for event in events], number=_ROUNDS)
+    compiled_time = timeit.timeit(lambda: [classifier.classify(EventView(event)) for event in events], number=_ROUNDS)
+    events_count = len(events) * _ROUNDS
+
+    print(f'events: {events_count}')
+    print(f'predicates chain: {chain_time / events_count * 1e6:.2f} us per event')
+    print(f'compiled classifier: {compiled_time / events_count * 1e6:.2f} us per event')
+    print(f'speedup: {chain_time / compiled_time:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
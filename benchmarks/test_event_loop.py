@@ -0,0 +1,39 @@
+"""Event hot path on the default asyncio and uvloop event loops."""
+import asyncio
+
+import pytest
+
+from benchmarks.corpus import make_events
+from tg_fun.trainer import farming
+
+_events = make_events()
+
+
+@pytest.fixture(params=['asyncio', 'uvloop'])
+def event_loop_factory(request):
+    """Event loop factory, uvloop tests are skipped if it is not installed."""
+    if request.param == 'uvloop':
+        uvloop = pytest.importorskip('uvloop')
+        return uvloop.new_event_loop
+    return asyncio.new_event_loop
+
+
+def test_message_handler(bench, account, event_loop_factory):
+    with asyncio.Runner(loop_factory=event_loop_factory) as runner:
+        # handlers only queue actions, the queue worker runs them on the measured loop
+        runner.run(_start_actions(account))
+
+        async def handle_all():
+            for event in _events:
+                # new message ids, the deduplicator must not skip repeated runs
+                event.message.id += len(_events)
+                await farming._message_handler(account, event)  # noqa: WPS437
+                # the worker runs the queued action until it waits, e.g. for energy
+                await asyncio.sleep(0)
+
+        bench(lambda: runner.run(handle_all()), number=50)
+        account.actions.stop()
+
+
+async def _start_actions(account):
+    account.actions.start()
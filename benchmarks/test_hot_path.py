@@ -0,0 +1,78 @@
+"""Per event hot path benchmarks."""
+import asyncio
+
+import pytest
+
+from benchmarks.corpus import MESSAGES, UNMATCHED_MESSAGES, make_events
+from tg_fun.game import buttons, parsers
+from tg_fun.game.parsers import EventView
+from tg_fun.game.state import common_states
+from tg_fun.trainer import farming
+from tg_fun.trainer.handlers import common
+from tg_fun.trainer.handlers import farming as farming_handlers
+
+_events = make_events()
+_unmatched_events = make_events(UNMATCHED_MESSAGES)
+_views_with_levels = [
+    view
+    for view in map(EventView, _events)
+    if view.hp and view.energy
+]
+
+
+def test_strip_message(bench):
+    messages = [message for message, _ in MESSAGES]
+
+    bench(lambda: [parsers.strip_message(message) for message in messages])
+
+
+def test_get_hp_level(bench):
+    bench(lambda: [parsers.get_hp_level(EventView(view.event)) for view in _views_with_levels])
+
+
+def test_get_energy_level(bench):
+    bench(lambda: [parsers.get_energy_level(EventView(view.event)) for view in _views_with_levels])
+
+
+@pytest.mark.parametrize('predicate', common_states.PATTERNS, ids=lambda predicate: predicate.__name__)
+def test_state_predicate(bench, predicate):
+    bench(lambda: [predicate(EventView(event)) for event in _events])
+
+
+def test_get_buttons_flat(bench):
+    bench(lambda: [buttons.get_buttons_flat(event) for event in _events])
+
+
+def test_update_available_buttons(bench, account):
+    views = [EventView(event) for event in _events]
+    loop = asyncio.new_event_loop()
+
+    async def update_all():
+        for view in views:
+            await farming_handlers.update_available_buttons(account, view, 'fight_zone_buttons')
+
+    bench(lambda: loop.run_until_complete(update_all()), number=50)
+    loop.close()
+
+
+def test_handle_button_event(bench, account):
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(farming_handlers.update_available_buttons(account, EventView(_events[2]), 'fight_zone_buttons'))
+
+    async def press_all():
+        for symbol in ('🐺', '🔪', '🏛', '💖'):
+            await farming_handlers.handle_button_event(account, symbol, 'fight_zone_buttons')
+
+    bench(lambda: loop.run_until_complete(press_all()), number=50)
+    loop.close()
+
+
+def test_select_action_by_event(bench):
+    bench(lambda: [farming._select_action_by_event(EventView(event)) for event in _events])
+
+
+def test_select_action_by_event_unmatched(bench):
+    for event in _unmatched_events:
+        assert farming._select_action_by_event(EventView(event)) is common.skip_turn_handler
+
+    bench(lambda: [farming._select_action_by_event(EventView(event)) for event in _unmatched_events])
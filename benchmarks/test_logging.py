@@ -0,0 +1,71 @@
+"""Per event logging cost on the event loop thread."""
+import asyncio
+import logging
+import os
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+
+import pytest
+
+from benchmarks.corpus import make_events
+from tg_fun.game.parsers import EventView
+from tg_fun.log_config import TEXT_FORMAT, DeferredQueueHandler, JsonFormatter, skip_unused_record_fields
+from tg_fun.trainer import event_logging
+
+_views = [EventView(event) for event in make_events()]
+_record_options = ('_srcfile', 'logThreads', 'logProcesses', 'logMultiprocessing', 'logAsyncioTasks')
+
+
+@pytest.fixture(params=['sync_text', 'queue_text', 'queue_json'])
+def log_handler(request):
+    """Handler writing to /dev/null in the given mode."""
+    stream = open(os.devnull, 'w')  # noqa: WPS515
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter() if request.param.endswith('json') else logging.Formatter(TEXT_FORMAT))
+    listener = None
+    record_options = {name: getattr(logging, name, None) for name in _record_options}
+    if request.param.startswith('queue'):
+        # the listener drains records after the measurement, only the loop thread cost is measured
+        records: SimpleQueue = SimpleQueue()
+        listener = QueueListener(records, handler)
+        handler = DeferredQueueHandler(records)
+        skip_unused_record_fields()
+
+    root = logging.getLogger()
+    previous_handlers, previous_level = root.handlers[:], root.level
+    root.setLevel(logging.INFO)
+    yield handler
+    root.handlers = previous_handlers
+    root.setLevel(previous_level)
+    for name, option_value in record_options.items():
+        setattr(logging, name, option_value)
+    if listener:
+        listener.start()
+        listener.stop()
+    stream.close()
+
+
+def test_log_event_information(bench, account, log_handler):
+    # pytest capture handlers are added for the test call, measure ours only
+    logging.getLogger().handlers = [log_handler]
+    loop = asyncio.new_event_loop()
+
+    async def log_all():
+        for view in _views:
+            await event_logging.log_event_information(account, view, 'is_monster_found')
+
+    bench(lambda: loop.run_until_complete(log_all()), number=50)
+    loop.close()
+
+
+def test_log_event_information_sampled(bench, account, log_handler, monkeypatch):
+    monkeypatch.setattr(account.settings, 'event_log_sample_every', 10)
+    logging.getLogger().handlers = [log_handler]
+    loop = asyncio.new_event_loop()
+
+    async def log_all():
+        for view in _views:
+            await event_logging.log_event_information(account, view, 'is_monster_found')
+
+    bench(lambda: loop.run_until_complete(log_all()), number=50)
+    loop.close()
@@ -0,0 +1,54 @@
+"""Captcha image download and encoding benchmarks."""
+import asyncio
+import os
+from types import SimpleNamespace
+
+from tg_fun.game import parsers
+from tg_fun.game.parsers import EventView
+from tg_fun.media import MediaCache
+from tg_fun.stats import StatsCollector
+
+_image = os.urandom(120 * 1024)
+_chunk_size = 128 * 1024
+
+
+class PhotoMessage:
+    """Message with photo downloaded by chunks like telethon does."""
+
+    def __init__(self, photo_id: int) -> None:
+        """Create message with the photo id."""
+        self.photo = SimpleNamespace(id=photo_id)
+        self.document = None
+
+    async def download_media(self, file, thumb=None):
+        """Write image into the file."""
+        for start in range(0, len(_image), _chunk_size):
+            file.write(_image[start:start + _chunk_size])
+        return file
+
+
+def test_get_photo_base64_download(bench):
+    loop = asyncio.new_event_loop()
+    views = [EventView(SimpleNamespace(message=PhotoMessage(photo_id))) for photo_id in range(10)]
+
+    async def download_all():
+        media = MediaCache(StatsCollector(), max_items=len(views))
+        for view in views:
+            await parsers.get_photo_base64(view, media)
+
+    bench(lambda: loop.run_until_complete(download_all()), number=20)
+    loop.close()
+
+
+def test_get_photo_base64_cached(bench):
+    loop = asyncio.new_event_loop()
+    view = EventView(SimpleNamespace(message=PhotoMessage(1)))
+    media = MediaCache(StatsCollector(), max_items=1)
+    loop.run_until_complete(parsers.get_photo_base64(view, media))
+
+    async def get_cached():
+        for _ in range(10):
+            await parsers.get_photo_base64(view, media)
+
+    bench(lambda: loop.run_until_complete(get_cached()), number=20)
+    loop.close()
@@ -0,0 +1,38 @@
+"""
+Cold start benchmarks, every import runs in a fresh interpreter.
+
+The reference is a bare interpreter start, so the ratio is the import cost.
+It depends on the interpreter and the disk cache more than on the code, so
+the numbers are only reported, use `python -m benchmarks.importtime` to
+find a slow import.
+"""
+import subprocess
+import sys
+
+import pytest
+
+
+def _python(code: str) -> None:
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+@pytest.mark.parametrize('module', [
+    'tg_fun.cli',
+    'tg_fun.settings',
+    'tg_fun.trainer.farming',
+])
+def test_import(bench, module):
+    bench(lambda: _python(f'import {module}'), number=1, reference=_bare_start, informational=True)
+
+
+def test_settings_construction(bench):
+    bench(
+        lambda: _python('from tg_fun.settings import get_settings; get_settings()'),
+        number=1,
+        reference=_bare_start,
+        informational=True,
+    )
+
+
+def _bare_start() -> None:
+    _python('pass')
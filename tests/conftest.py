@@ -1,9 +1,68 @@
 import asyncio
+from types import SimpleNamespace
 
 import pytest
 
+from tg_fun import settings, wait_utils
+from tg_fun.account import AccountContext
+from tg_fun.settings import AppSettings
+from tg_fun.simulator import runner
+from tg_fun.trainer import farming, replay
+
+# modules reading the global settings
+_settings_readers = (settings, wait_utils, farming, replay, runner)
+
+
+class FakeClient:
+    """Telegram client recording requests instead of sending."""
+
+    def __init__(self):
+        self.sent = []
+        self.read_acknowledges = []
+        self.errors = []
+
+    async def send_message(self, entity, message='', **kwargs):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((entity, message))
+        return SimpleNamespace(message=message)
+
+    async def get_input_entity(self, peer):
+        return SimpleNamespace(user_id=abs(hash(peer)), peer=peer)
+
+    async def get_entity(self, peer):
+        return await self.get_input_entity(peer)
+
+    async def send_read_acknowledge(self, entity, max_id=None):
+        self.read_acknowledges.append(max_id)
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     loop = asyncio.get_event_loop()
     yield loop
     loop.close()
+
+
+@pytest.fixture()
+def app_settings(monkeypatch):
+    """Defaults in fast mode, the local `.env` and environment are ignored."""
+    for name in AppSettings.model_fields:
+        monkeypatch.delenv(name.upper(), raising=False)
+    app_settings = AppSettings(_env_file=None, fast_mode=True, notifications_enabled=False)
+    for module in _settings_readers:
+        monkeypatch.setattr(module, 'get_settings', lambda: app_settings)
+    return app_settings
+
+
+@pytest.fixture()
+def client():
+    return FakeClient()
+
+
+@pytest.fixture()
+async def account(app_settings, client):
+    account = AccountContext(session='test', client=client, settings=app_settings)
+    yield account
+    account.actions.stop()
+    account.energy.cancel()
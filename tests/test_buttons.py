@@ -0,0 +1,51 @@
+from tg_fun.game.buttons import ATTACK, FIND_MONSTER, TO_TOWN, ButtonRegistry
+
+_fight_zone = ['🐺 Искать монстра', '🔪 Атаковать', '🏛 В город']
+_town = ['💖 Лечиться', '☠ Локации']
+
+
+def test_find_button_of_shown_keyboard():
+    registry = ButtonRegistry()
+    registry.update('fight_zone_buttons', 1, _fight_zone)
+
+    assert registry.find('fight_zone_buttons', ATTACK) == '🔪 Атаковать'
+    assert registry.find('fight_zone_buttons', TO_TOWN) == '🏛 В город'
+    assert registry.find('town_buttons', ATTACK) is None
+
+
+def test_update_replaces_category():
+    registry = ButtonRegistry()
+    registry.update('fight_zone_buttons', 1, _fight_zone)
+    registry.update('fight_zone_buttons', 2, ['🐺 Искать монстра', '🏛 В город'])
+
+    assert registry.find('fight_zone_buttons', ATTACK) is None
+    assert registry.find('fight_zone_buttons', FIND_MONSTER) == '🐺 Искать монстра'
+
+
+def test_skip_buttons_of_replaced_keyboard():
+    registry = ButtonRegistry()
+    registry.update('fight_zone_buttons', 1, _fight_zone)
+    registry.observe(2, _town)
+
+    assert registry.find('fight_zone_buttons', ATTACK) is None
+
+
+def test_ignore_older_keyboard():
+    registry = ButtonRegistry()
+    registry.update('fight_zone_buttons', 2, _fight_zone)
+    registry.observe(1, _town)
+
+    assert registry.find('fight_zone_buttons', ATTACK) == '🔪 Атаковать'
+
+
+def test_dump_restore():
+    registry = ButtonRegistry()
+    registry.update('town_buttons', 1, _town)
+    registry.update('fight_zone_buttons', 2, _fight_zone)
+
+    restored = ButtonRegistry()
+    restored.restore(registry.dump())
+
+    assert restored.dump() == registry.dump()
+    assert restored.find('fight_zone_buttons', ATTACK) == '🔪 Атаковать'
+    assert restored.find('town_buttons', '💖') is None
@@ -0,0 +1,57 @@
+import base64
+import io
+import logging
+
+import pytest
+
+from tg_fun import captcha
+from tg_fun.captcha import CaptchaSolver, CaptchaTask, LibrarySolver
+
+
+@pytest.fixture()
+def library_dir(tmp_path):
+    answer_dir = tmp_path / 'Кот'
+    answer_dir.mkdir()
+    (answer_dir / 'cat.jpg').write_bytes(b'cat image')
+    (tmp_path / captcha.UNSOLVED_DIR).mkdir()
+    return tmp_path
+
+
+def _task(image_bytes):
+    return CaptchaTask('Кто на картинке?', base64.b64encode(image_bytes).decode(), ('🐶 Пёс', '🐱 Кот'))
+
+
+def test_solve_exact_library_image(library_dir):
+    answer = LibrarySolver(str(library_dir)).solve(_task(b'cat image'))
+
+    assert answer == captcha.CaptchaAnswer('🐱 Кот', 1)
+
+
+def test_unknown_image_is_not_solved(library_dir):
+    answer = LibrarySolver(str(library_dir)).solve(_task(b'dog image'))
+
+    assert answer.button is None
+
+
+def test_warn_once_without_pillow(library_dir, monkeypatch, caplog):
+    monkeypatch.setattr(captcha, 'Image', None)
+
+    with caplog.at_level(logging.WARNING):
+        CaptchaSolver('library', str(library_dir), 0.9, 1, 1)
+
+    assert caplog.text.count('Pillow is not installed') == 1
+
+
+def test_similar_image_by_difference_hash(tmp_path):
+    image_module = pytest.importorskip('PIL.Image')
+    answer_dir = tmp_path / 'Кот'
+    answer_dir.mkdir()
+    gradient = image_module.linear_gradient('L').rotate(90)
+    gradient.save(answer_dir / 'cat.png')
+    similar = io.BytesIO()
+    gradient.point(lambda pixel: min(pixel + 3, 255)).save(similar, format='PNG')
+
+    answer = LibrarySolver(str(tmp_path)).solve(_task(similar.getvalue()))
+
+    assert answer.button == '🐱 Кот'
+    assert answer.confidence > 0.9
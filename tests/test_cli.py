@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import sys
+
+import pytest
+
+from tg_fun import cli, loop_lag
+from tg_fun.simulator import runner
+from tg_fun.trainer import farming, loop, replay
+
+
+@pytest.fixture()
+def no_setup(monkeypatch):
+    monkeypatch.setattr(cli, '_setup', lambda: None)
+
+
+@pytest.fixture()
+def started(monkeypatch):
+    started = []
+    monkeypatch.setattr(cli, '_run', lambda main_func: started.append(main_func))
+    monkeypatch.setattr(runner, 'main', lambda: started.append(runner.main))
+    monkeypatch.setattr(replay, 'main', lambda: started.append(replay.main))
+    return started
+
+
+def test_farming_command(no_setup, started):
+    cli.farming_start()
+
+    assert started == [farming.main]
+
+
+def test_simulate_command(no_setup, started):
+    cli.simulate_start()
+
+    assert started == [runner.main]
+
+
+def test_replay_command(no_setup, started):
+    cli.replay_start()
+
+    assert started == [replay.main]
+
+
+def test_connection_error_stops_farming(no_setup, app_settings, monkeypatch):
+    stopped = []
+
+    async def main():
+        raise ConnectionError()
+
+    monkeypatch.setattr(loop, 'exit_request', lambda: stopped.append(True))
+    # the runner of the default loop would unset the loop of the other tests
+    monkeypatch.setattr(loop_lag, 'loop_factory', lambda name: asyncio.new_event_loop)
+
+    cli._run(main)
+
+    assert stopped == [True]
+
+
+def test_run_on_configured_event_loop(no_setup, app_settings, monkeypatch):
+    monkeypatch.setattr(app_settings, 'event_loop', 'uvloop')
+    created = []
+    running = []
+
+    def new_event_loop():
+        event_loop = asyncio.new_event_loop()
+        created.append(event_loop)
+        return event_loop
+
+    async def main():
+        running.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(loop_lag, 'loop_factory', lambda name: new_event_loop if name == 'uvloop' else None)
+
+    cli._run(main)
+
+    assert running == created
+
+
+def test_uvloop_factory():
+    uvloop = pytest.importorskip('uvloop')
+
+    assert loop_lag.loop_factory('uvloop') is uvloop.new_event_loop
+    assert loop_lag.loop_factory('asyncio') is None
+
+
+def test_default_loop_without_uvloop(monkeypatch, caplog):
+    monkeypatch.setitem(sys.modules, 'uvloop', None)
+
+    with caplog.at_level(logging.WARNING):
+        assert loop_lag.loop_factory('uvloop') is None
+
+    assert 'uvloop is not installed' in caplog.text
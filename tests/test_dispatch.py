@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from benchmarks.corpus import CAPCHA_KEYBOARD, make_event
+from tg_fun.game.parsers import EventView
+from tg_fun.stats import StatsCollector
+from tg_fun.trainer import farming
+from tg_fun.trainer.dispatch import ActionQueue, EventDeduplicator
+
+_empty_energy = ('Недостаточно энергии для атаки.\n🔋0/20', None)
+_capcha = ('Прежде чем выполнять какие-то действия в игре, выбери фрукт 🍒', CAPCHA_KEYBOARD)
+_energy_recovered = ('+1 к энергии 🔋1/20', None)
+
+
+def _view(message, keyboard=None, message_id=1):
+    return EventView(make_event(message, keyboard, message_id))
+
+
+def test_deduplicator_skips_same_event():
+    deduplicator = EventDeduplicator()
+
+    assert deduplicator.is_new(_view('message'))
+    assert not deduplicator.is_new(_view('message'))
+
+
+@pytest.mark.parametrize('other', [
+    _view('message', message_id=2),
+    _view('edited message'),
+    _view('message', [['button']]),
+])
+def test_deduplicator_accepts_changed_event(other):
+    deduplicator = EventDeduplicator()
+    deduplicator.is_new(_view('message'))
+
+    assert deduplicator.is_new(other)
+
+
+def test_deduplicator_accepts_buttons_moved_to_other_rows():
+    deduplicator = EventDeduplicator()
+    deduplicator.is_new(_view('message', [['first', 'second']]))
+
+    assert deduplicator.is_new(_view('message', [['first'], ['second']]))
+    assert not deduplicator.is_new(_view('message', [['first'], ['second']]))
+
+
+def test_deduplicator_forgets_oldest_events():
+    deduplicator = EventDeduplicator(max_size=2)
+    for message_id in range(1, 4):
+        deduplicator.is_new(_view('message', message_id=message_id))
+
+    assert deduplicator.is_new(_view('message', message_id=1))
+    assert not deduplicator.is_new(_view('message', message_id=3))
+
+
+async def test_action_queue_drops_stale_pending_action():
+    stats = StatsCollector()
+    queue = ActionQueue(stats, interrupt_wait=lambda: None)
+    done = []
+
+    async def action(name):
+        done.append(name)
+
+    queue.put(action, 'stale')
+    queue.put(action, 'newest')
+    queue.start()
+    await asyncio.wait_for(queue.wait_idle(), timeout=1)
+    queue.stop()
+
+    assert done == ['newest']
+    assert ('stale_actions', 1) in stats.get_counters()
+
+
+async def _deliver(account, message, keyboard, message_id):
+    await farming._message_handler(account, make_event(message, keyboard, message_id))
+    await asyncio.sleep(0)
+
+
+async def test_capcha_interrupts_energy_wait(account, monkeypatch):
+    notifications = []
+    monkeypatch.setattr(account.notifications, 'notify', lambda message, *args, **kwargs: notifications.append(message))
+    account.actions.start()
+
+    await _deliver(account, *_empty_energy, message_id=1)
+    assert account.energy.wakeup_in
+    await _deliver(account, *_capcha, message_id=2)
+
+    await asyncio.wait_for(account.actions.wait_idle(), timeout=1)
+    assert notifications == ['capcha! (test)']
+    assert ('energy_waits_cancelled', 1) in account.stats.get_counters()
+    assert not account.client.sent
+
+
+async def test_energy_recovered_continues_wait(account):
+    account.actions.start()
+
+    await _deliver(account, *_empty_energy, message_id=1)
+    await _deliver(account, *_energy_recovered, message_id=2)
+
+    await asyncio.wait_for(account.actions.wait_idle(), timeout=1)
+    assert [message for _, message in account.client.sent] == ['/buttons']
+    assert ('energy_waits_cancelled', 1) in account.stats.get_counters()
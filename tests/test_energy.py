@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from tg_fun.stats import StatsCollector
+from tg_fun.trainer import energy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = float(0)
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(energy, '_now', clock)
+    return clock
+
+
+@pytest.fixture()
+def scheduler(clock):
+    return energy.EnergyScheduler(StatsCollector(), regeneration_seconds=100)
+
+
+async def _start_waiting(scheduler, required):
+    task = asyncio.create_task(scheduler.wait_for_energy(required))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_estimate_delay_without_level(scheduler):
+    assert scheduler.estimate_delay(3) == 300
+
+
+def test_estimate_delay_from_observed_level(scheduler, clock):
+    clock.now = 10
+    scheduler.observe(2)
+    clock.now = 60
+
+    assert scheduler.estimate_delay(4) == 150
+    assert scheduler.estimate_delay(2) == 0
+
+
+async def test_learn_regeneration_while_waiting(scheduler, clock):
+    scheduler.observe(1)
+    task = await _start_waiting(scheduler, 5)
+
+    clock.now = 20
+    scheduler.observe(2)
+    scheduler.cancel()
+
+    assert scheduler.regeneration_seconds == 60
+    assert await task is False
+
+
+async def test_repeated_level_does_not_shorten_learned_interval(scheduler, clock):
+    scheduler.observe(1)
+    task = await _start_waiting(scheduler, 5)
+
+    clock.now = 15
+    scheduler.observe(1)
+    clock.now = 20
+    scheduler.observe(2)
+    scheduler.cancel()
+
+    assert scheduler.regeneration_seconds == 60
+    assert scheduler.estimate_delay(3) == 60
+    assert await task is False
+
+
+def test_no_learning_without_wait(scheduler, clock):
+    scheduler.observe(1)
+    clock.now = 20
+    scheduler.observe(2)
+
+    assert scheduler.regeneration_seconds == 100
+
+
+async def test_learn_after_scheduled_wakeup(clock):
+    scheduler = energy.EnergyScheduler(StatsCollector(), regeneration_seconds=0.01)
+    scheduler.observe(0)
+
+    assert await scheduler.wait_for_energy(1) is True
+
+    clock.now = 0.03
+    scheduler.observe(1)
+    assert scheduler.regeneration_seconds == pytest.approx(0.02)
+
+
+async def test_learn_after_too_early_wakeup(clock):
+    scheduler = energy.EnergyScheduler(StatsCollector(), regeneration_seconds=0.01)
+    scheduler.observe(0)
+
+    assert await scheduler.wait_for_energy(1) is True
+
+    clock.now = 0.03
+    scheduler.observe(0)
+    assert scheduler.regeneration_seconds == pytest.approx(0.0275)
+
+
+async def test_cancel_after_observation_before_next_wakeup(scheduler, clock):
+    scheduler.observe(0)
+    task = await _start_waiting(scheduler, 5)
+
+    scheduler.observe(1)
+    scheduler.cancel()
+
+    assert await task is False
+
+
+async def test_single_pending_wait(scheduler):
+    scheduler.observe(0)
+    task = await _start_waiting(scheduler, 1)
+
+    assert await scheduler.wait_for_energy(1) is False
+    assert scheduler.wakeup_in == 100
+
+    scheduler.cancel()
+    assert await task is False
+    assert scheduler.wakeup_in is None
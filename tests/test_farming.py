@@ -0,0 +1,80 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+from telethon.tl import types
+
+from tg_fun.account import AccountContext
+from tg_fun.trainer import farming, loop, snapshot
+from tests.conftest import FakeClient
+
+
+class FarmingClient(FakeClient):
+    """Connected client of one account."""
+
+    def __init__(self, username):
+        super().__init__()
+        self.username = username
+        self.handlers = []
+        self.disconnected = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.disconnected = True
+
+    async def get_me(self):
+        if self.username is None:
+            raise ConnectionError('auth failed')
+        return SimpleNamespace(username=self.username)
+
+    async def get_input_entity(self, peer):
+        return types.InputPeerUser(user_id=42, access_hash=4242)
+
+    def add_event_handler(self, callback, event):
+        self.handlers.append(event)
+
+
+@pytest.fixture()
+def snapshot_dir(app_settings, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_settings, 'snapshot_dir', str(tmp_path))
+    monkeypatch.setattr(app_settings, 'self_manager_enabled', False)
+    return tmp_path
+
+
+def _account(app_settings, session, username):
+    return AccountContext(session=session, client=FarmingClient(username), settings=app_settings)
+
+
+async def test_stop_failed_account(app_settings, snapshot_dir, monkeypatch):
+    account = _account(app_settings, 'failed', 'player')
+
+    async def run_wait_loop(account, execution_limit_minutes):
+        raise RuntimeError('broken loop')
+
+    monkeypatch.setattr(loop, 'run_wait_loop', run_wait_loop)
+
+    with pytest.raises(RuntimeError):
+        await farming.farm_account(account)
+
+    assert account.client.disconnected
+    assert account.actions._worker.cancelled()
+    assert snapshot.load(_account(app_settings, 'failed', 'player')) is not None
+
+
+async def test_failed_account_does_not_stop_others(app_settings, snapshot_dir, monkeypatch, caplog):
+    farmed = []
+
+    async def run_wait_loop(account, execution_limit_minutes):
+        farmed.append(account.name)
+
+    monkeypatch.setattr(loop, 'run_wait_loop', run_wait_loop)
+    accounts = [_account(app_settings, 'failed', None), _account(app_settings, 'working', 'player')]
+
+    with caplog.at_level(logging.ERROR):
+        await farming._farm_all(accounts, execution_limit_minutes=None)
+
+    assert farmed == [accounts[1].name]
+    assert [message for _, message in accounts[1].client.sent] == ['/buttons']
+    assert 'farming failed' in caplog.text
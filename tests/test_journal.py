@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.corpus import FIGHT_ZONE_KEYBOARD, make_event
+from tg_fun.trainer import farming, replay
+from tg_fun.trainer.journal import EventJournal, JournalRecord, read_completions, read_journal
+
+
+def _record(message_id, message, edited=False, received=1000.0, account='test'):
+    return JournalRecord(
+        account=account,
+        message_id=message_id,
+        edited=edited,
+        received=received,
+        message=message,
+        buttons=[['🐺 Искать монстра']],
+        inline=False,
+        media=None,
+    )
+
+
+def _write_journal(path, records):
+    with open(path, 'w', encoding='utf-8') as journal_file:
+        for record in records:
+            journal_file.write(json.dumps(record.__dict__, ensure_ascii=False) + '\n')
+
+
+async def test_journal_writes_records_in_batches(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = EventJournal(str(path), flush_seconds=0.05)
+
+    journal.record(_record(1, 'first'))
+    journal.record(_record(2, 'second'))
+    assert not path.read_text()
+
+    await asyncio.sleep(0.1)
+    assert [record.message_id for record in read_journal(str(path))] == [1, 2]
+
+    journal.record(_record(3, 'third'))
+    journal.close()
+    assert [record.message_id for record in read_journal(str(path))] == [1, 2, 3]
+
+
+async def test_journal_handled_after_queued_action(account, tmp_path, monkeypatch):
+    async def slow_action(account, view):
+        await asyncio.sleep(0.2)
+
+    monkeypatch.setattr(farming, '_select_action_by_event', lambda view: slow_action)
+    path = tmp_path / 'journal.jsonl'
+    account.journal = EventJournal(str(path), flush_seconds=0.01)
+    account.actions.start()
+
+    await farming._message_handler(account, make_event('Ты наткнулся на 🐺Волк', FIGHT_ZONE_KEYBOARD))
+    await asyncio.sleep(0.05)
+    record, = read_journal(str(path))
+    assert not list(read_completions(str(path)))
+
+    await account.actions.wait_idle()
+    account.journal.close()
+
+    assert list(read_journal(str(path))) == [record]
+    completion, = read_completions(str(path))
+    assert (completion.message_id, completion.received) == (record.message_id, record.received)
+    assert completion.handled - record.received >= 0.2
+
+
+async def test_journal_records_duplicated_events(account, tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    account.journal = EventJournal(str(path), flush_seconds=0.01)
+    event = make_event('Торговец предлагает товары', None)
+
+    await farming._message_handler(account, event)
+    await farming._message_handler(account, event)
+    account.journal.close()
+
+    assert len(list(read_journal(str(path)))) == 2
+    assert ('duplicated_events', 1) in account.stats.get_counters()
+
+
+async def test_replay_updates_edited_message(tmp_path, monkeypatch, app_settings):
+    events = []
+
+    async def message_handler(account, event):
+        events.append((event.message, event.message.message, event.edited))
+
+    monkeypatch.setattr(farming, '_message_handler', message_handler)
+    path = tmp_path / 'journal.jsonl'
+    _write_journal(path, [_record(1, 'first'), _record(1, 'first edited', edited=True), _record(2, 'second')])
+
+    await replay.replay(str(path))
+
+    (first, first_text, first_edited), (edited, edited_text, edited_flag), (second, _, _) = events
+    assert edited is first
+    assert (first_text, first_edited) == ('first', False)
+    assert (edited_text, edited_flag) == ('first edited', True)
+    assert second is not first
+
+
+async def test_replay_sends_without_throttling(tmp_path, monkeypatch, app_settings):
+    async def message_handler(account, event):
+        await account.sender.send_message(account.settings.game_username, 'reply')
+
+    monkeypatch.setattr(farming, '_message_handler', message_handler)
+    path = tmp_path / 'journal.jsonl'
+    _write_journal(path, [_record(message_id, 'message') for message_id in range(1, 11)])
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    account = await replay.replay(str(path))
+
+    assert account.client.stats['sent'] == 10
+    assert loop.time() - started < 1
+
+
+def test_replay_requires_account_of_shared_journal(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    _write_journal(path, [_record(1, 'first', account='first'), _record(1, 'second', account='second')])
+
+    with pytest.raises(SystemExit):
+        replay.main([str(path)])
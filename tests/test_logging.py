@@ -0,0 +1,59 @@
+import logging
+from queue import SimpleQueue
+
+from benchmarks.corpus import make_event
+from tg_fun.game.parsers import EventView
+from tg_fun.log_config import DeferredQueueHandler
+from tg_fun.trainer import event_logging
+
+
+def _record(msg, args):
+    return logging.LogRecord('test', logging.INFO, __file__, 1, msg, args, None)
+
+
+def _queued(record):
+    records = SimpleQueue()
+    DeferredQueueHandler(records).emit(record)
+    return records.get_nowait()
+
+
+def test_defer_formatting_of_immutable_args():
+    queued = _queued(_record('event %s %d', ('town', 3)))
+
+    assert queued.args == ('town', 3)
+    assert queued.getMessage() == 'event town 3'
+
+
+def test_format_mutable_args_at_once():
+    buttons = ['🏛 В город']
+    queued = _queued(_record('buttons %s', (buttons,)))
+    buttons.append('🔪 Атаковать')
+
+    assert queued.args is None
+    assert queued.getMessage() == "buttons ['🏛 В город']"
+
+
+def test_format_mapping_args_at_once():
+    fields = {'state': 'town'}
+    queued = _queued(_record('state %(state)s', (fields,)))
+    fields['state'] = 'fight'
+
+    assert queued.getMessage() == 'state town'
+
+
+async def test_sample_repeated_states_per_account(account, app_settings, monkeypatch, caplog):
+    monkeypatch.setattr(app_settings, 'event_log_sample_every', 2)
+    view = EventView(make_event('Держи кнопочки!', None))
+
+    with caplog.at_level(logging.INFO):
+        for _ in range(3):
+            await event_logging.log_event_information(account, view, 'is_town')
+
+    assert [record.fields['repeats'] for record in caplog.records] == [1, 3]
+    assert account.logged_state == ('is_town', 3)
+
+
+def test_defer_formatting_of_nested_immutable_args():
+    queued = _queued(_record('buttons %s', (('🏛 В город',),)))
+
+    assert queued.args == (('🏛 В город',),)
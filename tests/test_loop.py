@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from tg_fun.trainer import loop
+
+_wait_seconds = 0.05
+
+
+@pytest.fixture()
+def helper_tasks(monkeypatch):
+    started = []
+    start_background_tasks = loop._start_background_tasks
+
+    def record_tasks(account):
+        tasks = start_background_tasks(account)
+        started.extend(tasks)
+        return tasks
+
+    monkeypatch.setattr(loop, '_start_background_tasks', record_tasks)
+    monkeypatch.setattr(loop, '_has_stop_request', False)
+    return started
+
+
+@pytest.fixture()
+def stats_shown(account, monkeypatch):
+    shown = []
+
+    async def show_stats(account):
+        shown.append(account.name)
+
+    monkeypatch.setattr(loop, 'show_stats', show_stats)
+    return shown
+
+
+def _assert_stopped(account, helper_tasks):
+    assert helper_tasks
+    assert all(task.cancelled() for task in helper_tasks)
+    assert account not in loop._running_accounts
+
+
+async def _finish(account, helper_tasks):
+    await asyncio.sleep(0)
+    _assert_stopped(account, helper_tasks)
+
+
+async def test_stop_by_account_request(account, helper_tasks, stats_shown):
+    running = asyncio.create_task(loop.run_wait_loop(account, execution_limit_minutes=None))
+    await asyncio.sleep(_wait_seconds)
+    assert not running.done()
+
+    account.stop_requested.set()
+    await asyncio.wait_for(running, _wait_seconds)
+
+    await _finish(account, helper_tasks)
+    assert stats_shown == [account.name]
+
+
+async def test_stop_by_time_limit(account, helper_tasks, stats_shown):
+    execution_limit_minutes = _wait_seconds / 60
+
+    await asyncio.wait_for(loop.run_wait_loop(account, execution_limit_minutes), _wait_seconds * 10)
+
+    await _finish(account, helper_tasks)
+    assert not account.stop_requested.is_set()
+
+
+async def test_show_stats_periodically(account, helper_tasks, stats_shown, monkeypatch):
+    monkeypatch.setattr(account.settings, 'show_stats_every_seconds', _wait_seconds / 5)
+    running = asyncio.create_task(loop.run_wait_loop(account, execution_limit_minutes=None))
+    await asyncio.sleep(_wait_seconds)
+
+    account.stop_requested.set()
+    await asyncio.wait_for(running, _wait_seconds)
+    shown_count = len(stats_shown)
+    await asyncio.sleep(_wait_seconds / 2)
+
+    await _finish(account, helper_tasks)
+    assert shown_count >= 3
+    assert len(stats_shown) == shown_count
+
+
+async def test_exit_request_wakes_up_loop(account, helper_tasks, stats_shown):
+    running = asyncio.create_task(loop.run_wait_loop(account, execution_limit_minutes=None))
+    # signal handlers call it between callbacks of the running loop
+    asyncio.get_running_loop().call_later(_wait_seconds, loop.exit_request)
+
+    await asyncio.wait_for(running, _wait_seconds * 10)
+
+    await _finish(account, helper_tasks)
+    assert loop._has_stop_request
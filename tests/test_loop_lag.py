@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from tg_fun.loop_lag import LoopLagMonitor
+from tg_fun.stats import StatsCollector
+
+_interval_seconds = 0.01
+_blocked_seconds = 0.1
+
+
+@pytest.fixture()
+async def monitor():
+    monitor = LoopLagMonitor([StatsCollector()], _interval_seconds, _blocked_seconds)
+    monitor.start()
+    yield monitor
+    await monitor.close()
+
+
+def _block_loop():
+    time.sleep(_blocked_seconds * 2)
+
+
+async def test_detect_blocked_loop(monitor, caplog):
+    stats, = monitor._stats
+    await asyncio.sleep(_interval_seconds * 2)
+
+    with caplog.at_level(logging.WARNING):
+        _block_loop()
+        await asyncio.sleep(_interval_seconds * 2)
+
+    assert ('loop_blocked', 1) in stats.get_counters()
+    assert stats.histograms['loop_lag'].quantile(1) >= _blocked_seconds
+    assert 'event loop is blocked' in caplog.text
+    assert '_block_loop' in caplog.text
+
+
+async def test_short_sleeps_are_not_blocking(monitor):
+    stats, = monitor._stats
+
+    await asyncio.sleep(_interval_seconds * 5)
+
+    assert stats.histograms['loop_lag'].count >= 2
+    assert ('loop_blocked', 1) not in stats.get_counters()
+
+
+async def test_close_stops_watcher(monitor):
+    watcher = monitor._watcher
+    assert watcher.is_alive()
+
+    await monitor.close()
+
+    assert not watcher.is_alive()
+    assert monitor._sampler.cancelled()
@@ -0,0 +1,69 @@
+import base64
+from types import SimpleNamespace
+
+import pytest
+
+from tg_fun.media import DownloadBuffer, MediaCache
+from tg_fun.stats import StatsCollector
+
+
+class PhotoMessage:
+    def __init__(self, photo_id, image):
+        self.photo = SimpleNamespace(id=photo_id)
+        self.document = None
+        self.image = image
+        self.downloads = 0
+
+    async def download_media(self, file, thumb=None):
+        self.downloads += 1
+        for start in range(0, len(self.image), 3):
+            file.write(self.image[start:start + 3])
+        return file
+
+
+@pytest.fixture()
+def stats():
+    return StatsCollector()
+
+
+def test_buffer_grows_and_is_reused():
+    buffer = DownloadBuffer(size=4)
+    buffer.write(b'abc')
+    buffer.write(b'defgh')
+    with buffer.view() as downloaded:
+        assert downloaded.tobytes() == b'abcdefgh'
+
+    buffer.reset()
+    buffer.write(b'xy')
+    with buffer.view() as downloaded:
+        assert downloaded.tobytes() == b'xy'
+
+
+async def test_download_once_per_photo(stats):
+    media = MediaCache(stats, max_items=2)
+    message = PhotoMessage(1, b'captcha image')
+
+    assert await media.get_base64(message) == base64.b64encode(b'captcha image').decode()
+    assert await media.get_base64(PhotoMessage(1, b'other')) == base64.b64encode(b'captcha image').decode()
+    assert message.downloads == 1
+    assert ('media_download_bytes', len(b'captcha image')) in stats.get_counters()
+    assert ('media_cache_hits', 1) in stats.get_counters()
+
+
+async def test_evict_least_recently_used(stats):
+    media = MediaCache(stats, max_items=2)
+    messages = [PhotoMessage(photo_id, bytes([photo_id]) * 10) for photo_id in range(3)]
+    for message in messages:
+        await media.get_base64(message)
+
+    await media.get_base64(messages[0])
+
+    assert [message.downloads for message in messages] == [2, 1, 1]
+
+
+async def test_message_without_media(stats):
+    media = MediaCache(stats, max_items=2)
+    message = PhotoMessage(1, b'')
+    message.photo = None
+
+    assert await media.get_base64(message) is None
@@ -0,0 +1,47 @@
+import asyncio
+
+from tg_fun.metrics import MetricsServer, render
+
+
+def test_render_account_stats(account):
+    account.stats.inc_value('events', 3)
+    account.stats.observe_latency('send', 0.03)
+
+    lines = render([account]).splitlines()
+
+    assert lines[:2] == ['# TYPE tg_fun_events_total counter', 'tg_fun_events_total{account="test"} 3']
+    assert '# TYPE tg_fun_rate_per_hour gauge' in lines
+    assert 'tg_fun_send_latency_seconds_bucket{account="test",le="0.025"} 0' in lines
+    assert 'tg_fun_send_latency_seconds_bucket{account="test",le="0.05"} 1' in lines
+    assert 'tg_fun_send_latency_seconds_bucket{account="test",le="+Inf"} 1' in lines
+    assert 'tg_fun_send_latency_seconds_count{account="test"} 1' in lines
+
+
+def test_render_escapes_labels(account, monkeypatch):
+    monkeypatch.setattr(account, 'session', 'a"b\\c')
+    account.stats.inc_value('events')
+
+    assert 'tg_fun_events_total{account="a\\"b\\\\c"} 1' in render([account]).splitlines()
+
+
+async def _get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+    response = await reader.read()
+    writer.close()
+    return response.decode()
+
+
+async def test_serve_metrics(account):
+    account.stats.inc_value('events')
+    server = MetricsServer([account], '127.0.0.1', 0)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+
+    metrics_response = await _get(port, '/metrics?format=text')
+    not_found_response = await _get(port, '/')
+    await server.close()
+
+    assert metrics_response.startswith('HTTP/1.1 200 OK\r\n')
+    assert 'tg_fun_events_total{account="test"} 1\n' in metrics_response
+    assert not_found_response.startswith('HTTP/1.1 404 Not Found\r\n')
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from tg_fun.account import AccountContext
+from tg_fun.entities import EntityCache
+from tg_fun.notifications import NotificationQueue, Priority
+from tg_fun.sender import SendPipeline
+from tg_fun.stats import StatsCollector
+
+
+@pytest.fixture()
+def stats():
+    return StatsCollector()
+
+
+@pytest.fixture()
+async def notifications(client, stats):
+    sender = SendPipeline(client, stats, EntityCache(client, ttl_seconds=60), buckets=[], flood_wait_retries=0)
+    notifications = NotificationQueue(
+        sender,
+        stats,
+        'channel',
+        duplicate_window_seconds=60,
+        digest_every_seconds=0.05,
+    )
+    notifications.start()
+    yield notifications
+    await notifications.close()
+
+
+def _sent(client):
+    return [message for _, message in client.sent]
+
+
+async def test_merge_duplicates_inside_window(notifications, client, stats):
+    notifications.notify('capcha!')
+    notifications.notify('capcha!')
+    notifications.notify('capcha!')
+    await asyncio.sleep(0)
+
+    assert _sent(client) == ['capcha!']
+    assert ('notifications_merged', 2) in stats.get_counters()
+
+
+async def test_send_merged_count_after_window(notifications, client, monkeypatch):
+    notifications.notify('capcha!')
+    notifications.notify('capcha!')
+    monkeypatch.setattr(notifications, '_duplicate_window_seconds', 0)
+    notifications.notify('capcha!')
+    await asyncio.sleep(0)
+
+    assert _sent(client) == ['capcha!', 'capcha! (+1 more)']
+
+
+async def test_send_merged_count_when_window_ends(notifications, client, stats, monkeypatch):
+    monkeypatch.setattr(notifications, '_duplicate_window_seconds', 0.05)
+    for _ in range(3):
+        notifications.notify('capcha!')
+    await asyncio.sleep(0)
+    assert _sent(client) == ['capcha!']
+
+    await asyncio.sleep(0.2)
+
+    assert _sent(client) == ['capcha!', 'capcha! (repeated 3 times)']
+    assert ('notifications_merged', 2) in stats.get_counters()
+
+
+async def test_send_merged_count_on_close(notifications, client):
+    notifications.notify('capcha!')
+    notifications.notify('capcha!')
+
+    await notifications.close()
+
+    assert _sent(client) == ['capcha!', 'capcha! (repeated 2 times)']
+
+
+async def test_coalesce_digest_by_key(notifications, client):
+    notifications.notify('stats 1', Priority.LOW, key='stats')
+    notifications.notify('stats 2', Priority.LOW, key='stats')
+    notifications.notify('paused', Priority.LOW)
+    await asyncio.sleep(0)
+    assert not client.sent
+
+    await asyncio.sleep(0.1)
+    assert _sent(client) == ['stats 2\n\npaused']
+
+
+async def test_send_digest_on_close(notifications, client):
+    notifications.notify('stats', Priority.LOW, key='stats')
+
+    await notifications.close()
+
+    assert _sent(client) == ['stats']
+
+
+async def test_failed_notification_is_counted(notifications, client, stats):
+    client.errors = [ConnectionError()]
+
+    notifications.notify('capcha!')
+    await asyncio.sleep(0)
+
+    assert not client.sent
+    assert ('notifications_failed', 1) in stats.get_counters()
+
+
+async def test_notifications_do_not_take_game_send_budget(app_settings, client, monkeypatch):
+    monkeypatch.setattr(app_settings, 'custom_tg_channel', 'channel')
+    account = AccountContext(session='test', client=client, settings=app_settings)
+    account.notifications.start()
+
+    for number in range(app_settings.notify_burst):
+        account.notifications.notify(f'alert {number}')
+    await asyncio.sleep(0)
+    await account.notifications.close()
+
+    assert len(client.sent) == app_settings.notify_burst
+    assert account.sender.sent == 0
+    assert await account.sender.send_message(app_settings.game_username, '/buttons') < 0.01
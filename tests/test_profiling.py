@@ -0,0 +1,53 @@
+import asyncio
+import sys
+
+import pytest
+
+from tg_fun import profiling
+
+
+def test_top_self_and_total_shares():
+    profiler = profiling.SamplingProfiler()
+    profiler.stacks.update({('main', 'handle', 'parse'): 3, ('main', 'handle'): 1})
+
+    assert profiler.top(2) == [('parse', 0.75, 0.75), ('handle', 0.25, 1)]
+
+
+def test_write_folded_stacks(tmp_path):
+    profiler = profiling.SamplingProfiler()
+    profiler.stacks.update({('main', 'handle'): 2})
+    path = tmp_path / 'cpu.folded'
+
+    profiler.write_folded(str(path))
+
+    assert path.read_text(encoding='utf-8') == 'main;handle 2\n'
+
+
+@pytest.fixture()
+def memory():
+    tracker = profiling.MemoryTracker()
+    yield tracker
+    tracker.stop()
+
+
+def test_memory_snapshot_without_resource_module(memory, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    memory.snapshot(str(tmp_path / 'first.snapshot'), limit=3)
+
+    lines = memory.snapshot(str(tmp_path / 'second.snapshot'), limit=3)
+
+    assert lines[0].startswith('traced ')
+    assert 'max rss' in lines[0]
+
+
+async def test_dump_tasks(tmp_path):
+    path = tmp_path / 'tasks.txt'
+    sleeping = asyncio.create_task(asyncio.sleep(1))
+    await asyncio.sleep(0)
+
+    lines = await profiling.dump_tasks(str(path), limit=5)
+    sleeping.cancel()
+
+    assert lines[0] == '2 tasks'
+    assert '1 sleep' in lines
+    assert '--- ' in path.read_text(encoding='utf-8')
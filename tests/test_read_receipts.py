@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from telethon import errors
+
+from tg_fun.entities import EntityCache
+from tg_fun.read_receipts import ReadReceipts
+from tg_fun.stats import StatsCollector
+
+
+@pytest.fixture()
+def stats():
+    return StatsCollector()
+
+
+@pytest.fixture()
+async def receipts(client, stats):
+    receipts = ReadReceipts(
+        client,
+        stats,
+        EntityCache(client, ttl_seconds=60),
+        'game',
+        idle_seconds=0.1,
+        max_delay_seconds=0.4,
+    )
+    receipts.start()
+    yield receipts
+    await receipts.close()
+
+
+async def test_acknowledge_batch_when_idle(receipts, client):
+    for message_id in (3, 5, 4):
+        receipts.seen(message_id)
+        await asyncio.sleep(0.01)
+    assert not client.read_acknowledges
+
+    await asyncio.sleep(0.2)
+    assert client.read_acknowledges == [5]
+
+
+async def test_acknowledge_busy_chat_after_max_delay(receipts, client):
+    for message_id in range(1, 16):
+        receipts.seen(message_id)
+        await asyncio.sleep(0.04)
+
+    assert client.read_acknowledges
+    assert client.read_acknowledges[0] < 15
+
+
+async def test_acknowledge_rest_on_close(receipts, client, stats):
+    receipts.seen(7)
+
+    await receipts.close()
+
+    assert client.read_acknowledges == [7]
+    assert ('read_acknowledges', 1) in stats.get_counters()
+
+
+async def test_skip_acknowledged_messages(receipts, client):
+    receipts.seen(7)
+    await asyncio.sleep(0.2)
+    receipts.seen(6)
+    await asyncio.sleep(0.2)
+
+    assert client.read_acknowledges == [7]
+
+
+async def test_retry_failed_acknowledge(receipts, client, stats, monkeypatch):
+    send_read_acknowledge = client.send_read_acknowledge
+    failures = [errors.RPCError(request=None, message='INTERNAL')]
+
+    async def failing_read_acknowledge(entity, max_id=None):
+        if failures:
+            raise failures.pop()
+        await send_read_acknowledge(entity, max_id=max_id)
+
+    monkeypatch.setattr(client, 'send_read_acknowledge', failing_read_acknowledge)
+    receipts.seen(2)
+    await asyncio.sleep(0.2)
+    assert ('read_acknowledges_failed', 1) in stats.get_counters()
+
+    receipts.seen(3)
+    await asyncio.sleep(0.2)
+    assert client.read_acknowledges == [3]
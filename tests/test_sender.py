@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from telethon import errors
+
+from tg_fun.entities import EntityCache
+from tg_fun.sender import SendPipeline, TokenBucket
+from tg_fun.stats import StatsCollector
+
+
+def _flood_wait():
+    return errors.FloodWaitError(request=None, capture=0)
+
+
+@pytest.fixture()
+def stats():
+    return StatsCollector()
+
+
+def _pipeline(client, stats, buckets=(), flood_wait_retries=2):
+    entities = EntityCache(client, ttl_seconds=60)
+    return SendPipeline(client, stats, entities, buckets=list(buckets), flood_wait_retries=flood_wait_retries)
+
+
+async def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=50, capacity=2)
+
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() == 0
+    assert await bucket.acquire() == pytest.approx(0.02, rel=0.1)
+
+
+async def test_token_bucket_serves_waiters_in_order():
+    bucket = TokenBucket(rate=100, capacity=1)
+    served = []
+
+    async def acquire(number):
+        await bucket.acquire()
+        served.append(number)
+
+    await asyncio.gather(*(acquire(number) for number in range(5)))
+
+    assert served == list(range(5))
+
+
+async def test_send_retries_flood_wait(client, stats):
+    client.errors = [_flood_wait(), _flood_wait()]
+
+    await _pipeline(client, stats).send_message('game', 'hello')
+
+    assert [message for _, message in client.sent] == ['hello']
+    counters = dict(stats.get_counters())
+    assert counters['flood_waits'] == 2
+    assert counters['sent_messages'] == 1
+
+
+async def test_send_raises_after_flood_wait_retries(client, stats):
+    client.errors = [_flood_wait(), _flood_wait()]
+    pipeline = _pipeline(client, stats, flood_wait_retries=1)
+
+    with pytest.raises(errors.FloodWaitError):
+        await pipeline.send_message('game', 'hello')
+
+    assert not client.sent
+    assert pipeline.queue_depth == 0
+
+
+async def test_send_resolves_stale_entity_again(client, stats):
+    client.errors = [errors.PeerIdInvalidError(request=None)]
+
+    await _pipeline(client, stats).send_message('game', 'hello')
+
+    assert [message for _, message in client.sent] == ['hello']
+
+
+async def test_send_waits_for_all_buckets(client, stats):
+    buckets = [TokenBucket(rate=1000, capacity=5), TokenBucket(rate=50, capacity=1)]
+    pipeline = _pipeline(client, stats, buckets)
+
+    latencies = [await pipeline.send_message('game', 'hello') for _ in range(3)]
+
+    assert latencies[0] < 0.01
+    assert sum(latencies) >= 0.04
+    assert pipeline.sent == 3
+    # waits are shorter by the time spent between the sends
+    assert dict(stats.get_counters())['throttled_ms'] >= 30
+
+
+async def test_send_resolves_not_found_entity_again(client, stats, monkeypatch):
+    get_input_entity = client.get_input_entity
+    resolve_errors = [ValueError('Could not find the input entity for PeerUser(user_id=42) (PeerUser).')]
+
+    async def resolve(peer):
+        if resolve_errors:
+            raise resolve_errors.pop()
+        return await get_input_entity(peer)
+
+    monkeypatch.setattr(client, 'get_input_entity', resolve)
+
+    await _pipeline(client, stats).send_message('game', 'hello')
+
+    assert [message for _, message in client.sent] == ['hello']
+
+
+async def test_send_does_not_retry_other_value_errors(client, stats):
+    client.errors = [ValueError('Message was too long'), ValueError('Message was too long')]
+
+    with pytest.raises(ValueError, match='too long'):
+        await _pipeline(client, stats).send_message('game', 'hello')
+
+    assert len(client.errors) == 1
@@ -0,0 +1,118 @@
+import datetime
+
+import pytest
+from telethon.crypto import AuthKey
+from telethon.sessions import SQLiteSession
+from telethon.tl import types
+
+from tg_fun import sessions
+from tg_fun.sessions import FlushingMemorySession
+
+_game_bot = types.User(id=42, access_hash=4242, username='game_bot', first_name='Game')
+
+
+class Clock:
+    def __init__(self):
+        self.now = float(0)
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sessions, 'time', clock)
+    return clock
+
+
+@pytest.fixture()
+def session_name(tmp_path):
+    return str(tmp_path / 'account')
+
+
+def _update_state(pts):
+    return types.updates.State(pts, 1, datetime.datetime.now(tz=datetime.timezone.utc), 1, unread_count=0)
+
+
+def test_round_trip(session_name, clock):
+    session = FlushingMemorySession(session_name, flush_seconds=60)
+    session.set_dc(2, '149.154.167.51', 443)
+    session.auth_key = AuthKey(b'a' * 256)
+    session.process_entities([_game_bot])
+    session.set_update_state(0, _update_state(10))
+    session.close()
+
+    restored = FlushingMemorySession(session_name, flush_seconds=60)
+
+    assert (restored.dc_id, restored.server_address, restored.port) == (2, '149.154.167.51', 443)
+    assert restored.auth_key.key == b'a' * 256
+    assert restored.get_input_entity(42) == types.InputPeerUser(42, 4242)
+    assert restored.get_update_state(0).pts == 10
+    assert restored.flushes == 0
+
+
+def test_flush_once_per_interval(session_name, clock):
+    session = FlushingMemorySession(session_name, flush_seconds=60)
+    session.process_entities([_game_bot])
+    session.save()
+    assert session.flushes == 0
+
+    clock.now = 60
+    session.save()
+    session.process_entities([_game_bot])
+    session.set_update_state(0, _update_state(10))
+    session.set_update_state(0, _update_state(10))
+    clock.now = 120
+    session.save()
+
+    assert session.flushes == 2
+    session.save()
+    assert session.flushes == 2
+
+
+def test_write_new_key_at_once(session_name, clock):
+    session = FlushingMemorySession(session_name, flush_seconds=60)
+    auth_key = AuthKey(b'a' * 256)
+    session.auth_key = auth_key
+    session.auth_key = auth_key
+    assert session.flushes == 1
+
+    # telethon generates the next key into the same object
+    auth_key.key = b'b' * 256
+    session.auth_key = auth_key
+
+    assert session.flushes == 2
+    assert FlushingMemorySession(session_name, flush_seconds=60).auth_key.key == b'b' * 256
+
+
+def test_write_key_changed_in_place_on_close(session_name, clock):
+    session = FlushingMemorySession(session_name, flush_seconds=60)
+    auth_key = AuthKey(b'a' * 256)
+    session.auth_key = auth_key
+
+    auth_key.key = b'b' * 256
+    session.close()
+
+    assert session.flushes == 2
+    assert FlushingMemorySession(session_name, flush_seconds=60).auth_key.key == b'b' * 256
+
+
+def test_import_sqlite_session(session_name, clock):
+    sqlite_session = SQLiteSession(session_name)
+    sqlite_session.set_dc(2, '149.154.167.51', 443)
+    sqlite_session.auth_key = AuthKey(b'a' * 256)
+    sqlite_session.process_entities([_game_bot])
+    sqlite_session.set_update_state(0, _update_state(10))
+    sqlite_session.save()
+    sqlite_session.close()
+
+    session = FlushingMemorySession(session_name, flush_seconds=60)
+
+    assert session.flushes == 1
+    assert session.auth_key.key == b'a' * 256
+    assert session.get_input_entity('game_bot') == types.InputPeerUser(42, 4242)
+    assert session.get_update_state(0).pts == 10
+    restored = FlushingMemorySession(session_name, flush_seconds=60)
+    assert restored.flushes == 0
+    assert restored.server_address == '149.154.167.51'
@@ -0,0 +1,41 @@
+import pytest
+
+from tg_fun import settings
+from tg_fun.settings import AppSettings
+
+get_settings = settings.get_settings
+
+
+@pytest.fixture()
+def app_path(tmp_path, monkeypatch):
+    for name in AppSettings.model_fields:
+        monkeypatch.delenv(name.upper(), raising=False)
+    monkeypatch.setattr(settings, 'APP_PATH', str(tmp_path))
+    get_settings.cache_clear()
+    yield tmp_path
+    get_settings.cache_clear()
+
+
+def test_read_env_file_on_first_call(app_path):
+    # the file is created after the import, nothing is read before the call
+    (app_path / '.env').write_text('GAME_USERNAME=custom_bot\nFAST_MODE=true\n')
+
+    app_settings = get_settings()
+
+    assert app_settings.game_username == 'custom_bot'
+    assert app_settings.fast_mode
+
+
+def test_settings_are_read_once(app_path):
+    app_settings = get_settings()
+    (app_path / '.env').write_text('GAME_USERNAME=custom_bot\n')
+
+    assert get_settings() is app_settings
+    assert app_settings.game_username == 'rf_telegram_bot'
+
+
+def test_environment_overrides_env_file(app_path, monkeypatch):
+    (app_path / '.env').write_text('GAME_USERNAME=custom_bot\n')
+    monkeypatch.setenv('GAME_USERNAME', 'env_bot')
+
+    assert get_settings().game_username == 'env_bot'
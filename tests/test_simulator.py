@@ -0,0 +1,15 @@
+from tg_fun.simulator import runner
+
+
+def test_farm_against_simulated_bot(app_settings, tmp_path, capsys):
+    journal_path = tmp_path / 'journal.jsonl'
+    app_settings.event_journal_path = str(journal_path)
+    app_settings.snapshot_dir = str(tmp_path / 'snapshots')
+
+    runner.main(['--accounts', '2', '--minutes', '10', '--speed', '1200'])
+
+    report = capsys.readouterr().out.splitlines()
+    assert [line.split(':')[0] for line in report] == ['simulator-1', 'simulator-2']
+    assert all('fights 0.0/h' not in line for line in report)
+    assert not journal_path.exists()
+    assert not (tmp_path / 'snapshots').exists()
@@ -0,0 +1,100 @@
+import json
+import time
+
+import pytest
+from telethon.tl import types
+
+from benchmarks.corpus import FIGHT_ZONE_KEYBOARD, make_event
+from tg_fun.account import AccountContext
+from tg_fun.game.buttons import ATTACK
+from tg_fun.game.parsers import EventView
+from tg_fun.trainer import snapshot
+from tests.conftest import FakeClient
+
+
+@pytest.fixture()
+def snapshot_dir(app_settings, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_settings, 'snapshot_dir', str(tmp_path))
+    return tmp_path
+
+
+async def _farmed_account(account, monkeypatch):
+    async def get_input_entity(peer):
+        return types.InputPeerUser(user_id=42, access_hash=4242)
+
+    monkeypatch.setattr(account.client, 'get_input_entity', get_input_entity)
+    await account.entities.get_input_entity(account.settings.game_username)
+
+    view = EventView(make_event('Ты наткнулся на 🐺Волк (ур. 12)\n❤120/120 🔋14/20', FIGHT_ZONE_KEYBOARD, 7))
+    account.last_view = view
+    account.last_state = 'is_monster_found'
+    account.buttons.update('fight_zone_buttons', 7, view.button_texts)
+    account.energy.observe(14)
+    account.stats.inc_value('events', 5)
+    account.stats.observe_latency('send', 0.2)
+    return account
+
+
+def _restored_account(app_settings):
+    return AccountContext(session='test', client=FakeClient(), settings=app_settings)
+
+
+async def test_snapshot_round_trip(account, app_settings, snapshot_dir, monkeypatch):
+    account = await _farmed_account(account, monkeypatch)
+    snapshot.save(account)
+
+    restored = _restored_account(app_settings)
+    restored_snapshot = snapshot.load(restored)
+
+    assert restored_snapshot is not None
+    assert restored.last_state == 'is_monster_found'
+    assert restored.stats.dump() == account.stats.dump()
+    assert restored.buttons.dump() == account.buttons.dump()
+    assert restored.energy.dump()['level'] == 14
+    assert restored.entities.dump() == account.entities.dump()
+
+    event = snapshot.restored_event(restored, restored_snapshot)
+    assert event.message.id == 7
+    assert [button.text for button in event.message.buttons[0]] == ['🐺 Искать монстра', '🔪 Атаковать']
+    assert restored.buttons.find('fight_zone_buttons', ATTACK) == '🔪 Атаковать'
+
+
+async def test_stored_button_click_goes_through_sender(account, app_settings, snapshot_dir, monkeypatch):
+    snapshot.save(await _farmed_account(account, monkeypatch))
+    restored = _restored_account(app_settings)
+    event = snapshot.restored_event(restored, snapshot.load(restored))
+
+    await event.message.buttons[0][1].click()
+
+    assert [message for _, message in restored.client.sent] == ['🔪 Атаковать']
+    assert restored.sender.sent == 1
+
+
+async def test_old_snapshot_restores_stats_only(account, app_settings, snapshot_dir, monkeypatch):
+    snapshot.save(await _farmed_account(account, monkeypatch))
+    path = snapshot.path_for(account)
+    with open(path, encoding='utf-8') as snapshot_file:
+        stored = json.load(snapshot_file)
+    stored['saved_at'] = time.time() - app_settings.snapshot_max_age_seconds - 1
+    with open(path, 'w', encoding='utf-8') as snapshot_file:
+        json.dump(stored, snapshot_file)
+
+    restored = _restored_account(app_settings)
+
+    assert snapshot.load(restored) is None
+    assert restored.stats.dump()['counters'] == {'events': 5}
+    assert restored.last_state is None
+
+
+@pytest.mark.parametrize('content', ['{broken', json.dumps({'version': 1})])
+async def test_ignore_unusable_snapshot(account, snapshot_dir, content):
+    with open(snapshot.path_for(account), 'w', encoding='utf-8') as snapshot_file:
+        snapshot_file.write(content)
+
+    assert snapshot.load(account) is None
+
+
+async def test_no_event_for_inline_keyboard(account, snapshot_dir):
+    stored = {'message': {'id': 1, 'text': 'text', 'keyboard': [['✅Да']], 'inline': True}}
+
+    assert snapshot.restored_event(account, stored) is None
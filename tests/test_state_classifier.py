@@ -0,0 +1,91 @@
+import itertools
+
+import pytest
+
+from benchmarks.corpus import MESSAGES, make_event
+from tg_fun.game.parsers import EventView
+from tg_fun.game.state.classifier import StateClassifier, StatePatterns
+from tg_fun.trainer import farming
+
+
+def _classify_by_chain(view):
+    for check_function, _ in farming._states_mapping:
+        if check_function(view):
+            return check_function
+    return None
+
+
+def _state_name(check_function):
+    return check_function.__name__ if check_function else None
+
+
+@pytest.mark.parametrize('message, keyboard', MESSAGES)
+def test_classify_same_as_predicates(message, keyboard):
+    view = EventView(make_event(message, keyboard))
+
+    assert _state_name(farming._state_classifier.classify(view)) == _state_name(_classify_by_chain(view))
+
+
+@pytest.mark.parametrize('first, second', itertools.permutations(MESSAGES, 2))
+def test_classify_same_as_predicates_for_mixed_messages(first, second):
+    view = EventView(make_event(f'{first[0]} {second[0]}', first[1] or second[1]))
+
+    assert _state_name(farming._state_classifier.classify(view)) == _state_name(_classify_by_chain(view))
+
+
+@pytest.mark.parametrize('message, keyboard', MESSAGES)
+def test_classify_same_as_predicates_without_buttons(message, keyboard):
+    view = EventView(make_event(message, None))
+
+    assert _state_name(farming._state_classifier.classify(view)) == _state_name(_classify_by_chain(view))
+
+
+def is_short(view):
+    return 'ab' in view.text
+
+
+def is_long(view):
+    return 'abc' in view.text
+
+
+def is_long_with_buttons(view):
+    return 'abc' in view.text and bool(view.buttons)
+
+
+@pytest.mark.parametrize('message', ['abc', 'xabcx', 'abab abc'])
+def test_classify_shorter_phrase_of_higher_priority_at_same_position(message):
+    classifier = StateClassifier([
+        (is_short, StatePatterns(phrases=('ab',))),
+        (is_long, StatePatterns(phrases=('abc',))),
+    ])
+
+    assert classifier.classify(EventView(make_event(message, None))) is is_short
+
+
+def test_classify_skip_phrase_without_required_buttons():
+    classifier = StateClassifier([
+        (is_long_with_buttons, StatePatterns(phrases=('abc',), buttons_required=True)),
+        (is_short, StatePatterns(phrases=('ab',))),
+    ])
+
+    assert classifier.classify(EventView(make_event('abc', None))) is is_short
+    assert classifier.classify(EventView(make_event('abc', [['ok']]))) is is_long_with_buttons
+
+
+@pytest.mark.parametrize('keyboard, expected', [
+    (None, is_long),
+    ([['ok']], is_long_with_buttons),
+])
+def test_classify_shared_phrase_by_buttons(keyboard, expected):
+    classifier = StateClassifier([
+        (is_long_with_buttons, StatePatterns(phrases=('abc',), buttons_required=True)),
+        (is_long, StatePatterns(phrases=('abc',))),
+    ])
+
+    assert classifier.classify(EventView(make_event('abc', keyboard))) is expected
+
+
+def test_classify_nothing_matched():
+    classifier = StateClassifier([(is_short, StatePatterns(phrases=('ab',)))])
+
+    assert classifier.classify(EventView(make_event('xyz', None))) is None
@@ -0,0 +1,46 @@
+import logging
+
+from tg_fun import tracing
+from tg_fun.stats import StatsCollector
+
+
+async def test_finish_observes_spans_and_calls_back_once():
+    stats = StatsCollector()
+    done = []
+    trace = tracing.EventTrace(stats)
+    trace.add_done_callback(lambda: done.append(True))
+
+    with tracing.activated(trace):
+        with tracing.span('classify'):
+            tracing.current().mark_reply()
+    trace.finish()
+    trace.cancel()
+
+    assert done == [True]
+    assert {'stage_classify', 'event_total', 'event_overhead', 'event_reply'} <= stats.histograms.keys()
+
+
+async def test_cancel_calls_back_without_stats():
+    stats = StatsCollector()
+    done = []
+    trace = tracing.EventTrace(stats)
+    trace.add_done_callback(lambda: done.append(True))
+
+    trace.cancel()
+
+    assert done == [True]
+    assert not stats.histograms
+
+
+async def test_log_slow_event(caplog):
+    trace = tracing.EventTrace(StatsCollector(), slow_seconds=1e-9)
+    trace.state = 'is_town'
+    trace.action = 'in_town'
+    with trace.span('log'):
+        trace.spans.append(tracing.Span('queue', 0.5, delay=False))
+
+    with caplog.at_level(logging.WARNING):
+        trace.finish()
+
+    assert 'slow event is_town -> in_town' in caplog.text
+    assert 'queue 0.500s, log ' in caplog.text
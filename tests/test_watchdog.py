@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from tg_fun.trainer import loop
+from tg_fun.trainer.watchdog import ResponseTimer, StallWatchdog
+
+_timeout = 0.05
+
+
+@pytest.fixture()
+async def watched(account):
+    account.watchdog = StallWatchdog(account.stats, _timeout, _timeout, _timeout)
+    account.actions.start()
+    watch_task = asyncio.create_task(loop._watch_stalls(account))
+    yield account
+    watch_task.cancel()
+
+
+def _sent(account):
+    return [message for _, message in account.client.sent]
+
+
+async def test_escalate_missed_responses(watched, monkeypatch):
+    notified = []
+    monkeypatch.setattr(watched.notifications, 'notify', notified.append)
+
+    await asyncio.sleep(_timeout * 3.5)
+
+    sent = _sent(watched)
+    assert len(sent) == 3
+    assert sent[0] in watched.settings.ping_commands
+    assert sent[1:] == ['/buttons', '/buttons']
+    assert len(notified) == 1
+    assert watched.watchdog.level == 3
+    assert ('stalls', 1) in watched.stats.get_counters()
+
+
+async def test_observed_state_rearms_deadline(watched):
+    for _ in range(4):
+        await asyncio.sleep(_timeout / 2)
+        watched.watchdog.observe('is_town', 'in_town', watched.actions.idle_since)
+
+    assert not watched.client.sent
+    assert watched.watchdog.level == 0
+
+
+async def test_nothing_is_expected_while_paused(watched):
+    watched.paused = True
+    watched.watchdog.progress()
+
+    await asyncio.sleep(_timeout * 2)
+
+    assert not watched.client.sent
+
+
+async def test_progress_resets_after_stall(watched):
+    await asyncio.sleep(_timeout * 1.5)
+    watched.watchdog.observe('is_town', 'in_town', watched.actions.idle_since)
+
+    assert watched.watchdog.level == 0
+    assert ('stall_seconds', 0) in watched.stats.get_counters()
+
+
+def test_response_timer_follows_responses():
+    timer = ResponseTimer(10)
+    for _ in range(50):
+        timer.observe(2)
+
+    assert timer.seconds == pytest.approx(2, abs=0.1)
+    assert timer.timeout < 10
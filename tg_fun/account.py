@@ -0,0 +1,95 @@
+"""Game account context."""
+import asyncio
+import os
+from dataclasses import dataclass, field
+
+from telethon import TelegramClient
+
+from tg_fun.captcha import CaptchaSolver
+from tg_fun.entities import EntityCache
+from tg_fun.game.buttons import ButtonRegistry
+from tg_fun.game.parsers import EventView
+from tg_fun.media import MediaCache
+from tg_fun.notifications import NotificationQueue
+from tg_fun.read_receipts import ReadReceipts
+from tg_fun.sender import SendPipeline, TokenBucket
+from tg_fun.settings import AppSettings
+from tg_fun.stats import StatsCollector
+from tg_fun.trainer.dispatch import ActionQueue, EventDeduplicator
+from tg_fun.trainer.energy import EnergyScheduler
+from tg_fun.trainer.journal import EventJournal
+from tg_fun.trainer.watchdog import StallWatchdog
+
+
+@dataclass(eq=False)
+class AccountContext:
+    """All state of one farming game account."""
+
+    session: str
+    client: TelegramClient
+    settings: AppSettings
+    stats: StatsCollector = field(default_factory=StatsCollector)
+    buttons: ButtonRegistry = field(default_factory=ButtonRegistry)
+    journal: EventJournal | None = None
+    shared_send_bucket: TokenBucket | None = None
+    captcha_solver: CaptchaSolver | None = None
+    paused: bool = False
+    last_state: str | None = None
+    last_view: EventView | None = None
+    # last logged state and how many times in a row it was seen
+    logged_state: tuple[str | None, int] = (None, 0)
+    stop_requested: asyncio.Event = field(default_factory=asyncio.Event)
+    seen_events: EventDeduplicator = field(default_factory=EventDeduplicator)
+    energy: EnergyScheduler = field(init=False)
+    actions: ActionQueue = field(init=False)
+    entities: EntityCache = field(init=False)
+    sender: SendPipeline = field(init=False)
+    notifications: NotificationQueue = field(init=False)
+    read_receipts: ReadReceipts = field(init=False)
+    media: MediaCache = field(init=False)
+    watchdog: StallWatchdog = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Set up account schedulers."""
+        self.energy = EnergyScheduler(self.stats, self.settings.energy_regeneration_seconds)
+        self.actions = ActionQueue(self.stats, interrupt_wait=self.energy.cancel)
+        self.watchdog = StallWatchdog(
+            self.stats,
+            self.settings.watchdog_initial_timeout_seconds,
+            self.settings.watchdog_min_timeout_seconds,
+            self.settings.watchdog_max_timeout_seconds,
+        )
+
+        send_buckets = [TokenBucket(self.settings.send_rate_per_second, self.settings.send_burst)]
+        if self.shared_send_bucket:
+            send_buckets.append(self.shared_send_bucket)
+        self.entities = EntityCache(self.client, self.settings.entity_cache_ttl_seconds)
+        self.sender = SendPipeline(
+            self.client,
+            self.stats,
+            self.entities,
+            send_buckets,
+            self.settings.flood_wait_retries,
+        )
+        notify_bucket = TokenBucket(self.settings.notify_rate_per_minute / 60, self.settings.notify_burst)
+        self.notifications = NotificationQueue(
+            SendPipeline(self.client, self.stats, self.entities, [notify_bucket], self.settings.flood_wait_retries),
+            self.stats,
+            self.settings.custom_tg_channel,
+            self.settings.notify_duplicate_window_seconds,
+            self.settings.notify_digest_every_seconds,
+        )
+        self.media = MediaCache(self.stats, self.settings.media_cache_size)
+        self.read_receipts = ReadReceipts(
+            self.client,
+            self.stats,
+            self.entities,
+            self.settings.game_username,
+            self.settings.read_ack_idle_seconds,
+            self.settings.read_ack_max_delay_seconds,
+        )
+
+    @property
+    def name(self) -> str:
+        """Short account name for logs."""
+        return os.path.basename(self.session)
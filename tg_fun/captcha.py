@@ -0,0 +1,242 @@
+"""
+Captcha solvers.
+
+Solvers run in worker processes and get plain picklable tasks, so this
+module must not import telethon or other heavy modules. The library
+solver matches captcha images against previously seen images sorted
+by answer: `<library>/<answer button text>/<image>`. Unsolved images
+are saved to `<library>/_unsolved` to be sorted by a human.
+"""
+import asyncio
+import base64
+import hashlib
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import NamedTuple, Protocol
+
+from tg_fun.stats import StatsCollector
+
+try:
+    from PIL import Image  # noqa: WPS433
+except ImportError:  # pragma: no cover
+    Image = None  # noqa: N816, WPS440
+
+UNSOLVED_DIR = '_unsolved'
+
+_hash_size = 8
+_row_size = _hash_size + 1
+_max_hash_distance = 16
+
+# solver of the worker process, created by the pool initializer
+_worker_solver: 'Solver | None' = None
+
+
+class CaptchaTask(NamedTuple):
+    """Captcha message passed to the solver process."""
+
+    text: str
+    image_base64: str | None
+    buttons: tuple[str, ...]
+
+    def find_button(self, answer: str) -> str | None:
+        """Button containing the answer text."""
+        for button in self.buttons:
+            if answer in button:
+                return button
+        return None
+
+
+class CaptchaAnswer(NamedTuple):
+    """Button to press and how sure the solver is."""
+
+    button: str | None
+    confidence: float
+
+
+class Solver(Protocol):
+    """Solver backend, created once per worker process with the library path."""
+
+    def __init__(self, library_dir: str) -> None:
+        """Load solver data."""
+
+    def solve(self, task: CaptchaTask) -> CaptchaAnswer:
+        """Pick answer button."""
+
+
+class LibrarySolver:
+    """
+    Match image with the library of solved captcha images.
+
+    Same image content is an exact match, similar images are matched
+    by the difference hash when Pillow is installed.
+    """
+
+    def __init__(self, library_dir: str) -> None:
+        """Index library images."""
+        self._digests: dict[str, str] = {}
+        self._hashes: list[tuple[int, str]] = []
+        if not os.path.isdir(library_dir):
+            return
+
+        for answer in os.listdir(library_dir):
+            answer_dir = os.path.join(library_dir, answer)
+            if answer.startswith('_') or not os.path.isdir(answer_dir):
+                continue
+            for file_name in os.listdir(answer_dir):
+                self._add_image(os.path.join(answer_dir, file_name), answer)
+        logging.info('captcha library: %d images, %d hashed', len(self._digests), len(self._hashes))
+
+    def solve(self, task: CaptchaTask) -> CaptchaAnswer:
+        """Find the library image answer among the captcha buttons."""
+        if task.image_base64 is None:
+            return CaptchaAnswer(None, 0)
+
+        image_bytes = base64.b64decode(task.image_base64)
+        answer = self._digests.get(hashlib.sha256(image_bytes).hexdigest())
+        if answer is not None:
+            return CaptchaAnswer(task.find_button(answer), 1)
+        return self._solve_similar(task, difference_hash(image_bytes))
+
+    def _add_image(self, image_path: str, answer: str) -> None:
+        with open(image_path, 'rb') as image_file:
+            image_bytes = image_file.read()
+        self._digests[hashlib.sha256(image_bytes).hexdigest()] = answer
+        image_hash = difference_hash(image_bytes)
+        if image_hash is not None:
+            self._hashes.append((image_hash, answer))
+
+    def _solve_similar(self, task: CaptchaTask, image_hash: int | None) -> CaptchaAnswer:
+        if image_hash is None:
+            return CaptchaAnswer(None, 0)
+
+        candidates = [
+            ((image_hash ^ library_hash).bit_count(), answer)
+            for library_hash, answer in self._hashes
+            if task.find_button(answer)
+        ]
+        if not candidates:
+            return CaptchaAnswer(None, 0)
+
+        distance, answer = min(candidates)
+        confidence = max(0, 1 - distance / _max_hash_distance)
+        return CaptchaAnswer(task.find_button(answer), confidence)
+
+
+class CaptchaSolver:
+    """Solve captcha in a process pool, answers below the confidence threshold are dropped."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        solver_path: str,
+        library_dir: str,
+        min_confidence: float,
+        timeout_seconds: float,
+        workers: int,
+    ) -> None:
+        """Set up solver shared by accounts, worker processes are started on the first captcha."""
+        self._solver_path = solver_path
+        self._library_dir = library_dir
+        self._min_confidence = min_confidence
+        self._timeout_seconds = timeout_seconds
+        self._workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        if solver_path == 'library' and Image is None:
+            logging.warning('Pillow is not installed, only exact captcha images are matched, install the captcha extra')
+
+    async def solve(self, task: CaptchaTask, stats: StatsCollector) -> str | None:
+        """Answer button text, None if captcha is not solved confidently."""
+        event_loop = asyncio.get_running_loop()
+        started = event_loop.time()
+        try:
+            async with asyncio.timeout(self._timeout_seconds):
+                answer = await event_loop.run_in_executor(self._get_pool(), _solve, task)
+        except TimeoutError:
+            logging.warning('captcha solver timed out')
+            answer = CaptchaAnswer(None, 0)
+        except BrokenExecutor:
+            logging.exception('captcha solver process died, pool is restarted on the next captcha')
+            self._pool = None
+            answer = CaptchaAnswer(None, 0)
+        except Exception:
+            logging.exception('captcha solver failed')
+            answer = CaptchaAnswer(None, 0)
+        stats.observe_latency('captcha_solve', event_loop.time() - started)
+
+        logging.info('captcha answer %s, confidence %.2f', answer.button, answer.confidence)
+        if answer.button is None or answer.confidence < self._min_confidence:
+            stats.inc_value('captcha_unsolved')
+            await asyncio.to_thread(self._save_unsolved, task)
+            return None
+        stats.inc_value('captcha_solved')
+        return answer.button
+
+    def close(self) -> None:
+        """Stop worker processes."""
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._workers,
+                # event loop process has threads, fork is not safe
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self._solver_path, self._library_dir),
+            )
+        return self._pool
+
+    def _save_unsolved(self, task: CaptchaTask) -> None:
+        if task.image_base64 is None or not self._library_dir:
+            return
+
+        image_bytes = base64.b64decode(task.image_base64)
+        unsolved_dir = os.path.join(self._library_dir, UNSOLVED_DIR)
+        os.makedirs(unsolved_dir, exist_ok=True)
+        file_name = '{0}.jpg'.format(hashlib.sha256(image_bytes).hexdigest())
+        with open(os.path.join(unsolved_dir, file_name), 'wb') as image_file:
+            image_file.write(image_bytes)
+
+
+def difference_hash(image_bytes: bytes) -> int | None:
+    """Perceptual difference hash of the image, None without Pillow or for broken images."""
+    if Image is None:
+        return None
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes)).convert('L')
+    except OSError:
+        return None
+    pixels = list(image.resize((_row_size, _hash_size)).getdata())
+    image_hash = 0
+    for index in range(len(pixels) - 1):
+        # the last pixel of a row has no right neighbour
+        if (index + 1) % _row_size:
+            is_brighter = pixels[index] > pixels[index + 1]
+            image_hash = image_hash << 1 | int(is_brighter)
+    return image_hash
+
+
+def load_solver(solver_path: str, library_dir: str) -> Solver:
+    """Create solver by name `library` or by `module:Class` path."""
+    if solver_path == 'library':
+        return LibrarySolver(library_dir)
+
+    module_name, _, class_name = solver_path.partition(':')
+    solver_class = getattr(importlib.import_module(module_name), class_name)
+    return solver_class(library_dir)
+
+
+def _init_worker(solver_path: str, library_dir: str) -> None:
+    global _worker_solver  # noqa: WPS420, WPS442
+    _worker_solver = load_solver(solver_path, library_dir)  # noqa: WPS122, WPS442
+
+
+def _solve(task: CaptchaTask) -> CaptchaAnswer:
+    if _worker_solver is None:
+        return CaptchaAnswer(None, 0)
+    return _worker_solver.solve(task)
@@ -1,32 +1,54 @@
-"""Command-line interface."""
-import logging
+"""
+Command-line interface.
+
+Entry points import their runners on call, so every command loads only
+the modules it needs and nothing is read or connected at import time.
+"""
+import asyncio
 import signal
 from typing import Any, Callable
 
-from tg_fun.settings import app_settings
-from tg_fun.telegram_client import client
-from tg_fun.trainer import (
-    loop,
-    farming,
-)
 
 def farming_start() -> None:
     """Start farming."""
+    from tg_fun.trainer import farming  # noqa: WPS433
+
     _run(farming.main)
 
 
+def simulate_start() -> None:
+    """Start farming against the local game bot simulator."""
+    from tg_fun.simulator import runner  # noqa: WPS433
+
+    _setup()
+    runner.main()
+
+
+def replay_start() -> None:
+    """Replay recorded events journal."""
+    from tg_fun.trainer import replay  # noqa: WPS433
+
+    _setup()
+    replay.main()
+
+
 def _run(main_func: Callable, *args: Any, **kwargs: Any) -> None:
-    _setup_logging()
-    signal.signal(signal.SIGINT, loop.exit_request)
+    from tg_fun.loop_lag import loop_factory  # noqa: WPS433
+    from tg_fun.settings import get_settings  # noqa: WPS433
+    from tg_fun.trainer import loop  # noqa: WPS433
+
+    _setup()
     try:
-        with client:
-            client.loop.run_until_complete(main_func(*args, **kwargs))
+        with asyncio.Runner(loop_factory=loop_factory(get_settings().event_loop)) as runner:
+            runner.run(main_func(*args, **kwargs))
     except ConnectionError:
         loop.exit_request()
 
 
-def _setup_logging() -> None:
-    logging.basicConfig(
-        level=logging.DEBUG if app_settings.debug else logging.INFO,
-        format='%(asctime)s %(levelname)-8s %(message)s',  # noqa: WPS323
-    )
+def _setup() -> None:
+    from tg_fun.log_config import setup_logging  # noqa: WPS433
+    from tg_fun.settings import get_settings  # noqa: WPS433
+    from tg_fun.trainer import loop  # noqa: WPS433
+
+    setup_logging(get_settings())
+    signal.signal(signal.SIGINT, loop.exit_request)
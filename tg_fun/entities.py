@@ -0,0 +1,82 @@
+"""Resolved Telegram entities cache."""
+import logging
+import time
+from typing import Any, Iterable
+
+from telethon import TelegramClient, errors, types
+
+from tg_fun.exceptions import EntityNotFoundError
+
+STALE_ENTITY_ERRORS = (
+    EntityNotFoundError,
+    errors.PeerIdInvalidError,
+    errors.ChannelInvalidError,
+    errors.ChannelPrivateError,
+)
+_resolve_errors = (*STALE_ENTITY_ERRORS, errors.RPCError)
+# telethon reports a peer it can not resolve by a bare ValueError
+_not_found_messages = ('Could not find the input entity', 'Cannot find any entity', 'No user has')
+
+
+class EntityCache:
+    """
+    Input entities of the account by username or alias like 'me'.
+
+    Entities are resolved once and reused until TTL is expired
+    or a request to the entity fails. The cache has no file of its own:
+    it outlives a restart only as a part of the account snapshot, so with
+    `snapshot_dir` unset entities are resolved again at startup.
+    """
+
+    def __init__(self, client: TelegramClient, ttl_seconds: float) -> None:
+        """Set up empty cache."""
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        self._entities: dict[str, tuple[Any, float]] = {}
+
+    async def get_input_entity(self, peer: str) -> Any:
+        """Get cached entity or resolve it."""
+        cached = self._entities.get(peer)
+        if cached and time.time() - cached[1] < self._ttl_seconds:
+            return cached[0]
+
+        try:
+            entity = await self._client.get_input_entity(peer)
+        except ValueError as resolve_error:
+            if str(resolve_error).startswith(_not_found_messages):
+                raise EntityNotFoundError(str(resolve_error)) from resolve_error
+            raise
+        self._entities[peer] = (entity, time.time())
+        return entity
+
+    def invalidate(self, peer: str) -> None:
+        """Drop entity after failed request, it will be resolved again."""
+        if self._entities.pop(peer, None) is not None:
+            logging.info('entity %s is invalidated', peer)
+
+    async def resolve(self, peers: Iterable[str]) -> None:
+        """Resolve entities at startup, failures are resolved again on use."""
+        for peer in peers:
+            try:
+                await self.get_input_entity(peer)
+            except _resolve_errors as resolve_error:
+                logging.warning('entity %s is not resolved: %s', peer, resolve_error)
+
+    def dump(self) -> dict:
+        """Telegram entities for the snapshot, entities not from telethon are skipped."""
+        dumped = {}
+        for peer, (entity, resolved_at) in self._entities.items():
+            to_dict = getattr(entity, 'to_dict', None)
+            if to_dict:
+                dumped[peer] = {'entity': to_dict(), 'resolved_at': resolved_at}
+        return dumped
+
+    def restore(self, dumped: dict) -> None:
+        """Load not expired entities from the snapshot."""
+        for peer, cached in dumped.items():
+            if time.time() - cached['resolved_at'] >= self._ttl_seconds:
+                continue
+            fields = dict(cached['entity'])
+            entity_type = getattr(types, fields.pop('_'), None)
+            if entity_type is not None:
+                self._entities[peer] = (entity_type(**fields), cached['resolved_at'])
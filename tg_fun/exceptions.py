@@ -5,3 +5,9 @@ class InvalidMessageError(Exception):
     """Invalid message or state."""
 
     pass
+
+
+class EntityNotFoundError(ValueError):
+    """Telegram entity of the peer is not resolved."""
+
+    pass
@@ -4,12 +4,11 @@ import random
 
 from telethon import events
 
-from tg_fun.settings import app_settings
-from tg_fun.telegram_client import client
+from tg_fun.account import AccountContext
 from tg_fun.wait_utils import wait_for
 
 
-async def ping(entity: int | events.NewMessage.Event) -> None:
+async def ping(account: AccountContext, entity: int | str | events.NewMessage.Event) -> None:
     """Random short message for update current location state."""
     logging.info('call ping command')
 
@@ -19,20 +18,20 @@ async def ping(entity: int | events.NewMessage.Event) -> None:
         game_bot_id = entity
 
     message = random.choice(
-        seq=app_settings.ping_commands,
+        seq=account.settings.ping_commands,
     )
     logging.info(f'call ping command debug {game_bot_id} {message}')
     await wait_for()
-    await client.send_message(
+    await account.sender.send_message(
         entity=game_bot_id,
         message=message,
     )
 
-async def execute_command(entity: int, command: str) -> None:
+async def execute_command(account: AccountContext, entity: int, command: str) -> None:
     """Execute custom command."""
     logging.info('call command execution {0}'.format(command))
     await wait_for()
-    await client.send_message(
+    await account.sender.send_message(
         entity=entity,
         message=command,
     )
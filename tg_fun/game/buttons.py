@@ -1,6 +1,8 @@
 """Game buttons and utils."""
 
 import itertools
+import logging
+from typing import Any, NamedTuple
 
 from telethon import events, types
 
@@ -15,8 +17,85 @@ TO_TOWN = '🏛'
 ATTACK = '🔪'
 FIND_MONSTER = '🐺'
 
+SYMBOLS = (TO_LOCATIONS, TO_DANGEONS, HEAL, YES, TO_FIGHT_ZONE, TO_TOWN, ATTACK, FIND_MONSTER)
+
+
 def get_buttons_flat(event: events.NewMessage.Event) -> list[types.TypeKeyboardButton]:
     """Get all available buttons from event message."""
     if not event.message.buttons:
         return []
     return list(itertools.chain(*event.message.buttons))
+
+
+def is_inline_keyboard(message: Any) -> bool:
+    """Check buttons are attached to the message, not shown instead of the user keyboard."""
+    return isinstance(getattr(message, 'reply_markup', None), types.ReplyInlineMarkup)
+
+
+class ButtonEntry(NamedTuple):
+    """Button text and id of the keyboard message it came from."""
+
+    text: str
+    message_id: int
+
+
+class ButtonRegistry:
+    """
+    Buttons of the last seen keyboard of every screen, indexed by symbol.
+
+    Category content is replaced by each update, and buttons are returned
+    only while the keyboard they came from is still shown to the user.
+    """
+
+    def __init__(self) -> None:
+        """Set up empty registry."""
+        self._categories: dict[str, dict[str, ButtonEntry]] = {}
+        self._keyboard_id = -1
+        self._keyboard: frozenset[str] = frozenset()
+
+    def observe(self, message_id: int, button_texts: list[str]) -> None:
+        """Remember the user keyboard shown now, older messages are ignored."""
+        if message_id < self._keyboard_id:
+            return
+        self._keyboard_id = message_id
+        self._keyboard = frozenset(button_texts)
+
+    def update(self, category: str, message_id: int, button_texts: list[str]) -> None:
+        """Replace buttons of the category by the keyboard."""
+        self.observe(message_id, button_texts)
+        self._categories[category] = {
+            symbol: ButtonEntry(text, message_id)
+            for text in button_texts
+            for symbol in SYMBOLS
+            if symbol in text
+        }
+
+    def dump(self) -> dict:
+        """Categories and the shown keyboard for the snapshot."""
+        return {
+            'keyboard_id': self._keyboard_id,
+            'keyboard': sorted(self._keyboard),
+            'categories': {
+                category: {symbol: list(entry) for symbol, entry in entries.items()}
+                for category, entries in self._categories.items()
+            },
+        }
+
+    def restore(self, dumped: dict) -> None:
+        """Load buttons from the snapshot."""
+        self._keyboard_id = dumped['keyboard_id']
+        self._keyboard = frozenset(dumped['keyboard'])
+        self._categories = {
+            category: {symbol: ButtonEntry(*entry) for symbol, entry in entries.items()}
+            for category, entries in dumped['categories'].items()
+        }
+
+    def find(self, category: str, symbol: str) -> str | None:
+        """Get text of the button by symbol if it is still on the screen."""
+        entry = self._categories.get(category, {}).get(symbol)
+        if entry is None:
+            return None
+        if entry.text not in self._keyboard:
+            logging.debug('button %s from message %d is not on the screen', entry.text, entry.message_id)
+            return None
+        return entry.text
@@ -1,61 +1,128 @@
 """Event message parsers."""
-import base64
 import re
-from io import BytesIO
 from math import ceil
 
 from telethon import events, types
 
 from tg_fun.exceptions import InvalidMessageError
-from tg_fun.telegram_client import client
+from tg_fun.game.buttons import get_buttons_flat
+from tg_fun.media import MediaCache
 
 _hp_level_pattern = re.compile(r'❤(\d+)/(\d+)')
 _energy_level_pattern = re.compile(r'🔋(\d+)/(\d+)')
 
+
+class EventView:
+    """
+    Incoming event with lazily parsed content.
+
+    Created once per event, so every consumer shares one message
+    normalization and one buttons flatten.
+    """
+
+    __slots__ = ('event', '_text', '_buttons', '_button_texts', '_hp', '_energy')
+
+    _text: str
+    _buttons: list[types.TypeKeyboardButton]
+    _button_texts: list[str]
+    _hp: tuple[int, int] | None
+    _energy: tuple[int, int] | None
+
+    def __init__(self, event: events.NewMessage.Event) -> None:
+        """Wrap event, nothing is parsed here."""
+        self.event = event
+
+    @property
+    def message(self) -> types.Message:
+        """Original event message."""
+        return self.event.message
+
+    @property
+    def text(self) -> str:
+        """Message content without EOL symbols in lower case."""
+        try:
+            return self._text
+        except AttributeError:
+            self._text = strip_message(self.event.message.message)
+        return self._text
+
+    @property
+    def buttons(self) -> list[types.TypeKeyboardButton]:
+        """All available message buttons."""
+        try:
+            return self._buttons
+        except AttributeError:
+            self._buttons = get_buttons_flat(self.event)
+        return self._buttons
+
+    @property
+    def button_texts(self) -> list[str]:
+        """Texts of all available message buttons."""
+        try:
+            return self._button_texts
+        except AttributeError:
+            self._button_texts = [button.text for button in self.buttons]
+        return self._button_texts
+
+    @property
+    def hp(self) -> tuple[int, int] | None:
+        """Current and max character HP if found."""
+        try:
+            return self._hp
+        except AttributeError:
+            self._hp = _parse_level(_hp_level_pattern, self.text)
+        return self._hp
+
+    @property
+    def energy(self) -> tuple[int, int] | None:
+        """Current and max character energy if found."""
+        try:
+            return self._energy
+        except AttributeError:
+            self._energy = _parse_level(_energy_level_pattern, self.text)
+        return self._energy
+
+
 def strip_message(original_message: str) -> str:
     """Return message content without EOL symbols."""
     return original_message.replace('\n', ' ').strip().lower()
 
 
-async def get_photo_base64(event: events.NewMessage.Event) -> str | None:
-    """Return message photo as base64 decoded string."""
-    image_bytes = BytesIO()
-    await client.download_media(
-        message=event.message,
-        file=image_bytes,
-        thumb=-1,
-    )
-    image_str_base64 = base64.b64encode(image_bytes.getvalue()).decode('utf-8')
-    return image_str_base64.replace('data:image/png;', '').replace('base64,', '')
+async def get_photo_base64(view: EventView, media: MediaCache) -> str | None:
+    """Return message photo as base64 string, downloaded once per photo."""
+    return await media.get_base64(view.message)
 
 
-def get_hp_level(message_content: str) -> int:
+def get_hp_level(view: EventView) -> int:
     """Get current HP in percent."""
-    current_level, max_level = get_character_hp(message_content)
-    return ceil(int(current_level) / int(max_level) * 100)
+    current_level, max_level = get_character_hp(view)
+    return ceil(current_level / max_level * 100)
 
 
-def get_character_hp(message_content: str) -> tuple[int, int]:
+def get_character_hp(view: EventView) -> tuple[int, int]:
     """Get character HP level."""
-    found = _hp_level_pattern.search(strip_message(message_content), re.MULTILINE)
-    if not found:
+    if view.hp is None:
         raise InvalidMessageError('HP not found')
+    return view.hp
 
-    current_level, max_level = found.group(1, 2)
-    return int(current_level), int(max_level)
 
-
-def get_energy_level(message_content: str) -> int:
+def get_energy_level(view: EventView) -> int:
     """Get current energy level."""
-    current_level, _ = get_character_energy(message_content)
-    return int(current_level)
+    current_level, _ = get_character_energy(view)
+    return current_level
 
 
-def get_character_energy(message_content: str) -> tuple[int, int]:
+def get_character_energy(view: EventView) -> tuple[int, int]:
     """Get character energy level."""
-    found = _energy_level_pattern.search(strip_message(message_content), re.MULTILINE)
-    if not found:
+    if view.energy is None:
         raise InvalidMessageError('Energy not found')
+    return view.energy
+
+
+def _parse_level(pattern: re.Pattern, message_content: str) -> tuple[int, int] | None:
+    found = pattern.search(message_content)
+    if not found:
+        return None
 
     current_level, max_level = found.group(1, 2)
     return int(current_level), int(max_level)
@@ -0,0 +1,78 @@
+"""
+Single-pass state classifier.
+
+All phrase patterns of the known states are compiled into one regex,
+so a message is normalized once and scanned once per event.
+"""
+import re
+from typing import Callable, Iterable, NamedTuple
+
+from tg_fun.game.parsers import EventView
+
+StatePredicate = Callable[[EventView], bool]
+
+
+class StatePatterns(NamedTuple):
+    """Phrases of the state and extra requirements for the message."""
+
+    phrases: tuple[str, ...]
+    buttons_required: bool = False
+
+    def matches(self, view: EventView) -> bool:
+        """Check one state without the classifier."""
+        if self.buttons_required and not view.buttons:
+            return False
+        return any(phrase in view.text for phrase in self.phrases)
+
+
+class StateClassifier:
+    """Find the first matched state by priority in one pass over the message."""
+
+    def __init__(self, rules: Iterable[tuple[StatePredicate, StatePatterns]]) -> None:
+        """Compile rules in priority order (the first one wins)."""
+        self._states: list[StatePredicate] = []
+        self._priority_by_phrase: dict[str, int] = {}
+        # a phrase of the state requiring buttons still belongs to the lower priority states without them
+        self._priority_without_buttons: dict[str, int] = {}
+
+        for priority, (predicate, patterns) in enumerate(rules):
+            self._states.append(predicate)
+            _add_phrases(self._priority_by_phrase, patterns.phrases, priority)
+            if not patterns.buttons_required:
+                _add_phrases(self._priority_without_buttons, patterns.phrases, priority)
+
+        # the regex alternation is ordered: at every position the phrase of the highest priority wins
+        self._pattern = _compile(self._priority_by_phrase)
+        self._pattern_without_buttons = _compile(self._priority_without_buttons)
+
+    def classify(self, view: EventView) -> StatePredicate | None:
+        """Return predicate of the matched state with the highest priority."""
+        message = view.text
+        if view.buttons:
+            pattern, priority_by_phrase = self._pattern, self._priority_by_phrase
+        else:
+            pattern, priority_by_phrase = self._pattern_without_buttons, self._priority_without_buttons
+        best_priority = len(self._states)
+
+        found = pattern.search(message)
+        while found:
+            best_priority = min(best_priority, priority_by_phrase[found.group()])
+            if not best_priority:
+                break
+            # phrases may overlap, so continue from the next symbol
+            found = pattern.search(message, found.start() + 1)
+
+        if best_priority == len(self._states):
+            return None
+        return self._states[best_priority]
+
+
+def _add_phrases(priority_by_phrase: dict[str, int], phrases: Iterable[str], priority: int) -> None:
+    for phrase in phrases:
+        priority_by_phrase.setdefault(phrase, priority)
+
+
+def _compile(phrases: Iterable[str]) -> re.Pattern[str]:
+    alternation = '|'.join(re.escape(phrase) for phrase in phrases)
+    # an empty alternation would match everywhere
+    return re.compile(alternation or '(?!)')
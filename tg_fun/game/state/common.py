@@ -1,151 +1,154 @@
 """Check messages by patterns."""
+from types import MappingProxyType
+from typing import Mapping
 
+from tg_fun.game.parsers import EventView
+from tg_fun.game.state.classifier import StatePatterns, StatePredicate
 
-from telethon import events
 
-from tg_fun.game.buttons import get_buttons_flat
-from tg_fun.game.parsers import strip_message
-
-
-def is_win_state(event: events.NewMessage.Event) -> bool:
+def is_win_state(view: EventView) -> bool:
     """Is fight win state."""
-    message = strip_message(event.message.message)
-    return 'ты одержал победу' in message
+    return PATTERNS[is_win_state].matches(view)
 
 
-def is_lose_state(event: events.NewMessage.Event) -> bool:
+def is_lose_state(view: EventView) -> bool:
     """Is fight lose state."""
-    message = strip_message(event.message.message)
-    patterns = {
-        'ты воскреснешь в',
-        'к сожалению ты умер',
-    }
-    for pattern in patterns:
-        if pattern in message:
-            return True
-    return False
-
-
-def is_alive(event: events.NewMessage.Event) -> bool:
+    return PATTERNS[is_lose_state].matches(view)
+
+
+def is_alive(view: EventView) -> bool:
     """Is alive state."""
-    message = strip_message(event.message.message)
-    patterns = {
-        'ты снова жив',
-        'ты снова в строю',
-    }
-    for pattern in patterns:
-        if pattern in message:
-            return True
-    return False
-
-
-def is_hp_recovered(event: events.NewMessage.Event) -> bool:
+    return PATTERNS[is_alive].matches(view)
+
+
+def is_hp_recovered(view: EventView) -> bool:
     """Is hp recovered state."""
-    message = strip_message(event.message.message)
-    return 'здоровье пополнено' in message
+    return PATTERNS[is_hp_recovered].matches(view)
 
 
-def is_empty_energy(event: events.NewMessage.Event) -> bool:
+def is_empty_energy(view: EventView) -> bool:
     """Is empty energy state."""
-    message = strip_message(event.message.message)
-    patterns = {
-        'недостаточно энергии',
-        '[у кого-то в группе меньше 2 единиц энергии]',
-    }
-    for pattern in patterns:
-        if pattern in message:
-            return True
-    return False
-
-
-def is_energy_recovered(event: events.NewMessage.Event) -> bool:
+    return PATTERNS[is_empty_energy].matches(view)
+
+
+def is_energy_recovered(view: EventView) -> bool:
     """Is energy recovered state."""
-    message = strip_message(event.message.message)
-    return 'к энергии' in message
+    return PATTERNS[is_energy_recovered].matches(view)
 
 
-def is_locations(event: events.NewMessage.Event) -> bool:
+def is_locations(view: EventView) -> bool:
     """Is location state."""
-    message = strip_message(event.message.message)
-    found_buttons = get_buttons_flat(event)
-    if not found_buttons:
-        return False
-    return 'пора в бой' in message
+    return PATTERNS[is_locations].matches(view)
 
 
-def is_monster_found(event: events.NewMessage.Event) -> bool:
+def is_monster_found(view: EventView) -> bool:
     """Is monster found state."""
-    message = strip_message(event.message.message)
+    return PATTERNS[is_monster_found].matches(view)
 
-    patterns = {
-        'на пути у вас встретился',
-        'ты наткнулся на',
-    }
-    for pattern in patterns:
-        if pattern in message:
-            return True
-    return False
 
-
-def is_monster_not_found(event: events.NewMessage.Event) -> bool:
+def is_monster_not_found(view: EventView) -> bool:
     """Is monster not found state."""
-    message = strip_message(event.message.message)
-
-    patterns = {
-        'вы ещё не нашли монстра',
-    }
-    for pattern in patterns:
-        if pattern in message:
-            return True
-    return False
+    return PATTERNS[is_monster_not_found].matches(view)
 
 
-def is_town(event: events.NewMessage.Event) -> bool:
+def is_town(view: EventView) -> bool:
     """Is town state."""
-    message = strip_message(event.message.message)
-    found_buttons = get_buttons_flat(event)
-    if not found_buttons:
-        return False
-    return 'ты дошел до локации' in message
+    return PATTERNS[is_town].matches(view)
 
 
-def is_dangeon(event: events.NewMessage.Event) -> bool:
+def is_dangeon(view: EventView) -> bool:
     """Is dangeon state."""
-    message = strip_message(event.message.message)
-    return 'вперед на встречу с монстрами' in message
+    return PATTERNS[is_dangeon].matches(view)
 
 
-def is_choose_dangeon(event: events.NewMessage.Event) -> bool:
+def is_choose_dangeon(view: EventView) -> bool:
     """Is choose dangeon state."""
-    message = strip_message(event.message.message)
-    return 'какой данж запустим' in message
+    return PATTERNS[is_choose_dangeon].matches(view)
 
 
-def is_approve_dangeon(event: events.NewMessage.Event) -> bool:
+def is_approve_dangeon(view: EventView) -> bool:
     """Is approve dangeon state."""
-    message = strip_message(event.message.message)
-    return 'что хочешь попробовать пройти данж' in message
+    return PATTERNS[is_approve_dangeon].matches(view)
 
 
-def is_dangeon_finished(event: events.NewMessage.Event) -> bool:
+def is_dangeon_finished(view: EventView) -> bool:
     """Is dangeon finished state."""
-    message = strip_message(event.message.message)
-    return 'вы успешно прошли' in message
+    return PATTERNS[is_dangeon_finished].matches(view)
 
 
-def init(event: events.NewMessage.Event) -> bool:
+def init(view: EventView) -> bool:
     """Init."""
-    message = strip_message(event.message.message)
-    found_buttons = get_buttons_flat(event)
-    if not found_buttons:
-        return False
-    return 'кнопочки' in message
+    return PATTERNS[init].matches(view)
 
 
-def is_capcha_found(event: events.NewMessage.Event) -> bool:
+def is_capcha_found(view: EventView) -> bool:
     """Is capch found state."""
-    message = strip_message(event.message.message)
-    found_buttons = get_buttons_flat(event)
-    if not found_buttons:
-        return False
-    return 'прежде чем выполнять какие-то действия в игре' in message
+    return PATTERNS[is_capcha_found].matches(view)
+
+
+PATTERNS: Mapping[StatePredicate, StatePatterns] = MappingProxyType({
+    is_win_state: StatePatterns(
+        phrases=('ты одержал победу',),
+    ),
+    is_lose_state: StatePatterns(
+        phrases=(
+            'ты воскреснешь в',
+            'к сожалению ты умер',
+        ),
+    ),
+    is_alive: StatePatterns(
+        phrases=(
+            'ты снова жив',
+            'ты снова в строю',
+        ),
+    ),
+    is_hp_recovered: StatePatterns(
+        phrases=('здоровье пополнено',),
+    ),
+    is_empty_energy: StatePatterns(
+        phrases=(
+            'недостаточно энергии',
+            '[у кого-то в группе меньше 2 единиц энергии]',
+        ),
+    ),
+    is_energy_recovered: StatePatterns(
+        phrases=('к энергии',),
+    ),
+    is_locations: StatePatterns(
+        phrases=('пора в бой',),
+        buttons_required=True,
+    ),
+    is_monster_found: StatePatterns(
+        phrases=(
+            'на пути у вас встретился',
+            'ты наткнулся на',
+        ),
+    ),
+    is_monster_not_found: StatePatterns(
+        phrases=('вы ещё не нашли монстра',),
+    ),
+    is_town: StatePatterns(
+        phrases=('ты дошел до локации',),
+        buttons_required=True,
+    ),
+    is_dangeon: StatePatterns(
+        phrases=('вперед на встречу с монстрами',),
+    ),
+    is_choose_dangeon: StatePatterns(
+        phrases=('какой данж запустим',),
+    ),
+    is_approve_dangeon: StatePatterns(
+        phrases=('что хочешь попробовать пройти данж',),
+    ),
+    is_dangeon_finished: StatePatterns(
+        phrases=('вы успешно прошли',),
+    ),
+    init: StatePatterns(
+        phrases=('кнопочки',),
+        buttons_required=True,
+    ),
+    is_capcha_found: StatePatterns(
+        phrases=('прежде чем выполнять какие-то действия в игре',),
+        buttons_required=True,
+    ),
+})
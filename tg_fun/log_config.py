@@ -0,0 +1,113 @@
+"""
+Logging setup.
+
+Records are put to a queue on the event loop thread; formatting and
+writing are done by the background listener thread.
+"""
+import atexit
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
+from typing import Mapping
+
+from tg_fun.settings import AppSettings
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-8s %(message)s'  # noqa: WPS323
+_immutable_args = (str, int, float, bytes, type(None))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler formatting in the calling thread only what may change later."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Put record to the queue, a message with mutable args is formatted at once."""
+        if record.args and not _are_immutable(record.args):
+            # the listener thread would format objects changed by the event loop meanwhile
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line, structured records keep their fields only."""
+
+    def format(self, record: logging.LogRecord) -> str:  # noqa: WPS125
+        """Format record as JSON line."""
+        json_record = {'ts': round(record.created, 3), 'level': record.levelname}
+        fields = getattr(record, 'fields', None)
+        if fields:
+            json_record.update(fields)
+        else:
+            json_record['msg'] = record.getMessage()
+        if record.exc_info:
+            json_record['exc'] = self.formatException(record.exc_info)
+        return json.dumps(json_record, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def skip_unused_record_fields() -> None:
+    """Do not collect caller, thread, process and task of every record, formats do not use them."""
+    logging._srcfile = None  # noqa: WPS437
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    if sys.version_info >= (3, 12):
+        logging.logAsyncioTasks = False
+
+
+def setup_logging(settings: AppSettings) -> QueueListener | None:
+    """Configure root logger by settings, return started listener in queue mode."""
+    skip_unused_record_fields()
+    output_handler = _create_handler(settings)
+    if settings.log_format == 'json':
+        output_handler.setFormatter(JsonFormatter())
+    else:
+        output_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    level = logging.DEBUG if settings.debug else logging.INFO
+    if not settings.log_queue:
+        logging.basicConfig(level=level, handlers=[output_handler])
+        return None
+
+    records: SimpleQueue = SimpleQueue()
+    listener = QueueListener(records, output_handler, respect_handler_level=True)
+    logging.basicConfig(level=level, handlers=[DeferredQueueHandler(records)])
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+def _are_immutable(args: tuple | Mapping) -> bool:
+    if not isinstance(args, tuple):
+        return False
+    return all(isinstance(arg, _immutable_args) or _are_immutable(arg) for arg in args)
+
+
+def _create_handler(settings: AppSettings) -> logging.Handler:
+    if not settings.log_file:
+        return logging.StreamHandler(sys.stderr)
+
+    file_handler = RotatingFileHandler(
+        settings.log_file,
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backups,
+        encoding='utf-8',
+    )
+    file_handler.namer = _compressed_name
+    file_handler.rotator = _compress
+    return file_handler
+
+
+def _compressed_name(name: str) -> str:
+    return f'{name}.gz'
+
+
+def _compress(source: str, dest: str) -> None:
+    with open(source, 'rb') as source_file:
+        with gzip.open(dest, 'wb') as dest_file:
+            shutil.copyfileobj(source_file, dest_file)
+    os.remove(source)
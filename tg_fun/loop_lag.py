@@ -0,0 +1,90 @@
+"""Event loop health monitoring."""
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Iterable
+
+from tg_fun.stats import LAG_BUCKETS, StatsCollector
+
+
+class LoopLagMonitor:
+    """
+    Sample event loop lag into the stats of all accounts.
+
+    Lag is how late a short periodic sleep wakes up. A watcher thread
+    logs the stack of the event loop thread when it is blocked longer
+    than the warning threshold, so the blocking callback is visible.
+    """
+
+    def __init__(self, stats: Iterable[StatsCollector], interval_seconds: float, blocked_seconds: float) -> None:
+        """Set up monitor, call `start` from the event loop."""
+        self._stats = list(stats)
+        self._interval_seconds = interval_seconds
+        self._blocked_seconds = blocked_seconds
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._sampler: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sampling and watching for blocked loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._sampler = asyncio.create_task(self._run())
+        if self._blocked_seconds:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name='loop-lag-watcher', daemon=True)
+            self._watcher.start()
+
+    async def close(self) -> None:
+        """Stop sampling and watching."""
+        self._stop.set()
+        if self._sampler:
+            self._sampler.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sampler
+        if self._watcher:
+            self._watcher.join()
+
+    async def _run(self) -> None:
+        event_loop = asyncio.get_running_loop()
+        while True:  # noqa: WPS457
+            started = event_loop.time()
+            await asyncio.sleep(self._interval_seconds)
+            lag = max(0, event_loop.time() - started - self._interval_seconds)
+            self._heartbeat = time.monotonic()
+            for stats in self._stats:
+                stats.observe_latency('loop_lag', lag, LAG_BUCKETS)
+                if self._blocked_seconds and lag >= self._blocked_seconds:
+                    stats.inc_value('loop_blocked')
+
+    def _watch(self) -> None:
+        reported = self._heartbeat
+        while not self._stop.wait(self._blocked_seconds / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self._interval_seconds
+            if blocked < self._blocked_seconds or heartbeat == reported:
+                continue
+
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)  # noqa: WPS437
+            stack = ''.join(traceback.format_stack(frame)) if frame else 'unknown'
+            logging.warning('event loop is blocked for %.2f seconds by:\n%s', blocked, stack)
+
+
+def loop_factory(name: str) -> Callable[[], asyncio.AbstractEventLoop] | None:
+    """Event loop factory by name, None for the default asyncio loop."""
+    if name != 'uvloop':
+        return None
+
+    try:
+        import uvloop  # noqa: WPS433
+    except ImportError:
+        logging.warning('uvloop is not installed, default asyncio event loop is used, install the uvloop extra')
+        return None
+    return uvloop.new_event_loop
@@ -0,0 +1,116 @@
+"""Downloaded message media cache."""
+import asyncio
+import base64
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from tg_fun.stats import StatsCollector
+
+_initial_buffer_size = 256 * 1024  # noqa: WPS432
+
+
+class DownloadBuffer:
+    """Preallocated file-like buffer reused by downloads, grows to the largest media."""
+
+    def __init__(self, size: int = _initial_buffer_size) -> None:
+        """Allocate buffer."""
+        self._storage = bytearray(size)
+        self.size = 0
+
+    def reset(self) -> None:
+        """Start the next download from the beginning."""
+        self.size = 0
+
+    def write(self, chunk: bytes) -> int:
+        """Copy downloaded chunk into the buffer."""
+        end = self.size + len(chunk)
+        if end > len(self._storage):
+            self._grow(max(end, len(self._storage) * 2))
+        self._storage[self.size:end] = chunk  # noqa: WPS362
+        self.size = end
+        return len(chunk)
+
+    def view(self) -> memoryview:
+        """Get downloaded bytes, release the view before the next download."""
+        return memoryview(self._storage)[:self.size]
+
+    def _grow(self, size: int) -> None:
+        self._storage.extend(bytes(size - len(self._storage)))
+
+
+class MediaCache:
+    """
+    Message media downloaded and encoded once per Telegram photo or document id.
+
+    Downloads are encoded in a worker thread straight from a memoryview of
+    the reused buffer, so only the base64 string is kept in the cache.
+    """
+
+    def __init__(self, stats: StatsCollector, max_items: int) -> None:
+        """Set up empty cache."""
+        self._stats = stats
+        self._max_items = max_items
+        self._buffer = DownloadBuffer()
+        self._lock = asyncio.Lock()
+        self._encoded: OrderedDict[tuple, str] = OrderedDict()
+
+    async def get_base64(self, message: Any) -> str | None:
+        """Get message media content encoded as base64 string, None if message has no media."""
+        key = media_key(message)
+        encoded = self._lookup(key)
+        if encoded is not None:
+            return encoded
+
+        async with self._lock:
+            # the same media may be downloaded while waiting for the buffer
+            encoded = self._lookup(key)
+            if encoded is None:
+                encoded = await self._download(message)
+                if encoded is None:
+                    return None
+                self._store(key, encoded)
+        return encoded
+
+    async def _download(self, message: Any) -> str | None:
+        started = asyncio.get_running_loop().time()
+        self._buffer.reset()
+        await message.download_media(file=self._buffer, thumb=-1)
+        if not self._buffer.size:
+            return None
+
+        # the buffer is not reused until encoding is done, the lock is held
+        with self._buffer.view() as downloaded:
+            encoded = await asyncio.to_thread(_encode_base64, downloaded)
+        seconds = asyncio.get_running_loop().time() - started
+        logging.debug('media %s downloaded: %d bytes in %.3f seconds', media_key(message), self._buffer.size, seconds)
+        self._stats.inc_value('media_downloads')
+        self._stats.inc_value('media_download_bytes', self._buffer.size)
+        self._stats.observe_latency('media_download', seconds)
+        return encoded
+
+    def _lookup(self, key: tuple | None) -> str | None:
+        if key is None or key not in self._encoded:
+            return None
+        self._encoded.move_to_end(key)
+        self._stats.inc_value('media_cache_hits')
+        return self._encoded[key]
+
+    def _store(self, key: tuple | None, encoded: str) -> None:
+        if key is None:
+            return
+        self._encoded[key] = encoded
+        while len(self._encoded) > self._max_items:
+            self._encoded.popitem(last=False)
+
+
+def media_key(message: Any) -> tuple | None:
+    """Telegram id of the message photo or document, None for other media."""
+    media = getattr(message, 'photo', None) or getattr(message, 'document', None)
+    if media is None:
+        return None
+    return (type(media).__name__, media.id)
+
+
+def _encode_base64(downloaded: memoryview) -> str:
+    return base64.b64encode(downloaded).decode('ascii')
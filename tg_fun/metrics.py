@@ -0,0 +1,158 @@
+"""Local HTTP endpoint with accounts stats in Prometheus text format."""
+import asyncio
+import logging
+from typing import Iterable
+
+from tg_fun.account import AccountContext
+from tg_fun.stats import StatsCollector
+
+_prefix = 'tg_fun'
+_request_timeout_seconds = 5
+
+_label_escapes = str.maketrans({'\\': r'\\', '"': r'\"', '\n': r'\n'})
+
+_Labels = dict[str, str]
+
+
+class MetricsServer:
+    """Serve `/metrics` of the accounts from the running event loop."""
+
+    def __init__(self, accounts: Iterable[AccountContext], host: str, port: int) -> None:
+        """Set up server, call `start` from the event loop."""
+        self._accounts = list(accounts)
+        self._host = host
+        self._port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        """Listen for scrape requests."""
+        self._server = await asyncio.start_server(self._serve, self._host, self._port)
+        logging.info('metrics are served on http://%s:%d/metrics', self._host, self._port)
+
+    async def close(self) -> None:
+        """Stop listening."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async with asyncio.timeout(_request_timeout_seconds):
+                request_line = await _read_request_line(reader)
+        except (TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        if _is_metrics_request(request_line):
+            writer.write(_response('200 OK', render(self._accounts).encode()))
+        else:
+            writer.write(_response('404 Not Found', b'not found\n'))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            logging.debug('metrics client disconnected')
+        finally:
+            writer.close()
+
+
+def render(accounts: Iterable[AccountContext]) -> str:
+    """Build Prometheus text exposition of the accounts stats."""
+    exposition = _Exposition()
+    for account in accounts:
+        labels = {'account': account.name}
+        exposition.add_counters(account.stats, labels)
+        exposition.add_rates(account.stats, labels)
+        exposition.add_histograms(account.stats, labels)
+    return exposition.render()
+
+
+class _Exposition:
+    """Samples grouped by metric family, families keep the first seen order."""
+
+    def __init__(self) -> None:
+        self._types: dict[str, str] = {}
+        self._samples: dict[str, list[str]] = {}
+
+    def add_counters(self, stats: StatsCollector, labels: _Labels) -> None:
+        for name, counter_value in stats.get_counters():
+            self.add('counter', f'{_prefix}_{name}_total', labels, counter_value)
+
+    def add_rates(self, stats: StatsCollector, labels: _Labels) -> None:
+        metric = f'{_prefix}_rate_per_hour'
+        for window_name in stats.windows:
+            for name, rate in stats.get_window_rates_per_hour(window_name):
+                rate_value = f'{rate:.6g}'
+                self.add('gauge', metric, labels, rate_value, counter=name, window=window_name)
+
+    def add_histograms(self, stats: StatsCollector, labels: _Labels) -> None:
+        for name, histogram in stats.histograms.items():
+            metric = f'{_prefix}_{name}_latency_seconds'
+            for bound, accumulated in histogram.cumulative():
+                self.add('histogram', metric, labels, accumulated, '_bucket', le=_bound_label(bound))
+            self.add('histogram', metric, labels, f'{histogram.total:.6f}', '_sum')
+            self.add('histogram', metric, labels, histogram.count, '_count')
+
+    def add(  # noqa: WPS211
+        self,
+        metric_type: str,
+        metric: str,
+        labels: _Labels,
+        sample_value: object,
+        suffix: str = '',
+        **extra_labels: str,
+    ) -> None:
+        self._types.setdefault(metric, metric_type)
+        label_pairs = _format_labels({**labels, **extra_labels})
+        sample_name = f'{metric}{suffix}'
+        sample = f'{sample_name}{{{label_pairs}}} {sample_value}'
+        self._samples.setdefault(metric, []).append(sample)
+
+    def render(self) -> str:
+        output = []
+        for metric, samples in self._samples.items():
+            output.append(f'# TYPE {metric} {self._types[metric]}')
+            output.extend(samples)
+        output.append('')
+        return '\n'.join(output)
+
+
+def _format_labels(labels: _Labels) -> str:
+    pairs = []
+    for label, label_value in labels.items():
+        escaped = label_value.translate(_label_escapes)
+        pairs.append(f'{label}="{escaped}"')
+    return ','.join(pairs)
+
+
+def _bound_label(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else f'{bound:g}'
+
+
+async def _read_request_line(reader: asyncio.StreamReader) -> bytes:
+    request_line = await reader.readline()
+    header = request_line
+    while header.strip():
+        # headers are skipped up to the empty line
+        header = await reader.readline()
+    return request_line
+
+
+def _is_metrics_request(request_line: bytes) -> bool:
+    parts = request_line.decode('latin-1').split()
+    if len(parts) < 2 or parts[0] != 'GET':
+        return False
+    path = parts[1].split('?')[0]
+    return path == '/metrics'
+
+
+def _response(status: str, body: bytes) -> bytes:
+    content_length = len(body)
+    head = '\r\n'.join([
+        f'HTTP/1.1 {status}',
+        'Content-Type: text/plain; version=0.0.4; charset=utf-8',
+        f'Content-Length: {content_length}',
+        'Connection: close',
+        '',
+        '',
+    ])
+    return b''.join([head.encode(), body])
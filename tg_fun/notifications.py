@@ -1,18 +1,167 @@
 """Notifications."""
+import asyncio
+import contextlib
+import enum
+import logging
+import math
+from collections import Counter, deque
 
-from tg_fun.settings import app_settings
-from tg_fun.telegram_client import client
-
-async def send_custom_channel_notify(message: str) -> None:
-    """Send message to favorites chat in telegram."""
-    if app_settings.custom_tg_channel:
-        destination = await client.get_entity(app_settings.custom_tg_channel)
-        if not destination:
-            raise RuntimeError('Custom notify dialog "{0}" not found'.format(
-                app_settings.custom_tg_channel,
-            ))
-        await client.send_message(
-            destination,
-            message=message,
-            parse_mode='markdown',
-        )
+from tg_fun.sender import SendPipeline
+from tg_fun.stats import StatsCollector
+
+_urgent_queue_size = 100
+_close_timeout_seconds = 10
+
+
+class Priority(enum.Enum):
+    """Urgent notifications are sent at once, others are sent as digest."""
+
+    HIGH = 'high'
+    LOW = 'low'
+
+
+class NotificationQueue:  # noqa: WPS214
+    """
+    Background notifications to the custom telegram channel.
+
+    Duplicates inside the window are merged and their count goes to the
+    digest when the window ends, low priority messages are coalesced by
+    key into one digest per interval. Callers never wait for telegram
+    requests. The sender is a pipeline of its own, so notifications
+    never take the send budget of the game.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        sender: SendPipeline,
+        stats: StatsCollector,
+        channel: str,
+        duplicate_window_seconds: float,
+        digest_every_seconds: float,
+    ) -> None:
+        """Set up queue, call `start` from the event loop."""
+        self._sender = sender
+        self._stats = stats
+        self._channel = channel
+        self._duplicate_window_seconds = duplicate_window_seconds
+        self._digest_every_seconds = digest_every_seconds
+
+        self._urgent: deque[str] = deque(maxlen=_urgent_queue_size)
+        self._digest: dict[str, str] = {}
+        self._digest_due: float | None = None
+        self._recent: dict[str, float] = {}
+        self._merged: Counter = Counter()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start sending worker."""
+        if self._channel:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Send what is left and stop the worker."""
+        if not self._worker:
+            return
+
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        # windows of the merged duplicates end now
+        self._expire_recent(math.inf)
+        if self._digest:
+            self._digest_due = _now()
+        try:
+            async with asyncio.timeout(_close_timeout_seconds):
+                await self._flush()
+        except TimeoutError:
+            logging.warning('notifications are dropped on exit: %d', len(self._urgent) + len(self._digest))
+
+    def notify(self, message: str, priority: Priority = Priority.HIGH, key: str | None = None) -> None:
+        """Queue notification, a newer digest message replaces one with the same key."""
+        if not self._channel:
+            return
+
+        if priority is Priority.LOW:
+            self._add_digest(key or message, message)
+            self._wakeup.set()
+            return
+
+        now = _now()
+        sent_at = self._recent.get(message)
+        if sent_at is not None and now - sent_at < self._duplicate_window_seconds:
+            self._merged[message] += 1
+            self._stats.inc_value('notifications_merged')
+            # the worker sleeps until the window ends to send the repeats count
+            self._wakeup.set()
+            return
+
+        self._recent[message] = now
+        repeats = self._merged.pop(message, 0)
+        if repeats:
+            message = f'{message} (+{repeats} more)'
+        self._urgent.append(message)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            timeout = None
+            due = self._next_due()
+            if due is not None:
+                timeout = max(0, due - _now())
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                logging.debug('notifications digest is due')
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        self._expire_recent(_now())
+        while self._urgent:
+            await self._deliver(self._urgent.popleft())
+
+        if self._digest and self._digest_due is not None and _now() >= self._digest_due:
+            digest = '\n\n'.join(self._digest.values())
+            self._digest.clear()
+            self._digest_due = None
+            await self._deliver(digest)
+
+    def _add_digest(self, key: str, message: str) -> None:
+        self._digest[key] = message
+        if self._digest_due is None:
+            self._digest_due = _now() + self._digest_every_seconds
+
+    def _expire_recent(self, now: float) -> None:
+        expired = [
+            message
+            for message, sent_at in self._recent.items()
+            if now - sent_at >= self._duplicate_window_seconds
+        ]
+        for message in expired:
+            self._recent.pop(message)
+            repeats = self._merged.pop(message, 0)
+            if repeats:
+                # the first one is already sent, so there are at least two
+                summary = '{0} (repeated {1} times)'.format(message, repeats + 1)
+                self._add_digest(f'repeated {message}', summary)
+
+    def _next_due(self) -> float | None:
+        due = [self._recent[message] + self._duplicate_window_seconds for message in self._merged]
+        if self._digest_due is not None:
+            due.append(self._digest_due)
+        return min(due, default=None)
+
+    async def _deliver(self, message: str) -> None:
+        try:
+            await self._sender.send_message(self._channel, message=message, parse_mode='markdown')
+        except Exception:
+            logging.exception('notification is not sent')
+            self._stats.inc_value('notifications_failed')
+        else:
+            self._stats.inc_value('notifications_sent')
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
@@ -1,30 +1,38 @@
 """Managers commands plugin."""
+import asyncio
+import functools
 import logging
 
-from telethon import TelegramClient, events, types
+from telethon import events, types
 
-from tg_fun import shared_state, telegram_client
+from tg_fun import profiling
+from tg_fun.account import AccountContext
 from tg_fun.game import action
 from tg_fun.game.parsers import strip_message
-from tg_fun.settings import app_settings
-from tg_fun.trainer import loop
 
 logger = logging.getLogger(__file__)
 
+_top_limit = 10
+_message_limit = 4000
 
-def setup(tg_client: TelegramClient) -> None:
+# profilers are process wide, any account manager controls them
+_profiler = profiling.SamplingProfiler()
+_memory = profiling.MemoryTracker()
+
+
+def setup(account: AccountContext) -> None:
     """Set up telegram handlers."""
-    tg_client.add_event_handler(
-        callback=_handler,
+    account.client.add_event_handler(
+        callback=functools.partial(_handler, account),
         event=events.NewMessage(
             chats=['me'],
-            pattern='!(stop|start|exit|help)',
+            pattern='!(stop|start|exit|help|profile|mem|tasks|lag)',
             func=lambda event: event.is_private,
         ),
     )
 
 
-async def _handler(event: events.NewMessage.Event) -> None:  # noqa: WPS110
+async def _handler(account: AccountContext, event: events.NewMessage.Event) -> None:  # noqa: WPS110
     """Got possible self-management commands."""
     logger.info('got self-management command "{0}"'.format(
         strip_message(event.message.message),
@@ -38,21 +46,82 @@ async def _handler(event: events.NewMessage.Event) -> None:  # noqa: WPS110
                 '!exit - force exit',
                 '!stop - pause farming',
                 '!start - resume farming',
+                '!profile start|stop - sampling CPU profile',
+                '!mem - tracemalloc snapshot and diff with the previous one',
+                '!mem stop - stop tracemalloc',
+                '!tasks - dump asyncio tasks stacks',
+                '!lag - measure event loop lag',
             ])
 
         case '!exit':
-            loop.exit_request(message='Force exit')
+            logger.info('force exit (%s)', account.name)
+            account.stop_requested.set()
+            account.energy.cancel()
             response_message = 'exit request sent'
 
         case '!stop':
             response_message = 'farming was paused'
-            shared_state.PAUSED = True
+            account.paused = True
+            account.energy.cancel()
 
         case '!start':
             response_message = 'farming was resume'
-            shared_state.PAUSED = False
-            game_user: types.InputPeerUser = await telegram_client.client.get_input_entity(app_settings.game_username)
-            await action.common_actions.ping(game_user.user_id)
+            await _resume(account)
+
+        case '!profile start' | '!profile stop' | '!mem' | '!mem stop' | '!tasks' | '!lag':
+            response_message = await _diagnostics(account, command)
 
     await event.message.mark_read()
-    await event.client.send_message('me', message=response_message)
+    await account.sender.send_message('me', message=response_message[:_message_limit])
+
+
+async def _resume(account: AccountContext) -> None:
+    account.paused = False
+    # the stall deadline starts from the resume, not from the pause
+    account.watchdog.progress()
+    game_user: types.InputPeerUser = await account.entities.get_input_entity(account.settings.game_username)
+    await action.common_actions.ping(account, game_user.user_id)
+
+
+async def _diagnostics(account: AccountContext, command: str) -> str:  # noqa: WPS212
+    directory = account.settings.profile_dir
+    match command:
+        case '!profile start':
+            if _profiler.running:
+                return 'profiler is already running'
+            _profiler.start()
+            return 'profiler started'
+
+        case '!profile stop':
+            if not _profiler.running:
+                return 'profiler is not running'
+            return await _stop_profiler(profiling.output_path(directory, account.name, 'cpu', 'folded'))
+
+        case '!mem':
+            path = profiling.output_path(directory, account.name, 'memory', 'snapshot')
+            lines = await asyncio.to_thread(_memory.snapshot, path, _top_limit)
+            return '\n'.join(lines)
+
+        case '!mem stop':
+            _memory.stop()
+            return 'tracemalloc stopped'
+
+        case '!tasks':
+            path = profiling.output_path(directory, account.name, 'tasks', 'txt')
+            return '\n'.join([*await profiling.dump_tasks(path, _top_limit), path])
+
+        case _:
+            average, maximum = await profiling.measure_loop_lag()
+            return 'event loop lag avg {0:.1f} ms, max {1:.1f} ms'.format(average * 1000, maximum * 1000)
+
+
+async def _stop_profiler(path: str) -> str:
+    seconds = _profiler.stop()
+    await asyncio.to_thread(_profiler.write_folded, path)
+    lines = ['{0} samples in {1:.0f}s, self / total:'.format(sum(_profiler.stacks.values()), seconds)]
+    lines.extend(
+        f'{self_share:.1%} / {total_share:.1%} {function}'
+        for function, self_share, total_share in _profiler.top(_top_limit)
+    )
+    lines.append(path)
+    return '\n'.join(lines)
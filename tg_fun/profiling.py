@@ -0,0 +1,187 @@
+"""
+Runtime diagnostics for a running farm.
+
+Everything is collected by background threads or on demand, so
+farming keeps running while profiling. Results are written to files,
+callers get a short top-N summary.
+"""
+import asyncio
+import io
+import os
+import pathlib
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import CodeType
+
+_default_interval_seconds = 0.005
+_lag_probe_seconds = 0.05
+_lag_probes = 20
+_mebibyte = 1024 * 1024
+
+_Stack = tuple[str, ...]
+
+
+class SamplingProfiler:
+    """Statistical CPU profiler, samples stacks of one thread from a background thread."""
+
+    def __init__(self, interval_seconds: float = _default_interval_seconds) -> None:
+        """Set up profiler, nothing is sampled until `start`."""
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter[_Stack] = Counter()
+        self._thread_id = 0
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._started_at = float(0)
+
+    @property
+    def running(self) -> bool:
+        """Profiler is sampling."""
+        return self._sampler is not None
+
+    def start(self, thread_id: int | None = None) -> None:
+        """Start sampling the thread, the current one by default."""
+        self.stacks.clear()
+        self._thread_id = thread_id or threading.get_ident()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> float:
+        """Stop sampling, return profiled seconds."""
+        if self._sampler:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        return time.perf_counter() - self._started_at
+
+    def write_folded(self, path: str) -> None:
+        """Write stacks in the folded format of flamegraph tools."""
+        with open(path, 'w', encoding='utf-8') as folded_file:
+            for stack, samples in self.stacks.most_common():
+                folded_file.write('{0} {1}\n'.format(';'.join(stack), samples))
+
+    def top(self, limit: int) -> list[tuple[str, float, float]]:
+        """Functions with the most samples: name, self and total share of samples."""
+        total_samples = sum(self.stacks.values()) or 1
+        self_samples, total = _count_functions(self.stacks)
+        return [
+            (function, self_count / total_samples, total[function] / total_samples)
+            for function, self_count in self_samples.most_common(limit)
+        ]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._thread_id)  # noqa: WPS437
+            stack = []
+            while frame is not None:
+                stack.append(_describe(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+class MemoryTracker:
+    """Tracemalloc snapshots, every snapshot is compared with the previous one."""
+
+    def __init__(self, frames: int = 1) -> None:
+        """Set up tracker, tracing starts on the first snapshot."""
+        self.frames = frames
+        self._previous: tracemalloc.Snapshot | None = None
+
+    def snapshot(self, path: str, limit: int) -> list[str]:
+        """Take and dump snapshot, return top allocation changes or a start notice."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._previous = tracemalloc.take_snapshot()
+            return ['tracemalloc started, next snapshot shows the diff']
+
+        current = tracemalloc.take_snapshot()
+        current.dump(path)
+        lines = [_memory_usage()]
+        if self._previous is not None:
+            changes = current.compare_to(self._previous, 'lineno')[:limit]
+            lines.extend(str(stat) for stat in changes)
+        self._previous = current
+        return lines
+
+    def stop(self) -> None:
+        """Stop tracing and forget snapshots."""
+        tracemalloc.stop()
+        self._previous = None
+
+
+async def dump_tasks(path: str, limit: int) -> list[str]:
+    """Write stacks of all event loop tasks, return the most common coroutines."""
+    # tasks change while the loop runs, so the stacks are collected on it and only written in a thread
+    tasks = asyncio.all_tasks()
+    coroutines, stacks = _collect_stacks(tasks)
+    await asyncio.to_thread(pathlib.Path(path).write_text, stacks, encoding='utf-8')
+    return [
+        '{0} tasks'.format(len(tasks)),
+        *('{0} {1}'.format(count, name) for name, count in coroutines.most_common(limit)),
+    ]
+
+
+async def measure_loop_lag() -> tuple[float, float]:
+    """Average and max delay of short sleeps in seconds."""
+    event_loop = asyncio.get_running_loop()
+    lags = []
+    for _ in range(_lag_probes):
+        started = event_loop.time()
+        await asyncio.sleep(_lag_probe_seconds)
+        lags.append(max(0, event_loop.time() - started - _lag_probe_seconds))
+    return sum(lags) / len(lags), max(lags)
+
+
+def output_path(directory: str, account_name: str, kind: str, extension: str) -> str:
+    """Timestamped result file path."""
+    os.makedirs(directory, exist_ok=True)
+    started = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directory, '{0}-{1}-{2}.{3}'.format(account_name, kind, started, extension))
+
+
+def _describe(code: CodeType) -> str:
+    file_name = os.path.basename(code.co_filename)
+    return '{0} ({1}:{2})'.format(code.co_qualname, file_name, code.co_firstlineno)
+
+
+def _memory_usage() -> str:
+    traced, peak = tracemalloc.get_traced_memory()
+    try:
+        import resource  # noqa: WPS433
+    except ImportError:
+        # no resource module on Windows, the traced peak is the best estimate there
+        max_rss = peak
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        max_rss = usage.ru_maxrss * 1024
+    return 'traced {0:.1f} MiB, peak {1:.1f} MiB, max rss {2:.1f} MiB'.format(
+        traced / _mebibyte,
+        peak / _mebibyte,
+        max_rss / _mebibyte,
+    )
+
+
+def _count_functions(stacks: Counter[_Stack]) -> tuple[Counter[str], Counter[str]]:
+    self_samples: Counter[str] = Counter()
+    total: Counter[str] = Counter()
+    for stack, samples in stacks.items():
+        self_samples[stack[-1]] += samples
+        total.update(dict.fromkeys(set(stack), samples))
+    return self_samples, total
+
+
+def _collect_stacks(tasks: set[asyncio.Task]) -> tuple[Counter[str], str]:
+    coroutines: Counter[str] = Counter()
+    stacks = io.StringIO()
+    for task in tasks:
+        coroutine = task.get_coro()
+        name = getattr(coroutine, '__qualname__', repr(coroutine))
+        coroutines[name] += 1
+        stacks.write(f'--- {task.get_name()}\n')
+        task.print_stack(file=stacks)
+    return coroutines, stacks.getvalue()
@@ -0,0 +1,104 @@
+"""Read acknowledgements of the game chat."""
+import asyncio
+import contextlib
+import logging
+
+from telethon import TelegramClient, errors
+
+from tg_fun.entities import STALE_ENTITY_ERRORS, EntityCache
+from tg_fun.stats import StatsCollector
+
+_close_timeout_seconds = 5
+
+
+class ReadReceipts:
+    """
+    Deferred read acknowledgements sent in background.
+
+    The chat is marked read up to the highest seen message with one
+    request per batch: when it is idle for a while or when the oldest
+    unacknowledged message waits too long. Event handling never waits for it.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        client: TelegramClient,
+        stats: StatsCollector,
+        entities: EntityCache,
+        peer: str,
+        idle_seconds: float,
+        max_delay_seconds: float,
+    ) -> None:
+        """Set up receipts, call `start` from the event loop."""
+        self._client = client
+        self._stats = stats
+        self._entities = entities
+        self._peer = peer
+        self._idle_seconds = idle_seconds
+        self._max_delay_seconds = max_delay_seconds
+
+        self._max_seen_id = 0
+        self._acknowledged_id = 0
+        self._last_seen_at = float(0)
+        self._pending = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start acknowledging worker."""
+        self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Acknowledge what is left and stop the worker."""
+        if not self._worker:
+            return
+
+        self._worker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._worker
+        with contextlib.suppress(TimeoutError):
+            async with asyncio.timeout(_close_timeout_seconds):
+                await self._acknowledge()
+
+    def seen(self, message_id: int) -> None:
+        """Remember incoming message to be acknowledged later."""
+        self._last_seen_at = _now()
+        if message_id > self._max_seen_id:
+            self._max_seen_id = message_id
+        if self._max_seen_id > self._acknowledged_id:
+            self._pending.set()
+
+    async def _run(self) -> None:
+        while True:  # noqa: WPS457
+            await self._pending.wait()
+            await self._wait_batch()
+            self._pending.clear()
+            await self._acknowledge()
+
+    async def _wait_batch(self) -> None:
+        batch_due = _now() + self._max_delay_seconds
+        # every seen message moves the idle deadline, the batch deadline is fixed
+        while (due := min(self._last_seen_at + self._idle_seconds, batch_due)) > _now():
+            await asyncio.sleep(due - _now())
+
+    async def _acknowledge(self) -> None:
+        max_id = self._max_seen_id
+        if max_id <= self._acknowledged_id:
+            return
+
+        try:
+            entity = await self._entities.get_input_entity(self._peer)
+            await self._client.send_read_acknowledge(entity, max_id=max_id)
+        except STALE_ENTITY_ERRORS as stale_error:
+            logging.warning('read acknowledge failed, entity is stale: %s', stale_error)
+            self._entities.invalidate(self._peer)
+            self._stats.inc_value('read_acknowledges_failed')
+        except errors.RPCError as rpc_error:
+            logging.warning('read acknowledge failed: %s', rpc_error)
+            self._stats.inc_value('read_acknowledges_failed')
+        else:
+            self._acknowledged_id = max_id
+            self._stats.inc_value('read_acknowledges')
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
@@ -0,0 +1,130 @@
+"""Outgoing messages pipeline with rate limits and flood waits handling."""
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, Callable
+
+from telethon import TelegramClient, errors
+
+from tg_fun import tracing
+from tg_fun.entities import STALE_ENTITY_ERRORS, EntityCache
+from tg_fun.stats import StatsCollector
+
+
+class TokenBucket:
+    """Token bucket rate limiter, waiters are served in FIFO order."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Set up full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token, return waiting time in seconds."""
+        waited = float(0)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def _refill(self) -> None:
+        now = _now()
+        if self._updated is not None:
+            refilled = self._tokens + (now - self._updated) * self.rate
+            self._tokens = min(self.capacity, refilled)
+        self._updated = now
+
+
+class SendPipeline:  # noqa: WPS214
+    """All outgoing messages and button clicks of the account."""
+
+    def __init__(  # noqa: WPS211
+        self,
+        client: TelegramClient,
+        stats: StatsCollector,
+        entities: EntityCache,
+        buckets: list[TokenBucket],
+        flood_wait_retries: int,
+    ) -> None:
+        """Set up pipeline with account and shared process buckets."""
+        self.queue_depth = 0
+        self.sent = 0
+        self._client = client
+        self._stats = stats
+        self._entities = entities
+        self._buckets = buckets
+        self._flood_wait_retries = flood_wait_retries
+
+    async def send_message(self, entity: Any, message: str, **kwargs: Any) -> float:
+        """Send message, return latency in seconds including throttling."""
+        if not isinstance(entity, str):
+            return await self._send(self._client.send_message, entity, message=message, **kwargs)
+
+        try:
+            return await self._send_to_peer(entity, message, kwargs)
+        except STALE_ENTITY_ERRORS:
+            self._entities.invalidate(entity)
+            return await self._send_to_peer(entity, message, kwargs)
+
+    async def click(self, button: Any) -> float:
+        """Click message button, return latency in seconds including throttling."""
+        return await self._send(button.click)
+
+    async def _send_to_peer(self, peer: str, message: str, kwargs: dict[str, Any]) -> float:
+        input_entity = await self._entities.get_input_entity(peer)
+        return await self._send(self._client.send_message, input_entity, message=message, **kwargs)
+
+    async def _send(self, request: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> float:
+        started = _now()
+        self.queue_depth += 1
+        try:  # noqa: WPS501
+            with tracing.span('throttle', delay=True):
+                for bucket in self._buckets:
+                    self._throttled(await bucket.acquire())
+            await self._request_with_flood_wait(functools.partial(request, *args, **kwargs))
+        finally:
+            self.queue_depth -= 1
+
+        latency = _now() - started
+        self.sent += 1
+        self._stats.inc_value('sent_messages')
+        self._stats.observe_latency('send', latency)
+        return latency
+
+    async def _request_with_flood_wait(self, request: Callable[[], Awaitable[Any]]) -> None:
+        for attempt in range(self._flood_wait_retries):
+            try:
+                await self._request(request)
+                return
+            except errors.FloodWaitError as flood_error:
+                delay = flood_error.seconds * (1 + attempt)
+                logging.warning('flood wait %d seconds (attempt %d)', delay, attempt + 1)
+                self._stats.inc_value('flood_waits')
+                with tracing.span('flood_wait', delay=True):
+                    await asyncio.sleep(delay)
+                self._throttled(delay)
+        await self._request(request)
+
+    async def _request(self, request: Callable[[], Awaitable[Any]]) -> None:
+        with tracing.span('send'):
+            await request()
+        trace = tracing.current()
+        if trace:
+            trace.mark_reply()
+
+    def _throttled(self, seconds: float) -> None:
+        if seconds:
+            self._stats.inc_value('throttled_ms', round(seconds * 1000))
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
@@ -0,0 +1,201 @@
+"""Telegram session storage with rare disk writes."""
+import base64
+import contextlib
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any
+
+from telethon.crypto import AuthKey
+from telethon.sessions.memory import MemorySession, _SentFileType  # noqa: WPS450
+from telethon.tl import types
+
+EXTENSION = '.session.json'
+_version = 1
+_write_flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+_file_mode = 0o600
+
+
+class FlushingMemorySession(MemorySession):  # noqa: WPS214
+    """
+    Session kept in memory and written to a JSON file.
+
+    Telethon asks to save the session every minute and writes entities
+    of every response; here changes only mark the session dirty and the
+    file is replaced atomically at most once per flush interval, on a new
+    auth key and on close. Telethon generates a new key into the same
+    `AuthKey` object, so the key bytes are compared with the flushed ones.
+    An existing SQLite session of the same name is imported once, so no
+    new login is needed.
+    """
+
+    _auth_key: AuthKey | None
+    _takeout_id: int | None
+
+    def __init__(self, session: str, flush_seconds: float) -> None:
+        """Load session file or import the SQLite session."""
+        super().__init__()
+        self.path = f'{session}{EXTENSION}'
+        self.flushes = 0
+        self._flush_seconds = flush_seconds
+        self._flushed_at = time.monotonic()
+        self._flushed_key: bytes | None = None
+        self._dirty = False
+        self._entity_rows: dict[int, tuple] = {}
+
+        if os.path.exists(self.path):
+            self._load()
+            self._flushed_key = _key_bytes(self._auth_key)
+        elif os.path.exists(f'{session}.session'):
+            self._import_sqlite(f'{session}.session')
+            self._flush()
+
+    @MemorySession.auth_key.setter  # type: ignore
+    def auth_key(self, auth_key: AuthKey | None) -> None:
+        """Login result must never be lost, a new key is written at once."""
+        self._auth_key = auth_key
+        # telethon sets the same key again on every connect
+        if self._has_new_key():
+            self._flush()
+
+    def set_dc(self, dc_id: int, server_address: str, port: int) -> None:
+        """Switch data center."""
+        super().set_dc(dc_id, server_address, port)
+        self._dirty = True
+
+    def set_update_state(self, entity_id: int, state: types.updates.State) -> None:
+        """Remember update state, unchanged states do not dirty the session."""
+        if _state_numbers(self._update_states.get(entity_id)) != _state_numbers(state):
+            self._dirty = True
+        super().set_update_state(entity_id, state)
+
+    def process_entities(self, tlo: Any) -> None:
+        """Remember entities by id, known entities do not dirty the session."""
+        changed = False
+        for row in self._entities_to_rows(tlo):
+            if self._entity_rows.get(row[0]) != row:
+                self._entity_rows[row[0]] = row
+                changed = True
+        if changed:
+            self._entities = set(self._entity_rows.values())
+            self._dirty = True
+
+    def cache_file(self, md5_digest: bytes, file_size: int, instance: Any) -> None:
+        """Remember uploaded file."""
+        super().cache_file(md5_digest, file_size, instance)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write a new auth key at once, other changes once per flush interval."""
+        is_due = time.monotonic() - self._flushed_at >= self._flush_seconds
+        if self._has_new_key() or (self._dirty and is_due):
+            self._flush()
+
+    def close(self) -> None:
+        """Write pending changes."""
+        if self._dirty or self._has_new_key():
+            self._flush()
+
+    def delete(self) -> None:
+        """Remove session file on log out."""
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
+
+    def _has_new_key(self) -> bool:
+        return _key_bytes(self._auth_key) != self._flushed_key
+
+    def _flush(self) -> None:
+        temporary_path = f'{self.path}.tmp'
+        descriptor = os.open(temporary_path, _write_flags, _file_mode)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as session_file:
+            json.dump(self._dump(), session_file, separators=(',', ':'))
+            session_file.flush()
+            os.fsync(session_file.fileno())
+        os.replace(temporary_path, self.path)
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+        self._flushed_key = _key_bytes(self._auth_key)
+        self.flushes += 1
+
+    def _dump(self) -> dict[str, Any]:
+        auth_key = _key_bytes(self._auth_key)
+        return {
+            'version': _version,
+            'dc_id': self._dc_id,
+            'server_address': self._server_address,
+            'port': self._port,
+            'auth_key': base64.b64encode(auth_key).decode() if auth_key else None,
+            'takeout_id': self._takeout_id,
+            'entities': list(self._entity_rows.values()),
+            'update_states': {
+                entity_id: [state.pts, state.qts, state.date.timestamp(), state.seq]
+                for entity_id, state in self._update_states.items()
+            },
+            'files': self._dump_files(),
+        }
+
+    def _dump_files(self) -> list[list]:
+        return [
+            [base64.b64encode(md5_digest).decode(), file_size, file_type.value, *file_reference]
+            for (md5_digest, file_size, file_type), file_reference in self._files.items()
+        ]
+
+    def _load(self) -> None:
+        with open(self.path, encoding='utf-8') as session_file:
+            session = json.load(session_file)
+
+        self._set_connection(session, base64.b64decode(session['auth_key'] or ''))
+        self._set_entity_rows(session['entities'])
+        self._set_update_states(
+            (entity_id, *state)
+            for entity_id, state in session['update_states'].items()
+        )
+        self._load_files(session['files'])
+
+    def _load_files(self, files: list[list]) -> None:
+        for md5_digest, file_size, file_type, *file_reference in files:
+            file_key = (base64.b64decode(md5_digest), file_size, _SentFileType(file_type))
+            self._files[file_key] = tuple(file_reference)
+
+    def _import_sqlite(self, path: str) -> None:
+        logging.info('import sqlite session %s to %s', path, self.path)
+        with contextlib.closing(sqlite3.connect(path)) as connection:
+            connection.row_factory = sqlite3.Row
+            session = connection.execute('select dc_id, server_address, port, auth_key, takeout_id from sessions').fetchone()
+            if session:
+                self._set_connection(session, session['auth_key'])
+            self._set_entity_rows(connection.execute('select id, hash, username, phone, name from entities'))
+            self._set_update_states(connection.execute('select id, pts, qts, date, seq from update_state'))
+
+    def _set_connection(self, session: Any, auth_key: bytes | None) -> None:
+        self._dc_id = session['dc_id']
+        self._server_address = session['server_address']
+        self._port = session['port']
+        self._auth_key = AuthKey(auth_key) if auth_key else None
+        self._takeout_id = session['takeout_id']
+
+    def _set_entity_rows(self, rows: Any) -> None:
+        self._entity_rows = {row[0]: tuple(row) for row in rows}
+        self._entities = set(self._entity_rows.values())
+
+    def _set_update_states(self, rows: Any) -> None:
+        for entity_id, pts, qts, timestamp, seq in rows:
+            self._update_states[int(entity_id)] = _update_state(pts, qts, timestamp, seq)
+
+
+def _key_bytes(auth_key: AuthKey | None) -> bytes | None:
+    return auth_key.key if auth_key else None
+
+
+def _state_numbers(state: types.updates.State | None) -> tuple[int, int, int] | None:
+    if state is None:
+        return None
+    return state.pts, state.qts, state.seq
+
+
+def _update_state(pts: int, qts: int, timestamp: float, seq: int) -> types.updates.State:
+    date = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+    return types.updates.State(pts, qts, date, seq, unread_count=0)
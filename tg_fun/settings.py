@@ -1,4 +1,5 @@
 """Application settings."""
+import functools
 import os
 from typing import Literal
 
@@ -19,13 +20,28 @@ class AppSettings(BaseSettings):
     # required customer settings
     telegram_api_id: int = 123456
     telegram_api_hash: str = 'u_api_hash'
+    telegram_sessions: list[str] = Field(default=['.tg_fun'], description='One farming account per session.')
 
     # optional customer settings
+    session_storage: Literal['sqlite', 'memory'] = Field(
+        default='sqlite',
+        description='Memory sessions are flushed to `<session>.session.json` periodically and on shutdown.',
+    )
+    session_flush_seconds: float = Field(default=5 * 60, description='Memory session write interval.')
     minimum_hp_level_for_grinding: int = Field(default=60, ge=1, le=100)
     notifications_enabled: bool = False
     custom_tg_channel: str = ''
+    notify_duplicate_window_seconds: int = Field(default=10 * 60, description='Same alerts are merged meanwhile.')
+    notify_digest_every_seconds: int = Field(default=60 * 60, description='Stats and other low priority digest.')
+    notify_rate_per_minute: float = Field(default=10, gt=0, description='Notifications have own limit, not the game one.')
+    notify_burst: int = Field(default=3, ge=1)
     self_manager_enabled: bool = False
     farm_dangeons: bool = Field(default=False)
+    captcha_solver: str = Field(default='', description="'library' or 'module:Class', notify only if empty.")
+    captcha_library_dir: str = Field(default='captcha', description='Solved captcha images by answer.')
+    captcha_min_confidence: float = Field(default=0.9, ge=0, le=1, description='Less confident answers are notified.')
+    captcha_solve_timeout_seconds: float = 30
+    captcha_workers: int = Field(default=1, ge=1)
 
     # developer section
     fast_mode: bool = Field(default=False)
@@ -34,13 +50,46 @@ class AppSettings(BaseSettings):
     game_username: str = 'rf_telegram_bot'
     tlg_client_retries: int = 30
     tlg_client_retry_delay: int = 15
+    send_rate_per_second: float = Field(default=1, gt=0, description='Outgoing messages limit per account.')
+    send_burst: int = Field(default=3, ge=1)
+    process_send_rate_per_second: float = Field(default=20, gt=0, description='Outgoing messages limit for all accounts.')
+    process_send_burst: int = Field(default=30, ge=1)
+    flood_wait_retries: int = 3
+    watchdog_enabled: bool = Field(default=True, description='Ping the game bot when the conversation is stuck.')
+    watchdog_initial_timeout_seconds: float = Field(default=120, description='Until the response time is learned.')
+    watchdog_min_timeout_seconds: float = 30
+    watchdog_max_timeout_seconds: float = 15 * 60
+    read_ack_idle_seconds: float = Field(default=10, description='Game chat is marked read when idle for.')
+    read_ack_max_delay_seconds: float = Field(default=60, description='Or when the oldest unread message waits for.')
+    media_cache_size: int = Field(default=32, ge=1, description='Downloaded captcha images kept in memory.')
+    entity_cache_ttl_seconds: int = Field(default=24 * 60 * 60, description='Resolved entities are reused meanwhile.')
     debug: bool = Field(default=False)
     message_log_limit: int = 1000
-    wait_loop_iteration_seconds: int = 3
+    log_format: Literal['text', 'json'] = 'text'
+    log_file: str = Field(default='', description='Rotated and gzipped log file, stderr if empty.')
+    log_max_bytes: int = 50 * 1024 * 1024
+    log_backups: int = 10
+    log_queue: bool = Field(default=True, description='Format and write logs in the background thread.')
+    event_log_sample_every: int = Field(default=1, ge=1, description='Log every Nth event of a repeated state.')
+    event_journal_path: str = Field(default='', description='Record every incoming game event, disabled if empty.')
+    event_journal_flush_seconds: float = Field(default=1, gt=0, description='Journal records are written in batches.')
+    energy_regeneration_seconds: int = Field(default=180, description='Initial guess, learned while farming.')
     show_stats_every_seconds: int = 30 * 60
+    snapshot_dir: str = Field(default='', description='Save state and entities for warm restarts, disabled if empty.')
+    snapshot_every_seconds: int = 60
+    snapshot_max_age_seconds: int = Field(default=60 * 60, description='Older snapshot restores stats only.')
+    slow_event_log_seconds: float = Field(default=0, description='Log events with overhead above, disabled if 0.')
+    event_loop: Literal['asyncio', 'uvloop'] = Field(default='asyncio', description='uvloop is used if installed.')
+    loop_lag_interval_seconds: float = Field(default=1, description='Event loop lag sampling, disabled if 0.')
+    loop_blocked_seconds: float = Field(default=0.5, description='Log event loop stack when blocked longer.')
+    metrics_port: int = Field(default=0, description='Serve Prometheus metrics on localhost, disabled if 0.')
+    metrics_host: str = '127.0.0.1'
+    profile_dir: str = Field(default='profiles', description='Results of the self-management profiling commands.')
 
-app_settings = AppSettings(
-    _env_file=os.path.join(APP_PATH, '.env'),  # type: ignore
-)
 
-game_bot_name = app_settings.game_username
+@functools.cache
+def get_settings() -> AppSettings:
+    """Read application settings on the first call, nothing is read at import time."""
+    return AppSettings(
+        _env_file=os.path.join(APP_PATH, '.env'),  # type: ignore
+    )
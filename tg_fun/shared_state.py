@@ -1,2 +0,0 @@
-"""Shared data variables."""
-PAUSED: bool = False
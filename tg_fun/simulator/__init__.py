@@ -0,0 +1,6 @@
+"""
+Local game bot simulator.
+
+Runs the real farming loop against an in-process fake of the game bot
+without network and with accelerated time.
+"""
@@ -0,0 +1,198 @@
+"""Fake game bot logic."""
+import random
+from collections import Counter
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Sequence
+
+from tg_fun.game.buttons import ATTACK, FIND_MONSTER, HEAL, TO_DANGEONS, TO_FIGHT_ZONE, TO_LOCATIONS, TO_TOWN, YES
+
+Keyboard = Sequence[Sequence[str]]
+Clock = Callable[[], float]
+
+TOWN_KEYBOARD: Keyboard = (
+    (f'{HEAL} Лечиться', f'{TO_LOCATIONS} Локации'),
+    (f'{TO_DANGEONS} Данжи', '🎒 Инвентарь'),
+)
+LOCATIONS_KEYBOARD: Keyboard = ((f'{TO_FIGHT_ZONE} Тихий лес', f'{TO_TOWN} В город'),)
+FIGHT_ZONE_KEYBOARD: Keyboard = (
+    (f'{FIND_MONSTER} Искать монстра', f'{ATTACK} Атаковать'),
+    (f'{TO_TOWN} В город',),
+)
+DANGEON_KEYBOARD: Keyboard = ((f'{TO_DANGEONS} Вперед', f'{TO_TOWN} В город'),)
+APPROVE_DANGEON_KEYBOARD: Keyboard = ((f'{YES}Да', '❌Нет'),)
+
+_town = 'town'
+_locations = 'locations'
+_fight_zone = 'fight_zone'
+_dangeon = 'dangeon'
+_keyboards = MappingProxyType({
+    _town: TOWN_KEYBOARD,
+    _locations: LOCATIONS_KEYBOARD,
+    _fight_zone: FIGHT_ZONE_KEYBOARD,
+    _dangeon: DANGEON_KEYBOARD,
+})
+_monster_levels = (10, 15)
+_fight_damage = (5, 30)
+
+
+@dataclass
+class BotReply:
+    """Game bot message."""
+
+    text: str
+    keyboard: Keyboard | None = None
+    inline: bool = False
+    edit: bool = False
+    delay: float = 0
+
+
+class GameBotSimulator:  # noqa: WPS214
+    """
+    Simplified game rules with the same messages and keyboards as the real bot.
+
+    Time is taken from `clock`, so energy regeneration follows the event loop time.
+    """
+
+    max_hp = 120
+    max_energy = 20
+    energy_regen_seconds = 180
+    revive_seconds = 300
+    dangeon_seconds = 60
+
+    def __init__(self, clock: Clock, seed: int | str | None = None) -> None:
+        """Create character in town with full HP and energy."""
+        self.actions: Counter = Counter()
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._location = _town
+        self._monster_found = False
+        self._hp = self.max_hp
+        self._energy = self.max_energy
+        self._energy_time = clock()
+
+    @property
+    def energy(self) -> int:
+        """Current energy with regeneration."""
+        regenerated = int((self._clock() - self._energy_time) // self.energy_regen_seconds)
+        return min(self.max_energy, self._energy + regenerated)
+
+    def handle_text(self, text: str) -> list[BotReply]:  # noqa: WPS212, WPS231
+        """Get replies for the message or pressed reply keyboard button."""
+        self.actions['messages'] += 1
+        if text == '/buttons':
+            return [self._reply('Держи кнопочки!\nВыбери действие.', _keyboards[self._location])]
+        if text.startswith('/go_dange_'):
+            return [self._reply('Ты уверен что хочешь попробовать пройти данж?', APPROVE_DANGEON_KEYBOARD, inline=True)]
+        if HEAL in text:
+            return self._heal()
+        if TO_LOCATIONS in text:
+            self._location = _locations
+            return [self._reply('Пора в бой!\nВыбери локацию для охоты.', LOCATIONS_KEYBOARD)]
+        if TO_FIGHT_ZONE in text:
+            self._location = _fight_zone
+            self._monster_found = True
+            return [self._reply(
+                f'Ты в локации {TO_FIGHT_ZONE}Тихий лес.\nНа пути у вас встретился {FIND_MONSTER}Волк (ур. 10)',
+                FIGHT_ZONE_KEYBOARD,
+            )]
+        if FIND_MONSTER in text:
+            return self._find_monster()
+        if ATTACK in text:
+            return self._attack()
+        if TO_TOWN in text:
+            self._location = _town
+            self._monster_found = False
+            return [self._reply(f'Ты дошел до локации {TO_TOWN}Город.', TOWN_KEYBOARD)]
+        if TO_DANGEONS in text:
+            return self._dangeon()
+        return [self._reply('Не понимаю тебя. Держи кнопочки!', _keyboards[self._location])]
+
+    def handle_click(self, button_text: str) -> list[BotReply]:
+        """Get replies for the pressed inline button."""
+        self.actions['clicks'] += 1
+        if YES not in button_text:
+            return [BotReply('Ну как хочешь.', edit=True)]
+        if self.energy < 2:
+            return [BotReply('[у кого-то в группе меньше 2 единиц энергии]', edit=True)]
+
+        self._spend_energy(2)
+        self._location = _town
+        self.actions['dangeons'] += 1
+        return [
+            BotReply('Данж запущен, ждем остальных участников.', edit=True),
+            self._reply(
+                'Поздравляем! Вы успешно прошли данж 🕳Пещера.',
+                TOWN_KEYBOARD,
+                delay=self.dangeon_seconds,
+            ),
+        ]
+
+    def _heal(self) -> list[BotReply]:
+        self._hp = self.max_hp
+        self.actions['heals'] += 1
+        return [self._reply('Здоровье пополнено.', TOWN_KEYBOARD)]
+
+    def _find_monster(self) -> list[BotReply]:
+        if self.energy < 1:
+            return [self._reply('Недостаточно энергии для поиска монстра.', FIGHT_ZONE_KEYBOARD)]
+        self._monster_found = True
+        level = self._random.randint(*_monster_levels)
+        return [self._reply(
+            f'Ты наткнулся на {FIND_MONSTER}Волк (ур. {level})',
+            FIGHT_ZONE_KEYBOARD,
+        )]
+
+    def _attack(self) -> list[BotReply]:
+        if not self._monster_found:
+            return [self._reply('Вы ещё не нашли монстра.', FIGHT_ZONE_KEYBOARD)]
+        if self.energy < 1:
+            return [self._reply('Недостаточно энергии для атаки.', FIGHT_ZONE_KEYBOARD)]
+
+        self._spend_energy(1)
+        self._monster_found = False
+        self._hp -= self._random.randint(*_fight_damage)
+        self.actions['fights'] += 1
+        if self._hp > 0:
+            self.actions['wins'] += 1
+            return [self._reply(
+                f'Ты одержал победу над {FIND_MONSTER}Волк!\nПолучено: 35 опыта, 12 золота.',
+                FIGHT_ZONE_KEYBOARD,
+            )]
+
+        self.actions['deaths'] += 1
+        self._hp = self.max_hp
+        self._location = _town
+        return [
+            BotReply(f'К сожалению ты умер. Ты воскреснешь в {TO_TOWN}Город через 5 минут.'),
+            self._reply('Ты снова жив! Береги себя.', TOWN_KEYBOARD, delay=self.revive_seconds),
+        ]
+
+    def _dangeon(self) -> list[BotReply]:
+        if self._location == _dangeon:
+            return [self._reply('Какой данж запустим?\n/go_dange_10000 - Пещера')]
+        self._location = _dangeon
+        return [self._reply('Вперед на встречу с монстрами!', DANGEON_KEYBOARD)]
+
+    def _spend_energy(self, amount: int) -> None:
+        now = self._clock()
+        current_energy = self.energy
+        if current_energy == self.max_energy:
+            self._energy_time = now
+        else:
+            # keep regeneration progress of the current point
+            regenerated = int((now - self._energy_time) // self.energy_regen_seconds)
+            self._energy_time += regenerated * self.energy_regen_seconds
+        self._energy = current_energy - amount
+
+    def _reply(
+        self,
+        text: str,
+        keyboard: Keyboard | None = None,
+        inline: bool = False,
+        delay: float = 0,
+    ) -> BotReply:
+        hp_status = f'❤{self._hp}/{self.max_hp}'
+        energy_status = f'🔋{self.energy}/{self.max_energy}'
+        text = f'{text}\n{hp_status} {energy_status}'
+        return BotReply(text, keyboard, inline=inline, delay=delay)
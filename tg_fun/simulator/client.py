@@ -0,0 +1,229 @@
+"""Fake telegram client connected to the simulated game bot."""
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable
+
+from telethon import events, types
+
+from tg_fun.settings import AppSettings
+from tg_fun.simulator.bot import BotReply, GameBotSimulator
+
+GAME_BOT_ID = 100500
+_response_delay = (0.3, 1.5)
+
+
+class SimulatedButton:
+    """Keyboard button."""
+
+    def __init__(self, message: 'SimulatedMessage', text: str, inline: bool) -> None:
+        """Create button of the message."""
+        self.text = text
+        self.inline = inline
+        self._message = message
+
+    async def click(self) -> None:
+        """Press button like telethon MessageButton does."""
+        if self.inline:
+            await self._message.client.click_inline(self.text)
+        else:
+            await self._message.client.send_message(GAME_BOT_ID, self.text)
+
+
+class SimulatedMessage:  # noqa: WPS230
+    """Game bot message."""
+
+    def __init__(self, client: 'SimulatedClient', message_id: int, reply: BotReply) -> None:
+        """Create message from the bot reply."""
+        self.client = client
+        self.id = message_id  # noqa: WPS125
+        self.chat_id = GAME_BOT_ID
+        self.media = None
+        self.message = ''
+        self.buttons: list[list[SimulatedButton]] | None = None
+        self.reply_markup: types.TypeReplyMarkup | None = None
+        self.update(reply)
+
+    def update(self, reply: BotReply) -> None:
+        """Replace content by edit."""
+        self.message = reply.text
+        self.buttons = None
+        self.reply_markup = types.ReplyInlineMarkup(rows=[]) if reply.inline else None
+        if reply.keyboard:
+            self.buttons = [
+                [SimulatedButton(self, button_text, reply.inline) for button_text in row]
+                for row in reply.keyboard
+            ]
+
+    async def mark_read(self) -> None:
+        """Mark conversation as read."""
+        await self.client.send_read_acknowledge(self.chat_id, max_id=self.id)
+
+    async def download_media(self, *args: Any, **kwargs: Any) -> None:
+        """Do nothing, simulated messages have no media."""
+
+
+class SimulatedEvent:
+    """NewMessage or MessageEdited event."""
+
+    def __init__(self, message: SimulatedMessage, edited: bool = False) -> None:
+        """Create event for the message."""
+        self.message = message
+        self.edited = edited
+        self.client = message.client
+        self.chat_id = message.chat_id
+        self.is_private = True
+
+
+class SimulatedClient:  # noqa: WPS214
+    """Subset of telethon TelegramClient API used by the project."""
+
+    def __init__(self, session: str, settings: AppSettings) -> None:
+        """Create client with own simulated game bot."""
+        self.session = session
+        self.stats: dict[str, int] = {'read_acknowledges': 0, 'events': 0, 'sent': 0, 'resolves': 0}
+        self.response_times: list[float] = []
+        self._settings = settings
+        self._handlers: list[tuple[events.NewMessage, Callable]] = []
+        self._last_message: SimulatedMessage | None = None
+        self._last_message_id = 0
+        self._delivered_at: float | None = None
+        self._timers: set[asyncio.TimerHandle] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._random = random.Random(session)
+        self.bot = GameBotSimulator(clock=self._time, seed=session)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Running event loop."""
+        return asyncio.get_running_loop()
+
+    async def __aenter__(self) -> 'SimulatedClient':
+        """Connect."""
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        """Disconnect and drop undelivered bot replies."""
+        for timer in self._timers:
+            timer.cancel()
+        for task in self._tasks:
+            task.cancel()
+
+    async def get_me(self) -> SimpleNamespace:
+        """Get simulated user."""
+        return SimpleNamespace(id=1, username=self.session)
+
+    async def get_input_entity(self, peer: Any) -> SimpleNamespace:
+        """Resolve game bot or any other peer."""
+        self.stats['resolves'] += 1
+        if peer in {GAME_BOT_ID, self._settings.game_username}:
+            return SimpleNamespace(user_id=GAME_BOT_ID)
+        return SimpleNamespace(user_id=abs(hash(peer)))
+
+    async def get_entity(self, peer: Any) -> SimpleNamespace:
+        """Resolve game bot or any other peer."""
+        return await self.get_input_entity(peer)
+
+    async def send_read_acknowledge(self, entity: Any, message: Any = None, max_id: int | None = None) -> bool:
+        """Mark game bot conversation as read."""
+        self.stats['read_acknowledges'] += 1
+        return True
+
+    def add_event_handler(self, callback: Callable, event: events.NewMessage) -> None:
+        """Register handler, only game bot messages are emitted."""
+        self._handlers.append((event, callback))
+
+    async def send_message(self, entity: Any, message: str = '', **kwargs: Any) -> SimpleNamespace:
+        """Send message, game bot answers with the usual response delay."""
+        # resolved input peers are accepted like telethon does
+        if getattr(entity, 'user_id', entity) not in {GAME_BOT_ID, self._settings.game_username}:
+            logging.debug('simulator skips message to %s: %s', entity, message)
+            return SimpleNamespace(message=message)
+
+        self._track_response()
+        self._schedule(self.bot.handle_text(message))
+        return SimpleNamespace(message=message)
+
+    async def click_inline(self, button_text: str) -> None:
+        """Press inline button of the last bot message."""
+        self._track_response()
+        self._schedule(self.bot.handle_click(button_text))
+
+    def _track_response(self) -> None:
+        self.stats['sent'] += 1
+        if self._delivered_at is not None:
+            self.response_times.append(time.perf_counter() - self._delivered_at)
+            self._delivered_at = None
+
+    def _schedule(self, replies: list[BotReply]) -> None:
+        for reply in replies:
+            delay = reply.delay or self._random.uniform(*_response_delay)
+            timer = self.loop.call_later(delay, self._deliver, reply)
+            self._timers.add(timer)
+
+    def _deliver(self, reply: BotReply) -> None:
+        self._forget_fired_timers()
+
+        if reply.edit and self._last_message:
+            message = self._last_message
+            message.update(reply)
+            builder_type: type = events.MessageEdited
+        else:
+            self._last_message_id += 1
+            message = SimulatedMessage(self, self._last_message_id, reply)
+            self._last_message = message
+            builder_type = events.NewMessage
+
+        self.stats['events'] += 1
+        self._delivered_at = time.perf_counter()
+        event = SimulatedEvent(message, edited=builder_type is events.MessageEdited)
+        self._dispatch(event, builder_type)
+
+    def _dispatch(self, event: SimulatedEvent, builder_type: type) -> None:
+        for builder, callback in self._handlers:
+            if type(builder) is builder_type and getattr(builder, 'chats', None) is None:  # noqa: WPS516
+                task = self.loop.create_task(callback(event))
+                self._tasks.add(task)
+                task.add_done_callback(self._handler_done)
+
+    def _handler_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logging.error('simulated event handler failed', exc_info=task.exception())
+
+    def _time(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _forget_fired_timers(self) -> None:
+        now = self._time()
+        self._timers = {timer for timer in self._timers if timer.when() > now}
+
+
+class ReplayClient:
+    """Client with stubbed out sends."""
+
+    def __init__(self) -> None:
+        """Create client without connection."""
+        self.stats: Counter = Counter()
+
+    async def send_message(self, entity: Any, message: str = '', **kwargs: Any) -> SimpleNamespace:
+        """Log message instead of sending."""
+        self.stats['sent'] += 1
+        logging.info('replay send to %s: %s', entity, message)
+        return SimpleNamespace(message=message)
+
+    async def click_inline(self, button_text: str) -> None:
+        """Log inline button click."""
+        self.stats['clicks'] += 1
+        logging.info('replay click %s', button_text)
+
+    async def get_entity(self, peer: Any) -> SimpleNamespace:
+        """Resolve any peer."""
+        return SimpleNamespace(user_id=abs(hash(peer)))
+
+    async def get_input_entity(self, peer: Any) -> SimpleNamespace:
+        """Resolve any peer."""
+        return await self.get_entity(peer)
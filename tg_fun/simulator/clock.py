@@ -0,0 +1,33 @@
+"""Event loop with accelerated time."""
+import asyncio
+import selectors
+import time
+
+
+class _ScaledSelector(selectors.DefaultSelector):  # type: ignore
+    def __init__(self, speed: float) -> None:
+        super().__init__()
+        self._speed = speed
+
+    def select(self, timeout: float | None = None) -> list:  # type: ignore
+        if timeout is not None:
+            timeout /= self._speed
+        return super().select(timeout)
+
+
+class AcceleratedEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop where time goes `speed` times faster.
+
+    All sleeps, timeouts and loop.time() based clocks are accelerated.
+    """
+
+    def __init__(self, speed: float) -> None:
+        """Create loop with the time multiplier."""
+        self._speed = speed
+        self._real_start = time.monotonic()
+        super().__init__(selector=_ScaledSelector(speed))
+
+    def time(self) -> float:
+        """Accelerated monotonic time."""
+        return self._real_start + (time.monotonic() - self._real_start) * self._speed
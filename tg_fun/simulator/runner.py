@@ -0,0 +1,80 @@
+"""Farming throughput run against the simulated game bot."""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from tg_fun.settings import AppSettings, get_settings
+from tg_fun.simulator.client import SimulatedClient
+from tg_fun.simulator.clock import AcceleratedEventLoop
+from tg_fun.trainer import farming
+
+_default_speed = 600
+_report_line = '; '.join((
+    '{0}: actions {1:.1f}/h',
+    'fights {2:.1f}/h',
+    'events {3}',
+    'read acks {4}',
+    'latency avg {5:.2f} ms, max {6:.2f} ms',
+))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run farming for all simulated accounts and print throughput report."""
+    parser = argparse.ArgumentParser(description='Farming against the local game bot simulator.')
+    parser.add_argument('--accounts', type=int, default=1, help='simulated accounts count')
+    parser.add_argument('--minutes', type=int, default=60, help='simulated farming time')
+    parser.add_argument('--speed', type=float, default=_default_speed, help='time acceleration')
+    args = parser.parse_args(argv)
+
+    clients = run(args.accounts, args.minutes, args.speed)
+    print(report(clients, args.minutes))  # noqa: WPS421
+
+
+def run(accounts: int, minutes: int, speed: float) -> list[SimulatedClient]:
+    """Run farming.main in fast mode with accelerated time."""
+    _configure(accounts)
+    clients: list[SimulatedClient] = []
+
+    def client_factory(session: str, settings: AppSettings) -> SimulatedClient:  # noqa: WPS430
+        sim_client = SimulatedClient(session, settings)
+        clients.append(sim_client)
+        return sim_client
+
+    started = time.perf_counter()
+    with asyncio.Runner(loop_factory=lambda: AcceleratedEventLoop(speed)) as runner:
+        runner.run(farming.main(minutes, client_factory=client_factory))
+    logging.info('simulation finished in %.1f seconds', time.perf_counter() - started)
+    return clients
+
+
+def _configure(accounts: int) -> None:
+    app_settings = get_settings()
+    app_settings.fast_mode = True
+    # accelerated time multiplies the measured lag by the speed
+    app_settings.loop_lag_interval_seconds = 0
+    # simulated runs leave no journal, snapshots or listening port behind
+    app_settings.event_journal_path = ''
+    app_settings.snapshot_dir = ''
+    app_settings.metrics_port = 0
+    numbers = range(1, accounts + 1)
+    app_settings.telegram_sessions = [f'simulator-{number}' for number in numbers]
+
+
+def report(clients: list[SimulatedClient], minutes: int) -> str:
+    """Actions per simulated hour and handlers latency."""
+    hours = minutes / 60
+    lines = []
+    for sim_client in clients:
+        latency = sim_client.response_times or [0]
+        lines.append(_report_line.format(
+            sim_client.session,
+            sim_client.stats['sent'] / hours,
+            sim_client.bot.actions['fights'] / hours,
+            sim_client.stats['events'],
+            sim_client.stats['read_acknowledges'],
+            statistics.fmean(latency) * 1000,
+            max(latency) * 1000,
+        ))
+    return '\n'.join(lines)
@@ -1,26 +1,169 @@
 """Stats collector module."""
-import logging
+import bisect
 import time
 from collections import Counter
 
-from tg_fun.notifications import send_custom_channel_notify
+_second_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+LATENCY_BUCKETS = (*_second_buckets, 10, 30, 60)
+LAG_BUCKETS = (0.0005, 0.001, 0.0025, *_second_buckets)
 
 
-class StatsCollector:
+class RollingWindow:
+    """Counters of the last window split into ring buffer slots."""
+
+    def __init__(self, seconds: int, slot_seconds: int) -> None:
+        """Set up empty slots."""
+        self.seconds = seconds
+        self._slot_seconds = slot_seconds
+        slots_count = seconds // slot_seconds
+        self._slots: list[Counter] = [Counter() for _ in range(slots_count)]
+        self._slot_ids: list[int] = [-1 for _ in range(slots_count)]
+
+    def reset(self) -> None:
+        """Drop all slots."""
+        for slot in self._slots:
+            slot.clear()
+        self._slot_ids = [-1 for _ in self._slots]
+
+    def inc_value(self, name: str, increment: int, now: float) -> None:
+        """Add value to the current slot, the oldest slot is reused."""
+        slot_id = int(now // self._slot_seconds)
+        index = slot_id % len(self._slots)
+        if self._slot_ids[index] != slot_id:
+            self._slots[index].clear()
+            self._slot_ids[index] = slot_id
+        self._slots[index][name] += increment
+
+    def dump(self) -> dict:
+        """Slots for the snapshot."""
+        return {'slot_ids': self._slot_ids, 'slots': [dict(slot) for slot in self._slots]}
+
+    def restore(self, dumped: dict) -> None:
+        """Load slots of the same window from the snapshot."""
+        if len(dumped['slots']) != len(self._slots):
+            return
+        self._slot_ids = list(dumped['slot_ids'])
+        self._slots = [Counter(slot) for slot in dumped['slots']]
+
+    def get_counters(self, now: float) -> Counter:
+        """Sum of the slots inside the window."""
+        oldest_slot_id = int(now // self._slot_seconds) - len(self._slots)
+        total: Counter = Counter()
+        for slot_id, slot in zip(self._slot_ids, self._slots):
+            if slot_id > oldest_slot_id:
+                total.update(slot)
+        return total
+
+
+class LatencyHistogram:
+    """Fixed buckets histogram in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Set up empty histogram."""
+        self.buckets = buckets
+        self.counts = [0 for _ in range(len(buckets) + 1)]
+        self.total = float(0)
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Add one measurement."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def dump(self) -> dict:
+        """Dump counts for the snapshot."""
+        return {'buckets': self.buckets, 'counts': self.counts, 'total': self.total, 'count': self.count}
+
+    @classmethod
+    def load(cls, dumped: dict) -> 'LatencyHistogram':
+        """Create histogram from the snapshot."""
+        histogram = cls(tuple(dumped['buckets']))
+        histogram.counts = list(dumped['counts'])
+        histogram.total = dumped['total']
+        histogram.count = dumped['count']
+        return histogram
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Count measurements less or equal to every bucket bound, inf is last."""
+        bounds = [*self.buckets, float('inf')]
+        cumulative_counts = []
+        accumulated = 0
+        for bound, bucket_count in zip(bounds, self.counts):
+            accumulated += bucket_count
+            cumulative_counts.append((bound, accumulated))
+        return cumulative_counts
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket with the quantile."""
+        for bound, accumulated in self.cumulative():
+            if accumulated >= fraction * self.count:
+                return bound
+        return float('inf')
+
+
+class StatsCollector:  # noqa: WPS214
     """Stats collector."""
 
+    windows = {
+        '5m': (5 * 60, 10),
+        '1h': (60 * 60, 60),
+        '24h': (24 * 60 * 60, 15 * 60),  # noqa: WPS432
+    }
+
     def __init__(self) -> None:
         """Set up empty collector."""
         self._counters_collector: Counter = Counter()
         self._start_time: float = time.time()
+        self._windows = {
+            window_name: RollingWindow(seconds, slot_seconds)
+            for window_name, (seconds, slot_seconds) in self.windows.items()
+        }
+        self.histograms: dict[str, LatencyHistogram] = {}
 
     def reset(self) -> None:
         """Reset stats."""
         self._counters_collector.clear()
+        for window in self._windows.values():
+            window.reset()
+        self.histograms.clear()
 
     def inc_value(self, name: str, increment: int = 1) -> None:
         """Increment stats counter."""
         self._counters_collector[name] += increment
+        now = time.time()
+        for window in self._windows.values():
+            window.inc_value(name, increment, now)
+
+    def observe_latency(self, name: str, seconds: float, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        """Add measurement to the latency histogram, buckets are used for the new histogram."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram(buckets)
+            self.histograms[name] = histogram
+        histogram.observe(seconds)
+
+    def dump(self) -> dict:
+        """All counters, windows and histograms for the snapshot."""
+        return {
+            'start_time': self._start_time,
+            'counters': dict(self._counters_collector),
+            'windows': {window_name: window.dump() for window_name, window in self._windows.items()},
+            'histograms': {name: histogram.dump() for name, histogram in self.histograms.items()},
+        }
+
+    def restore(self, dumped: dict) -> None:
+        """Continue collecting from the snapshot."""
+        self._start_time = dumped['start_time']
+        self._counters_collector = Counter(dumped['counters'])
+        for window_name, window_dump in dumped['windows'].items():
+            window = self._windows.get(window_name)
+            if window:
+                window.restore(window_dump)
+        self.histograms = {
+            name: LatencyHistogram.load(histogram_dump)
+            for name, histogram_dump in dumped['histograms'].items()
+        }
 
     def get_counters(self) -> list[tuple[str, int]]:
         """Get raw stats."""
@@ -34,34 +177,14 @@ class StatsCollector:
             for name, counter in self._counters_collector.items()
         ]
 
+    def get_window_rates_per_hour(self, window_name: str) -> list[tuple[str, float]]:
+        """Get per hour rates of the last window, young collector uses its uptime."""
+        window = self._windows[window_name]
+        hours = min(window.seconds, self._collecting_time()) / 60 / 60
+        return [
+            (name, counter / hours)
+            for name, counter in window.get_counters(time.time()).most_common()
+        ]
+
     def _collecting_time(self) -> float:
         return time.time() - self._start_time
-
-
-collector = StatsCollector()
-
-
-async def show_stats() -> None:
-    """Send stats to logs and notify."""
-    logging.info('Stats total: {0}'.format(collector.get_counters()))
-    logging.info('Stats averages: {0}'.format(collector.get_averages_per_hour()))
-
-    await _send_stats_notify()
-
-
-async def _send_stats_notify() -> None:
-    counters: list[str] = [
-        f'{name}: {counter_value}'
-        for name, counter_value in collector.get_counters()
-    ]
-    averages: list[str] = [
-        '%s per hour: %.2f' % (name, counter_value)
-        for name, counter_value in collector.get_averages_per_hour()
-    ]
-
-    message = 'Stats\n{0}\n{1}'.format(
-        '\n'.join(counters),
-        '\n'.join(averages),
-    )
-
-    # await send_custom_channel_notify(message)
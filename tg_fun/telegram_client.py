@@ -1,15 +1,27 @@
 """Telegram client."""
 
 from telethon import TelegramClient
+from telethon.sessions import Session
 
-from tg_fun.settings import app_settings
-
-client = TelegramClient(
-    session='.tg_fun',
-    api_id=app_settings.telegram_api_id,
-    api_hash=app_settings.telegram_api_hash,
-    auto_reconnect=True,
-    connection_retries=app_settings.tlg_client_retries,
-    retry_delay=app_settings.tlg_client_retry_delay,
-    device_model='Desktop Tg Client',
-)
+from tg_fun.sessions import FlushingMemorySession
+from tg_fun.settings import AppSettings
+
+
+def create_client(session: str, settings: AppSettings) -> TelegramClient:
+    """Create telegram client for the session."""
+    return TelegramClient(
+        session=_create_session(session, settings),
+        api_id=settings.telegram_api_id,
+        api_hash=settings.telegram_api_hash,
+        auto_reconnect=True,
+        connection_retries=settings.tlg_client_retries,
+        retry_delay=settings.tlg_client_retry_delay,
+        device_model='Desktop Tg Client',
+    )
+
+
+def _create_session(session: str, settings: AppSettings) -> str | Session:
+    if settings.session_storage == 'memory':
+        return FlushingMemorySession(session, settings.session_flush_seconds)
+    # telethon creates sqlite session by the file name
+    return session
@@ -0,0 +1,132 @@
+"""Per event tracing of the handlers pipeline."""
+import asyncio
+import contextlib
+import logging
+from contextvars import ContextVar
+from typing import Callable, ContextManager, Iterator, NamedTuple
+
+from tg_fun.stats import StatsCollector
+
+_current_trace: ContextVar['EventTrace | None'] = ContextVar('event_trace', default=None)
+_no_trace = contextlib.nullcontext()
+
+
+class Span(NamedTuple):
+    """One stage of the event handling."""
+
+    stage: str
+    seconds: float
+    delay: bool
+
+
+class EventTrace:
+    """Spans of one incoming event from receiving to the sent reply."""
+
+    def __init__(self, stats: StatsCollector, slow_seconds: float = 0) -> None:
+        """Start trace now."""
+        self.state: str | None = None
+        self.action: str | None = None
+        self.spans: list[Span] = []
+        self.replied_in: float | None = None
+        self._stats = stats
+        self._slow_seconds = slow_seconds
+        self._started = _now()
+        self._done_callbacks: list[Callable[[], None]] = []
+
+    @contextlib.contextmanager
+    def span(self, stage: str, delay: bool = False) -> Iterator[None]:
+        """
+        Measure stage, intentional delays are not counted as overhead.
+
+        Yields:
+            inside the measured stage
+        """
+        started = _now()
+        try:
+            yield
+        finally:
+            self.spans.append(Span(stage, _now() - started, delay))
+
+    def mark_reply(self) -> None:
+        """Remember the first reply sent for the event."""
+        if self.replied_in is None:
+            self.replied_in = _now() - self._started
+
+    def add_done_callback(self, callback: Callable[[], None]) -> None:
+        """Call back once the event is handled or dropped."""
+        self._done_callbacks.append(callback)
+
+    def cancel(self) -> None:
+        """Finish without stats, the event is dropped or its action did not complete."""
+        self._done()
+
+    def finish(self) -> None:
+        """Send spans to stats and log the slow event."""
+        total = _now() - self._started
+        delays = sum(span.seconds for span in self.spans if span.delay)
+        overhead = total - delays
+
+        for span in self.spans:
+            self._stats.observe_latency(f'stage_{span.stage}', span.seconds)
+        self._stats.observe_latency('event_total', total)
+        self._stats.observe_latency('event_overhead', overhead)
+        if self.replied_in is not None:
+            self._stats.observe_latency('event_reply', self.replied_in)
+        if self.action:
+            self._stats.observe_latency(f'overhead_{self.action}', overhead)
+
+        if self._slow_seconds and overhead > self._slow_seconds:
+            logging.warning(
+                'slow event %s -> %s: total %.3fs, overhead %.3fs (%s)',
+                self.state,
+                self.action,
+                total,
+                overhead,
+                _describe(self.spans),
+            )
+        self._done()
+
+    def _done(self) -> None:
+        callbacks = self._done_callbacks
+        self._done_callbacks = []
+        for callback in callbacks:
+            callback()
+
+
+def current() -> EventTrace | None:
+    """Trace of the event handled in the current task."""
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def activated(trace: EventTrace | None) -> Iterator[None]:
+    """
+    Make trace current inside the block.
+
+    Yields:
+        with the trace set as current
+    """
+    token = _current_trace.set(trace)
+    try:
+        yield
+    finally:
+        _current_trace.reset(token)
+
+
+def span(stage: str, delay: bool = False) -> ContextManager[None]:
+    """Measure stage of the current trace if any."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _no_trace
+    return trace.span(stage, delay)
+
+
+def _describe(spans: list[Span]) -> str:
+    stages = []
+    for stage, seconds, _ in spans:
+        stages.append(f'{stage} {seconds:.3f}s')
+    return ', '.join(stages)
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
@@ -0,0 +1,136 @@
+"""Incoming events de-duplication and serialized actions dispatch."""
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine
+
+from tg_fun import tracing
+from tg_fun.game.parsers import EventView
+from tg_fun.stats import StatsCollector
+
+Action = Callable[..., Coroutine[Any, Any, None]]
+
+
+class EventDeduplicator:
+    """Remember recent events by message id, content and buttons."""
+
+    def __init__(self, max_size: int = 256) -> None:
+        """Set up bounded memory of seen events."""
+        self._max_size = max_size
+        self._seen: OrderedDict[tuple, None] = OrderedDict()
+
+    def is_new(self, view: EventView) -> bool:
+        """Check event and remember it."""
+        message = view.message
+        key = (message.id, hash(message.message), _keyboard_key(message))
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return False
+
+        self._seen[key] = None
+        if len(self._seen) > self._max_size:
+            self._seen.popitem(last=False)
+        return True
+
+
+def _keyboard_key(message: Any) -> tuple[tuple[str, ...], ...]:
+    # the same buttons moved to other rows are a new keyboard
+    return tuple(
+        tuple(button.text for button in row)
+        for row in message.buttons or ()
+    )
+
+
+class ActionQueue:  # noqa: WPS214
+    """
+    Run account actions one at a time.
+
+    Only the newest pending action is kept: a newer game state makes
+    previously queued actions stale. The running action is interrupted
+    too when it only waits, e.g. for energy regeneration.
+    """
+
+    def __init__(self, stats: StatsCollector, interrupt_wait: Callable[[], None]) -> None:
+        """Set up empty queue, call `start` from the event loop."""
+        self._stats = stats
+        self._interrupt_wait = interrupt_wait
+        self._pending: tuple[Action, tuple, tracing.EventTrace | None, float] | None = None
+        self._has_pending = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._idle_since = float(0)
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def idle_since(self) -> float | None:
+        """Loop time when the last action is done, None while actions are running."""
+        if not self._idle.is_set():
+            return None
+        return self._idle_since
+
+    def start(self) -> None:
+        """Start actions worker."""
+        self._idle_since = asyncio.get_running_loop().time()
+        self._worker = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop worker and drop pending action."""
+        self._drop_pending()
+        if self._worker:
+            self._worker.cancel()
+
+    def put(self, action: Action, *args: Any) -> None:
+        """Queue action instead of the stale pending one."""
+        if self._pending:
+            logging.info('drop stale action %s', self._pending[0].__name__)
+            self._stats.inc_value('stale_actions')
+            self._drop_pending()
+
+        self._pending = (action, args, tracing.current(), asyncio.get_running_loop().time())
+        self._idle.clear()
+        self._has_pending.set()
+        self._interrupt_wait()
+
+    async def wait_idle(self) -> None:
+        """Wait until all queued actions are done."""
+        await self._idle.wait()
+
+    async def _run(self) -> None:
+        while True:  # noqa: WPS457
+            await self._has_pending.wait()
+            self._has_pending.clear()
+
+            while self._pending:
+                pending = self._pending
+                self._pending = None
+                await self._run_action(*pending)
+            self._idle_since = asyncio.get_running_loop().time()
+            self._idle.set()
+
+    async def _run_action(
+        self,
+        action: Action,
+        args: tuple,
+        trace: tracing.EventTrace | None,
+        queued: float,
+    ) -> None:
+        started = asyncio.get_running_loop().time()
+        if trace:
+            trace.spans.append(tracing.Span('queue', started - queued, delay=False))
+        try:
+            with tracing.activated(trace):
+                await action(*args)
+        except asyncio.CancelledError:
+            if trace:
+                trace.cancel()
+            raise
+        except Exception:
+            logging.exception('action %s failed', action.__name__)
+        self._stats.observe_latency('action', asyncio.get_running_loop().time() - started)
+        if trace:
+            trace.finish()
+
+    def _drop_pending(self) -> None:
+        if self._pending and self._pending[2]:
+            self._pending[2].cancel()
+        self._pending = None
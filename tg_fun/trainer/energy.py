@@ -0,0 +1,152 @@
+"""Energy regeneration scheduler."""
+import asyncio
+import logging
+import time
+
+from tg_fun import tracing
+from tg_fun.stats import StatsCollector
+
+_learning_rate = 0.5
+_too_early_factor = 1.5
+
+
+class EnergyScheduler:  # noqa: WPS214
+    """
+    Wait for energy regeneration instead of fixed sleeps.
+
+    Regeneration time of one energy point is learned from energy levels
+    observed while the account waits.
+    """
+
+    def __init__(self, stats: StatsCollector, regeneration_seconds: float) -> None:
+        """Set up scheduler with initial regeneration guess."""
+        self.regeneration_seconds = regeneration_seconds
+        self._stats = stats
+        self._level: int | None = None
+        self._observed_at = float(0)
+        self._required = 0
+        self._waiter: asyncio.Future | None = None
+        self._wakeup_at: float | None = None
+        self._woken_by_schedule: float | None = None
+        self._cancelled = False
+
+    @property
+    def wakeup_in(self) -> float | None:
+        """Seconds till the pending wakeup."""
+        if self._wakeup_at is None:
+            return None
+        return max(0, self._wakeup_at - _now())
+
+    def observe(self, level: int) -> None:
+        """Update current energy level from the game message."""
+        now = _now()
+        if self._waiter and self._level is not None and level > self._level:
+            self._learn((now - self._observed_at) / (level - self._level))
+        elif self._woken_by_schedule is not None:
+            self._learn_after_wakeup(level, now)
+        self._woken_by_schedule = None
+
+        if level != self._level:
+            # repeated level keeps the time it was reached, the next change is learned over the full interval
+            self._level = level
+            self._observed_at = now
+        if self._waiter and not self._waiter.done():
+            self._waiter.set_result(level)
+
+    def spend(self, amount: int) -> None:
+        """Energy is spent by the game action."""
+        if self._level is not None:
+            self._level = max(self._level - amount, 0)
+
+    def observe_recovered(self) -> None:
+        """Energy recovered message without energy level."""
+        if self._level is not None:
+            self.observe(self._level + 1)
+
+    def observe_shortage(self, required: int) -> None:
+        """Not enough energy message without energy level."""
+        self._level = min(self._level or 0, required - 1)
+        self._observed_at = _now()
+
+    def estimate_delay(self, required: int) -> float:
+        """Seconds till the required energy is regenerated."""
+        if self._level is None:
+            return required * self.regeneration_seconds
+        regenerated_at = self._observed_at + (required - self._level) * self.regeneration_seconds
+        return max(0, regenerated_at - _now())
+
+    async def wait_for_energy(self, required: int) -> bool:
+        """Wait for the required energy, False when cancelled or another wait is pending."""
+        if self._waiter:
+            logging.info('energy wakeup already scheduled in %d seconds', self.wakeup_in)
+            return False
+
+        started = _now()
+        self._required = required
+        self._stats.inc_value('energy_waits')
+        try:  # noqa: WPS501
+            with tracing.span('energy_wait', delay=True):
+                return await self._wait_regeneration()
+        finally:
+            self._stats.inc_value('energy_wait_seconds', int(_now() - started))
+            self._waiter = None
+            self._wakeup_at = None
+            self._cancelled = False
+
+    def dump(self) -> dict:
+        """Learned state for the snapshot, loop time is converted to wall time."""
+        return {
+            'regeneration_seconds': self.regeneration_seconds,
+            'level': self._level,
+            'observed_at': time.time() - (_now() - self._observed_at),
+            'required': self._required,
+            'wakeup_in': self.wakeup_in,
+        }
+
+    def restore(self, dumped: dict) -> None:
+        """Continue from the snapshot, time spent offline counts as regeneration."""
+        self.regeneration_seconds = dumped['regeneration_seconds']
+        self._level = dumped['level']
+        self._observed_at = _now() - (time.time() - dumped['observed_at'])
+        self._required = dumped['required']
+
+    def cancel(self) -> None:
+        """Cancel the pending wakeup, the waiting action gives way to a newer one."""
+        if self._waiter:
+            # the waiter may be already resolved by an observation and not yet re-armed
+            self._cancelled = True
+            if not self._waiter.done():
+                self._waiter.cancel()
+
+    async def _wait_regeneration(self) -> bool:
+        # every new observation resolves the waiter, so the wakeup is re-estimated
+        while delay := self.estimate_delay(self._required):
+            logging.info('wait %d seconds for %d energy', delay, self._required)
+            self._wakeup_at = _now() + delay
+            self._waiter = asyncio.get_running_loop().create_future()
+            await asyncio.wait({self._waiter}, timeout=delay)
+
+            if self._cancelled:
+                self._stats.inc_value('energy_waits_cancelled')
+                return False
+            if not self._waiter.done():
+                self._woken_by_schedule = self._observed_at
+                return True
+        return True
+
+    def _learn_after_wakeup(self, level: int, now: float) -> None:
+        observed_at: float = self._woken_by_schedule  # type: ignore
+        regenerated = level - (self._level or 0)
+        if regenerated > 0:
+            self._learn((now - observed_at) / regenerated)
+        elif level < self._required:
+            # woken too early and nothing was regenerated
+            self._learn((now - observed_at) * _too_early_factor)
+
+    def _learn(self, regeneration_seconds: float) -> None:
+        self.regeneration_seconds += (regeneration_seconds - self.regeneration_seconds) * _learning_rate
+        logging.debug('energy regeneration learned: %.1f seconds', self.regeneration_seconds)
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
@@ -1,20 +1,42 @@
 """Custom logging functions."""
 import logging
 
-from telethon import events
+from tg_fun.account import AccountContext
+from tg_fun.game.parsers import EventView
 
-from tg_fun.game import parsers
-from tg_fun.game.buttons import get_buttons_flat
-from tg_fun.settings import app_settings
 
+async def log_event_information(account: AccountContext, view: EventView, state: str | None = None) -> None:
+    """
+    Log event.
 
-async def log_event_information(event: events.NewMessage.Event) -> None:
-    """Log event."""
-    message_content = parsers.strip_message(event.message.message)
-    media = event.message.media
+    Repeated known states are sampled: the first event of the series and
+    then every `event_log_sample_every` event is logged.
+    """
+    last_state, repeats = account.logged_state
+    repeats = repeats + 1 if state is not None and state == last_state else 1
+    account.logged_state = (state, repeats)
+    if (repeats - 1) % account.settings.event_log_sample_every:
+        return
+
+    text = view.text[:account.settings.message_log_limit]
+    button_texts = tuple(view.button_texts)
+    media = type(view.message.media).__name__ if view.message.media else None
+    # immutable args leave formatting to the logging thread
     logging.info(
-        'handle event message="%s"; buttons="%s"; photos="%s"',
-        message_content[:app_settings.message_log_limit],
-        [button.text for button in get_buttons_flat(event)],
+        'handle event account="%s"; state="%s"; message="%s"; buttons="%s"; photos="%s"',
+        account.name,
+        state,
+        text,
+        button_texts,
         media,
+        extra={'fields': {
+            'event': 'handle_event',
+            'account': account.name,
+            'message_id': view.message.id,
+            'state': state,
+            'repeats': repeats,
+            'text': text,
+            'buttons': button_texts,
+            'media': media,
+        }},
     )
@@ -1,52 +1,199 @@
+import asyncio
+import contextlib
+import functools
 import logging
+import time
 from typing import Callable
 
-from telethon import events, types
+from telethon import TelegramClient, events, types
 
-from tg_fun import stats
-from tg_fun.game import state
+from tg_fun import tracing
+from tg_fun.account import AccountContext
+from tg_fun.captcha import CaptchaSolver
+from tg_fun.game import buttons, state
+from tg_fun.game.parsers import EventView
+from tg_fun.game.state.classifier import StateClassifier, StatePredicate
+from tg_fun.loop_lag import LoopLagMonitor
+from tg_fun.metrics import MetricsServer
 from tg_fun.plugins import manager
-from tg_fun.settings import app_settings, game_bot_name
-from tg_fun.telegram_client import client
-from tg_fun.trainer import event_logging, loop
+from tg_fun.sender import TokenBucket
+from tg_fun.settings import AppSettings, get_settings
+from tg_fun.telegram_client import create_client
+from tg_fun.trainer import event_logging, loop, snapshot
 from tg_fun.trainer.handlers import common, farming
+from tg_fun.trainer.journal import EventJournal, JournalRecord
 
 
-async def main(execution_limit_minutes: int | None = None) -> None:
-    """Farming runner."""
+async def main(
+    execution_limit_minutes: int | None = None,
+    client_factory: Callable[[str, AppSettings], TelegramClient] = create_client,
+) -> None:
+    """Farming runner for all configured accounts."""
+    app_settings = get_settings()
     local_settings = {
         'execution_limit_minutes': execution_limit_minutes or 'infinite',
         'notifications_enabled': app_settings.notifications_enabled,
         'slow_mode': app_settings.slow_mode,
+        'sessions': app_settings.telegram_sessions,
     }
     logging.info(f'start farming ({local_settings})')
 
-    logging.info('auth as %s', (await client.get_me()).username)
+    # services shared by accounts are closed in reverse order of creation
+    async with contextlib.AsyncExitStack() as services:
+        accounts = _create_accounts(app_settings, client_factory, services)
+        await _start_monitoring(app_settings, accounts, services)
+        await _farm_all(accounts, execution_limit_minutes)
+    logging.info('end farming')
+
+
+async def farm_account(account: AccountContext, execution_limit_minutes: int | None = None) -> None:
+    """Farming runner for one account."""
+    async with account.client:
+        logging.info('auth as %s', (await account.client.get_me()).username)
+        async with contextlib.AsyncExitStack() as running:
+            await _start_account(account, running)
+            if account.settings.snapshot_dir:
+                running.callback(asyncio.create_task(snapshot.save_periodically(account)).cancel)
+            await loop.run_wait_loop(account, execution_limit_minutes)
+    logging.info('end farming (%s)', account.name)
+
+
+async def _farm_all(accounts: list[AccountContext], execution_limit_minutes: int | None) -> None:
+    # a failed account must not stop the others and the services they share
+    farm_results = await asyncio.gather(
+        *[farm_account(account, execution_limit_minutes) for account in accounts],
+        return_exceptions=True,
+    )
+    for account, farm_result in zip(accounts, farm_results):
+        if isinstance(farm_result, Exception):
+            logging.error('farming failed (%s)', account.name, exc_info=farm_result)
+
+
+def _create_accounts(
+    app_settings: AppSettings,
+    client_factory: Callable[[str, AppSettings], TelegramClient],
+    services: contextlib.AsyncExitStack,
+) -> list[AccountContext]:
+    journal = None
+    if app_settings.event_journal_path:
+        journal = EventJournal(app_settings.event_journal_path, app_settings.event_journal_flush_seconds)
+        services.callback(journal.close)
+
+    captcha_solver = None
+    if app_settings.captcha_solver:
+        captcha_solver = CaptchaSolver(
+            app_settings.captcha_solver,
+            app_settings.captcha_library_dir,
+            app_settings.captcha_min_confidence,
+            app_settings.captcha_solve_timeout_seconds,
+            app_settings.captcha_workers,
+        )
+        services.callback(captcha_solver.close)
 
-    game_user: types.InputPeerUser = await client.get_input_entity(game_bot_name)
+    shared_send_bucket = TokenBucket(app_settings.process_send_rate_per_second, app_settings.process_send_burst)
+    return [
+        AccountContext(
+            session=session,
+            client=client_factory(session, app_settings),
+            settings=app_settings,
+            journal=journal,
+            shared_send_bucket=shared_send_bucket,
+            captcha_solver=captcha_solver,
+        )
+        for session in app_settings.telegram_sessions
+    ]
+
+
+async def _start_monitoring(
+    app_settings: AppSettings,
+    accounts: list[AccountContext],
+    services: contextlib.AsyncExitStack,
+) -> None:
+    if app_settings.loop_lag_interval_seconds:
+        lag_monitor = LoopLagMonitor(
+            [account.stats for account in accounts],
+            app_settings.loop_lag_interval_seconds,
+            app_settings.loop_blocked_seconds,
+        )
+        lag_monitor.start()
+        services.push_async_callback(lag_monitor.close)
+
+    if app_settings.metrics_port:
+        metrics_server = MetricsServer(accounts, app_settings.metrics_host, app_settings.metrics_port)
+        await metrics_server.start()
+        services.push_async_callback(metrics_server.close)
+
+
+async def _start_account(account: AccountContext, running: contextlib.AsyncExitStack) -> None:
+    restored = snapshot.load(account) if account.settings.snapshot_dir else None
+    await account.entities.resolve(_known_peers(account))
+    game_user: types.InputPeerUser = await account.entities.get_input_entity(account.settings.game_username)
     logging.info('game user is %s', game_user)
 
-    await client.send_message(game_bot_name, '/buttons')
+    # started services are stopped and the snapshot is saved even when farming fails
+    running.push_async_callback(_stop_account, account)
+    account.actions.start()
+    account.notifications.start()
+    account.read_receipts.start()
+    await _setup_handlers(account, game_user_id=game_user.user_id)
 
-    await _setup_handlers(game_user_id=game_user.user_id)
+    if not (restored and _resume(account, restored)):
+        await account.sender.send_message(account.settings.game_username, '/buttons')
 
-    await loop.run_wait_loop(execution_limit_minutes)
-    logging.info('end farming')
+
+async def _stop_account(account: AccountContext) -> None:
+    account.energy.cancel()
+    account.actions.stop()
+    await account.notifications.close()
+    await account.read_receipts.close()
+    if account.settings.snapshot_dir:
+        snapshot.save(account)
 
 
-async def _setup_handlers(game_user_id: int) -> None:
-    if app_settings.self_manager_enabled:
-        manager.setup(client)
+def _known_peers(account: AccountContext) -> list[str]:
+    peers = [account.settings.game_username, 'me']
+    if account.settings.custom_tg_channel:
+        peers.append(account.settings.custom_tg_channel)
+    return peers
 
-    client.add_event_handler(
-        callback=_message_handler,
+
+def _resume(account: AccountContext, restored: dict) -> bool:
+    stored_event = snapshot.restored_event(account, restored)
+    if stored_event is None:
+        return False
+
+    view = EventView(stored_event)
+    select_callback = _select_action_by_event(view)
+    if select_callback is common.skip_turn_handler:
+        return False
+
+    logging.info('resume (%s) with %s', account.name, select_callback.__name__)
+    account.actions.put(_resume_action, select_callback, account, view)
+    return True
+
+
+async def _resume_action(select_callback: Callable, account: AccountContext, view: EventView) -> None:
+    sent = account.sender.sent
+    await select_callback(account, view)
+    if account.sender.sent == sent:
+        logging.info('nothing to resume (%s), rediscover game state', account.name)
+        await account.sender.send_message(account.settings.game_username, '/buttons')
+
+
+async def _setup_handlers(account: AccountContext, game_user_id: int) -> None:
+    if account.settings.self_manager_enabled:
+        manager.setup(account)
+
+    callback = functools.partial(_message_handler, account)
+    account.client.add_event_handler(
+        callback=callback,
         event=events.NewMessage(
             incoming=True,
             from_users=(game_user_id,),
         ),
     )
-    client.add_event_handler(
-        callback=_message_handler,
+    account.client.add_event_handler(
+        callback=callback,
         event=events.MessageEdited(
             incoming=True,
             from_users=(game_user_id,),
@@ -54,43 +201,100 @@ async def _setup_handlers(game_user_id: int) -> None:
     )
 
 
-async def _message_handler(event: events.NewMessage.Event) -> None:
-    await event_logging.log_event_information(event)
-    stats.collector.inc_value('events')
+async def _message_handler(account: AccountContext, event: events.NewMessage.Event) -> None:
+    view = EventView(event)
+    trace = tracing.EventTrace(account.stats, account.settings.slow_event_log_seconds)
+    if account.journal:
+        # the event is recorded at once, its completion when the queued action is done
+        received = time.time()
+        account.journal.record(JournalRecord.from_view(account.name, view, received))
+        trace.add_done_callback(
+            functools.partial(account.journal.record_handled, account.name, view.message.id, received),
+        )
+    try:
+        with tracing.activated(trace):
+            await _handle_event(account, view, trace)
+    except (Exception, asyncio.CancelledError):
+        trace.cancel()
+        raise
 
-    await event.message.mark_read()
 
-    select_callback = _select_action_by_event(event)
+async def _handle_event(account: AccountContext, view: EventView, trace: tracing.EventTrace) -> None:
+    if not account.seen_events.is_new(view):
+        logging.debug('skip duplicated event (%s)', account.name)
+        account.stats.inc_value('duplicated_events')
+        trace.cancel()
+        return
 
-    await select_callback(event)
+    with trace.span('classify'):
+        select_callback = _select_action_by_event(view)
+    await _observe_event(account, view, trace, select_callback.__name__)
 
+    if account.paused:
+        logging.debug('farming paused, skip event (%s)', account.name)
+        trace.finish()
+        return
 
-def _select_action_by_event(event: events.NewMessage.Event) -> Callable:
-    mapping = [
-        (state.common_states.init, farming.init),
+    trace.action = select_callback.__name__
+    if select_callback is common.skip_turn_handler:
+        await select_callback(account, view)
+        trace.finish()
+    else:
+        account.last_state = trace.state
+        account.last_view = view
+        account.actions.put(select_callback, account, view)
 
-        (state.common_states.is_locations, farming.go_to_fight_zone),
 
-        (state.common_states.is_monster_found, farming.start_fighting),
-        (state.common_states.is_monster_not_found, farming.search_next),
-        (state.common_states.is_win_state, farming.search_next),
+async def _observe_event(account: AccountContext, view: EventView, trace: tracing.EventTrace, action_name: str) -> None:
+    with trace.span('log'):
+        await event_logging.log_event_information(account, view, trace.state)
+    account.stats.inc_value('events')
+    account.read_receipts.seen(view.message.id)
+    account.watchdog.observe(trace.state, action_name, account.actions.idle_since)
 
-        (state.common_states.is_town, farming.in_town),
-        (state.common_states.is_alive, farming.in_town),
-        (state.common_states.is_hp_recovered, lambda e: farming.go_to_locations(e) if not app_settings.farm_dangeons else farming.pick_dangeon(e)),
-        (state.common_states.is_dangeon, farming.go_to_dangeon),
-        (state.common_states.is_choose_dangeon, farming.choose_dangeon),
-        (state.common_states.is_approve_dangeon, farming.start_dangeon),
-        (state.common_states.is_dangeon_finished, farming.relaxing),
+    if view.buttons and not buttons.is_inline_keyboard(view.message):
+        account.buttons.observe(view.message.id, view.button_texts)
 
-        (state.common_states.is_capcha_found, common.resolve_capcha),
+    if view.energy:
+        account.energy.observe(view.energy[0])
 
-        # (state.common_states.is_energy_recovered, to_be_done),
-        (state.common_states.is_empty_energy, farming.relaxing),
-    ]
 
-    for check_function, callback_function in mapping:
-        if check_function(event):
-            logging.debug('is %s event', check_function.__name__)
-            return callback_function
-    return common.skip_turn_handler
+def _select_action_by_event(view: EventView) -> Callable:
+    check_function = _state_classifier.classify(view)
+    if check_function is None:
+        return common.skip_turn_handler
+
+    logging.debug('is %s event', check_function.__name__)
+    trace = tracing.current()
+    if trace:
+        trace.state = check_function.__name__
+    return _callbacks_by_state[check_function]
+
+
+_states_mapping: list[tuple[StatePredicate, Callable]] = [
+    (state.common_states.init, farming.init),
+
+    (state.common_states.is_locations, farming.go_to_fight_zone),
+
+    (state.common_states.is_monster_found, farming.start_fighting),
+    (state.common_states.is_monster_not_found, farming.search_next),
+    (state.common_states.is_win_state, farming.search_next),
+
+    (state.common_states.is_town, farming.in_town),
+    (state.common_states.is_alive, farming.in_town),
+    (state.common_states.is_hp_recovered, farming.hp_recovered),
+    (state.common_states.is_dangeon, farming.go_to_dangeon),
+    (state.common_states.is_choose_dangeon, farming.choose_dangeon),
+    (state.common_states.is_approve_dangeon, farming.start_dangeon),
+    (state.common_states.is_dangeon_finished, farming.relaxing),
+
+    (state.common_states.is_capcha_found, common.resolve_capcha),
+
+    (state.common_states.is_energy_recovered, farming.energy_recovered),
+    (state.common_states.is_empty_energy, farming.relaxing),
+]
+_callbacks_by_state = dict(_states_mapping)
+_state_classifier = StateClassifier(
+    (check_function, state.common_states.PATTERNS[check_function])
+    for check_function, _ in _states_mapping
+)
@@ -1,17 +1,43 @@
 """Common handlers."""
 import logging
 
-from telethon import events
+from tg_fun import wait_utils
+from tg_fun.account import AccountContext
+from tg_fun.captcha import CaptchaTask
+from tg_fun.game import parsers
+from tg_fun.game.buttons import is_inline_keyboard
 
-from tg_fun import notifications
 
-
-async def skip_turn_handler(_: events.NewMessage.Event) -> None:
+async def skip_turn_handler(account: AccountContext, _: parsers.EventView) -> None:
     """Just skip event."""
     logging.info('skip event')
 
 
-async def resolve_capcha(_: events.NewMessage.Event) -> None:
+async def resolve_capcha(account: AccountContext, view: parsers.EventView) -> None:
     """Resolve capcha."""
     logging.info('Resolve capcha')
-    await notifications.send_custom_channel_notify('capcha!')
+    if account.captcha_solver:
+        task = CaptchaTask(
+            view.message.message,
+            await parsers.get_photo_base64(view, account.media),
+            tuple(view.button_texts),
+        )
+        answer = await account.captcha_solver.solve(task, account.stats)
+        if answer is not None:
+            await _press_answer(account, view, answer)
+            return
+
+    account.notifications.notify(f'capcha! ({account.name})')
+
+
+async def _press_answer(account: AccountContext, view: parsers.EventView, answer: str) -> None:
+    logging.info('Answer capcha: %s', answer)
+    await wait_utils.wait_for()
+    if not is_inline_keyboard(view.message):
+        await account.sender.send_message(account.settings.game_username, answer)
+        return
+
+    for button in view.buttons:
+        if button.text == answer:
+            await account.sender.click(button)
+            return
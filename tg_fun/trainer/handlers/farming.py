@@ -1,219 +1,210 @@
 """Farming handlers."""
 import logging
-from typing import Dict, List
-
-from telethon import events
-import asyncio
 
 from tg_fun import wait_utils
+from tg_fun.account import AccountContext
 from tg_fun.game import parsers
-from tg_fun.settings import app_settings, game_bot_name
-from tg_fun.telegram_client import client
-from tg_fun.game.buttons import TO_TOWN, TO_LOCATIONS, TO_DANGEONS, TO_FIGHT_ZONE, HEAL, ATTACK, FIND_MONSTER, YES, get_buttons_flat
+from tg_fun.game.buttons import ATTACK, FIND_MONSTER, HEAL, TO_DANGEONS, TO_FIGHT_ZONE, TO_LOCATIONS, TO_TOWN
+from tg_fun.game.state import common_states
+
+FIGHT_ENERGY = 1
+DANGEON_ENERGY = 2
 
-available_buttons: Dict[str, List[str]] = {
-    'town_buttons': [],
-    'chose_location_buttons': [],
-    'fight_zone_buttons': [],
-    'dangeon_buttons': [],
-}
+# categories of the remembered keyboards
+CHOSE_LOCATION_BUTTONS = 'chose_location_buttons'
+FIGHT_ZONE_BUTTONS = 'fight_zone_buttons'
+TOWN_BUTTONS = 'town_buttons'
+DANGEON_BUTTONS = 'dangeon_buttons'
 
 
-async def init(event: events.NewMessage.Event) -> None:
+async def init(account: AccountContext, view: parsers.EventView) -> None:
     """Делаем переход инициализацию."""
-    buttons = get_buttons_flat(event)
-
-    if buttons:
-        if any(HEAL in btn.text for btn in buttons):
-            await in_town(event)
-        elif any(TO_FIGHT_ZONE in btn.text for btn in buttons):
-            await go_to_fight_zone(event)
-        elif any(ATTACK in btn.text for btn in buttons):
-            await start_fighting(event)
-        elif any(TO_DANGEONS in btn.text for btn in buttons):
-            await go_to_dangeon(event)
+    button_texts = view.button_texts
+
+    if button_texts:
+        if any(HEAL in btn for btn in button_texts):
+            await in_town(account, view)
+        elif any(TO_FIGHT_ZONE in btn for btn in button_texts):
+            await go_to_fight_zone(account, view)
+        elif any(ATTACK in btn for btn in button_texts):
+            await start_fighting(account, view)
+        elif any(TO_DANGEONS in btn for btn in button_texts):
+            await go_to_dangeon(account, view)
     else:
-        logging.warning(f'Кнопки для категории не найдены. Инициализация не выполнена.')
+        logging.warning('Кнопки для категории не найдены. Инициализация не выполнена.')
 
 
-async def update_available_buttons(event: events.NewMessage.Event, category: str) -> None:
+async def update_available_buttons(account: AccountContext, view: parsers.EventView, category: str) -> None:
     """Обновляем доступные кнопки по указанной категории."""
-    global available_buttons
-    buttons = get_buttons_flat(event)
-
-    if buttons:
-        if category == 'town_buttons':
-            for btn in buttons:
-                available_buttons['town_buttons'].append(btn.text)
-
-        elif category == 'chose_location_buttons':
-            for btn in buttons:
-                available_buttons['chose_location_buttons'].append(btn.text)
+    button_texts = view.button_texts
 
-        elif category == 'fight_zone_buttons':
-            for btn in buttons:
-                available_buttons['fight_zone_buttons'].append(btn.text)
-
-        elif category == 'dangeon_buttons':
-            for btn in buttons:
-                available_buttons['dangeon_buttons'].append(btn.text)
-
-        available_buttons = {key: list(set(val)) for key, val in available_buttons.items()}
+    if button_texts:
+        account.buttons.update(category, view.message.id, button_texts)
     else:
         logging.warning(f'Кнопки для категории {category} не найдены. Обновление не выполнено.')
 
 
-async def handle_button_event(button_symbol: str, category: str) -> bool:
+async def handle_button_event(account: AccountContext, button_symbol: str, category: str) -> bool:
     """Обрабатываем нажатие кнопки по символу из указанной категории."""
-    global available_buttons
-    buttons = available_buttons.get(category, [])
-    button = next((btn for btn in buttons if button_symbol in btn), None)
-    
+    button = account.buttons.find(category, button_symbol)
+
     if button:
         await wait_utils.wait_for()
-        await client.send_message(game_bot_name, button)
+        await account.sender.send_message(account.settings.game_username, button)
         return True
     logging.warning(f'Кнопка с символом "{button_symbol}" не найдена в категории {category}.')
     return False
 
 
-async def go_to_fight_zone(event: events.NewMessage.Event) -> None:
+async def go_to_fight_zone(account: AccountContext, view: parsers.EventView) -> None:
     """Выбираем локацию для боя"""
-    await update_available_buttons(event, 'chose_location_buttons')
-    if any(TO_FIGHT_ZONE in btn for btn in available_buttons['chose_location_buttons']):
+    await update_available_buttons(account, view, CHOSE_LOCATION_BUTTONS)
+    if account.buttons.find(CHOSE_LOCATION_BUTTONS, TO_FIGHT_ZONE):
         logging.info('Идем в локацию.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['chose_location_buttons'] if TO_FIGHT_ZONE in btn)
-        await handle_button_event(button_to_press, 'chose_location_buttons')
+        await handle_button_event(account, TO_FIGHT_ZONE, CHOSE_LOCATION_BUTTONS)
     else:
         logging.warning('Не удалось найти кнопку для перехода в локацию.')
 
 
-async def start_fighting(event: events.NewMessage.Event) -> None:
+async def start_fighting(account: AccountContext, view: parsers.EventView) -> None:
     """Начинаем бой."""
-    await update_available_buttons(event, 'fight_zone_buttons')
+    await update_available_buttons(account, view, FIGHT_ZONE_BUTTONS)
 
     try:
-        energy_level = parsers.get_energy_level(event.message.message)
+        energy_level = parsers.get_energy_level(view)
     except Exception as e:
         logging.warning(f'Не удалось получить уровень энергии: {e}')
-        energy_level = None 
+        energy_level = None
 
     if energy_level is not None and energy_level <= 0:
-        logging.info('Мало энергии, ждем 1 час.')
-        await asyncio.sleep(3600)
+        logging.info('Мало энергии, ждем восстановления.')
+        if not await account.energy.wait_for_energy(FIGHT_ENERGY):
+            return
 
-    if any(ATTACK in btn for btn in available_buttons['fight_zone_buttons']):
+    if account.buttons.find(FIGHT_ZONE_BUTTONS, ATTACK):
         logging.info('Начинаем бой.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['fight_zone_buttons'] if ATTACK in btn)
-        await handle_button_event(button_to_press, 'fight_zone_buttons')
+        if await handle_button_event(account, ATTACK, FIGHT_ZONE_BUTTONS):
+            account.energy.spend(FIGHT_ENERGY)
     else:
         logging.warning('Не удалось найти кнопку начать бой.')
 
 
-async def search_next(event: events.NewMessage.Event) -> None:
+async def search_next(account: AccountContext, view: parsers.EventView) -> None:
     """Начинаем поиск монстра или возвращаемся в город если нет энергии или мало хп."""
     try:
-        energy_level = parsers.get_energy_level(event.message.message)
-        hp_level = parsers.get_hp_level(event.message.message)
+        energy_level = parsers.get_energy_level(view)
+        hp_level = parsers.get_hp_level(view)
     except Exception as e:
         logging.warning(f'Не удалось получить уровень энергии или здоровья: {e}')
-        energy_level = None 
-        hp_level = None 
+        energy_level = None
+        hp_level = None
 
-    if hp_level is not None and hp_level <= app_settings.minimum_hp_level_for_grinding:
+    if hp_level is not None and hp_level <= account.settings.minimum_hp_level_for_grinding:
         logging.info('Мало хп, возвращаемся.')
-        await return_to_town()
+        await return_to_town(account)
     elif energy_level is not None and energy_level <= 0:
-        logging.info('Мало энергии, ждем 1 час.')
-        await asyncio.sleep(3600)
-        await handle_button_event(FIND_MONSTER, 'fight_zone_buttons')
+        logging.info('Мало энергии, ждем восстановления.')
+        if await account.energy.wait_for_energy(FIGHT_ENERGY):
+            await handle_button_event(account, FIND_MONSTER, FIGHT_ZONE_BUTTONS)
     else:
         await wait_utils.wait_for()
-        await handle_button_event(FIND_MONSTER, 'fight_zone_buttons')
+        await handle_button_event(account, FIND_MONSTER, FIGHT_ZONE_BUTTONS)
 
 
-async def return_to_town() -> None:
+async def return_to_town(account: AccountContext) -> None:
     """Возвращаемся в город после завершения."""
-    if any(TO_TOWN in btn for btn in available_buttons['fight_zone_buttons']):
+    if account.buttons.find(FIGHT_ZONE_BUTTONS, TO_TOWN):
         logging.info('Возвращаемся в город.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['fight_zone_buttons'] if TO_TOWN in btn)
-        await handle_button_event(button_to_press, 'fight_zone_buttons')
+        await handle_button_event(account, TO_TOWN, FIGHT_ZONE_BUTTONS)
     else:
         logging.warning('Не удалось найти кнопку возвращения в город.')
 
 
-async def in_town(event: events.NewMessage.Event) -> None:
+async def in_town(account: AccountContext, view: parsers.EventView) -> None:
     """Мы в городе. Лечимся и возвращаемся в локации"""
-    await update_available_buttons(event, 'town_buttons')
-    if any(HEAL in btn for btn in available_buttons['town_buttons']):
+    await update_available_buttons(account, view, TOWN_BUTTONS)
+    if account.buttons.find(TOWN_BUTTONS, HEAL):
         logging.info('Лечимся.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['town_buttons'] if HEAL in btn)
-        await handle_button_event(button_to_press, 'town_buttons')
+        await handle_button_event(account, HEAL, TOWN_BUTTONS)
     else:
         logging.warning('Не удалось найти кнопку восстановления здоровья.')
 
 
-async def go_to_locations(_: events.NewMessage.Event) -> None:
+async def hp_recovered(account: AccountContext, view: parsers.EventView) -> None:
+    """Здоровье восстановлено, идем в локации или данж."""
+    if account.settings.farm_dangeons:
+        await pick_dangeon(account, view)
+    else:
+        await go_to_locations(account, view)
+
+
+async def go_to_locations(account: AccountContext, _: parsers.EventView) -> None:
     """Возвращаемся в локации"""
-    if any(TO_LOCATIONS in btn for btn in available_buttons['town_buttons']):
+    if account.buttons.find(TOWN_BUTTONS, TO_LOCATIONS):
         logging.info('Возвращаемся в локации.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['town_buttons'] if TO_LOCATIONS in btn)
-        await handle_button_event(button_to_press, 'town_buttons')
+        await handle_button_event(account, TO_LOCATIONS, TOWN_BUTTONS)
     else:
         logging.warning('Не удалось найти кнопку для перехода в локации.')
 
 
-async def pick_dangeon(_: events.NewMessage.Event) -> None:
+async def pick_dangeon(account: AccountContext, _: parsers.EventView) -> None:
     """Возвращаемся в данж"""
-    if any(TO_DANGEONS in btn for btn in available_buttons['town_buttons']):
+    if account.buttons.find(TOWN_BUTTONS, TO_DANGEONS):
         logging.info('Возвращаемся в данж.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['town_buttons'] if TO_DANGEONS in btn)
-        await handle_button_event(button_to_press, 'town_buttons')
+        await handle_button_event(account, TO_DANGEONS, TOWN_BUTTONS)
     else:
         logging.warning('Не удалось найти кнопку для перехода в данж.')
 
 
-async def go_to_dangeon(event: events.NewMessage.Event) -> None:
+async def go_to_dangeon(account: AccountContext, view: parsers.EventView) -> None:
     """Возвращаемся в данж"""
-    await update_available_buttons(event, 'dangeon_buttons')
-    if any(TO_DANGEONS in btn for btn in available_buttons['dangeon_buttons']):
+    await update_available_buttons(account, view, DANGEON_BUTTONS)
+    if account.buttons.find(DANGEON_BUTTONS, TO_DANGEONS):
         logging.info('Возвращаемся в данж.')
         await wait_utils.wait_for()
-        button_to_press = next(btn for btn in available_buttons['dangeon_buttons'] if TO_DANGEONS in btn)
-        await handle_button_event(button_to_press, 'dangeon_buttons')
+        await handle_button_event(account, TO_DANGEONS, DANGEON_BUTTONS)
     else:
         logging.warning('Не удалось найти кнопку отправиться в данж.')
 
 
-async def choose_dangeon(_: events.NewMessage.Event) -> None:
+async def choose_dangeon(account: AccountContext, _: parsers.EventView) -> None:
     """Выбираем данж"""
     await wait_utils.wait_for()
-    await client.send_message(game_bot_name, '/go_dange_10000')
+    await account.sender.send_message(account.settings.game_username, '/go_dange_10000')
 
 
-async def start_dangeon(event: events.NewMessage.Event) -> None:
+async def start_dangeon(account: AccountContext, view: parsers.EventView) -> None:
     """Подтвердить запуск данжа."""
-    message = event.message
-    if message.buttons:
-        for row in message.buttons:
-            for button in row:
-                if button.text == '✅Да':
-                    logging.info('Нажимаем inline-кнопку "✅Да".')
-                    await button.click()
-                    return
-    
+    for button in view.buttons:
+        if button.text == '✅Да':
+            logging.info('Нажимаем inline-кнопку "✅Да".')
+            await account.sender.click(button)
+            account.energy.spend(DANGEON_ENERGY)
+            return
+
     logging.warning('Кнопка "✅Да" не найдена или она не является inline-кнопкой.')
 
 
-async def relaxing(_: events.NewMessage.Event) -> None:
-    """Отдыхаем."""
-    logging.info('Отдыхаем час.')
-    await asyncio.sleep(3600)
-    await client.send_message(game_bot_name, '/buttons')
+async def relaxing(account: AccountContext, view: parsers.EventView) -> None:
+    """Отдыхаем до восстановления энергии."""
+    required = DANGEON_ENERGY if account.settings.farm_dangeons else FIGHT_ENERGY
+    if view.energy is None and common_states.is_empty_energy(view):
+        account.energy.observe_shortage(required)
+
+    logging.info('Отдыхаем до восстановления энергии.')
+    if await account.energy.wait_for_energy(required):
+        await account.sender.send_message(account.settings.game_username, '/buttons')
+
 
+async def energy_recovered(account: AccountContext, view: parsers.EventView) -> None:
+    """Энергия восстановлена, прерванное ожидание продолжается до нужного уровня."""
+    logging.info('Энергия восстановлена.')
+    if view.energy is None:
+        account.energy.observe_recovered()
+    await relaxing(account, view)
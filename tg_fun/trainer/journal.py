@@ -0,0 +1,130 @@
+"""Append-only journal of incoming game events."""
+import asyncio
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Iterator
+
+from telethon import events
+
+from tg_fun.game.buttons import is_inline_keyboard
+from tg_fun.game.parsers import EventView
+
+
+@dataclass
+class JournalRecord:
+    """One incoming event, recorded as soon as it is received."""
+
+    account: str
+    message_id: int
+    edited: bool
+    received: float
+    message: str
+    buttons: list[list[str]] | None
+    inline: bool
+    media: str | None
+
+    @classmethod
+    def from_view(cls, account: str, view: EventView, received: float) -> 'JournalRecord':
+        """Build record for the received event."""
+        message = view.message
+        buttons = None
+        if message.buttons:
+            buttons = [[button.text for button in row] for row in message.buttons]
+        # simulated events carry the flag, telethon events differ by type
+        edited = getattr(view.event, 'edited', isinstance(view.event, events.MessageEdited.Event))
+        return cls(
+            account=account,
+            message_id=message.id,
+            edited=edited,
+            received=received,
+            message=message.message,
+            buttons=buttons,
+            inline=is_inline_keyboard(message),
+            media=type(message.media).__name__ if message.media else None,
+        )
+
+
+@dataclass
+class JournalCompletion:
+    """Handling of the recorded event is done, the event is found by account, id and receive time."""
+
+    account: str
+    message_id: int
+    received: float
+    handled: float
+
+
+class EventJournal:
+    """
+    JSON lines journal writer.
+
+    Records are buffered and written in one batch per flush interval,
+    so a crash loses at most the records of the last interval.
+    """
+
+    def __init__(self, path: str, flush_seconds: float) -> None:
+        """Open journal for appending."""
+        self.path = path
+        self._flush_seconds = flush_seconds
+        self._lines: list[str] = []
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._journal_file: IO[str] = open(path, 'a', encoding='utf-8')  # noqa: WPS515
+
+    def record(self, record: JournalRecord | JournalCompletion) -> None:
+        """Buffer record, it is written within the flush interval."""
+        line = json.dumps(asdict(record), ensure_ascii=False, separators=(',', ':'))
+        self._lines.append(line)
+        if self._flush_timer is None:
+            self._flush_timer = asyncio.get_running_loop().call_later(self._flush_seconds, self.flush)
+
+    def record_handled(self, account: str, message_id: int, received: float) -> None:
+        """Buffer completion of the event handled just now."""
+        self.record(JournalCompletion(account, message_id, received, time.time()))
+
+    def flush(self) -> None:
+        """Write buffered records."""
+        if self._flush_timer:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._lines:
+            batch = ''.join(f'{line}\n' for line in self._lines)
+            self._journal_file.write(batch)
+            self._journal_file.flush()
+            self._lines.clear()
+
+    def close(self) -> None:
+        """Write buffered records and close journal file."""
+        self.flush()
+        self._journal_file.close()
+
+
+def read_journal(path: str) -> Iterator[JournalRecord]:
+    """
+    Stream event records one by one, completions are skipped.
+
+    Yields:
+        records in the receive order
+    """
+    for fields in _read_lines(path):
+        if 'handled' not in fields:
+            yield JournalRecord(**fields)
+
+
+def read_completions(path: str) -> Iterator[JournalCompletion]:
+    """
+    Stream completions of the recorded events.
+
+    Yields:
+        completions in the order handling is done
+    """
+    for fields in _read_lines(path):
+        if 'handled' in fields:
+            yield JournalCompletion(**fields)
+
+
+def _read_lines(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, encoding='utf-8') as journal_file:
+        for line in journal_file:
+            if line.strip():
+                yield json.loads(line)
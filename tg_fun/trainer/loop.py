@@ -2,49 +2,149 @@
 
 import asyncio
 import logging
-import time
 
-from tg_fun import stats
-from tg_fun.settings import app_settings
+from tg_fun.account import AccountContext
+from tg_fun.game import action
+from tg_fun.notifications import Priority
+
+_notify_stall_level = 3
+_tail_quantile = 0.95
 
 _has_stop_request: bool = False
+_running_accounts: set[AccountContext] = set()
 
 
 def exit_request(*args, **kwargs) -> None:  # type: ignore
-    """Stop training signal by request."""
+    """Stop training of all accounts by signal."""
     global _has_stop_request  # noqa: WPS420, WPS442
     _has_stop_request = True  # noqa: WPS122, WPS442
     logging.info('force exit')
 
-
-def has_exit_request() -> bool:
-    """Get True when exit was requested."""
-    return _has_stop_request
+    try:
+        event_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        event_loop = None
+    for account in _running_accounts:
+        if event_loop:
+            # signal handler may interrupt the loop anywhere, so wake it up safely
+            event_loop.call_soon_threadsafe(account.stop_requested.set)
+        else:
+            account.stop_requested.set()
 
 
-async def run_wait_loop(execution_limit_minutes: int | None) -> None:  # noqa: WPS231
+async def run_wait_loop(account: AccountContext, execution_limit_minutes: int | None) -> None:
     """Wait execution time left or stop signals."""
-    start_time = time.time()
-    stats_show_time = start_time
-    execution_time = float(0)
+    if _has_stop_request:
+        account.stop_requested.set()
+
     time_limit = (execution_limit_minutes or 0) * 60
+    _running_accounts.add(account)
+    tasks = _start_background_tasks(account)
+    try:
+        async with asyncio.timeout(time_limit or None):
+            await account.stop_requested.wait()
+        logging.info('stop training by request (%s)', account.name)
+    except TimeoutError:
+        logging.info('stop training by time left (%s)', account.name)
+    finally:
+        for task in tasks:
+            task.cancel()
+        _running_accounts.discard(account)
+
+    await show_stats(account)
+
+
+def _start_background_tasks(account: AccountContext) -> list[asyncio.Task[None]]:
+    tasks = [asyncio.create_task(_show_stats_periodically(account))]
+    if account.settings.watchdog_enabled:
+        tasks.append(asyncio.create_task(_watch_stalls(account)))
+    return tasks
+
+
+async def show_stats(account: AccountContext) -> None:
+    """Send account stats to logs and notify."""
+    logging.info('Stats total (%s): %s', account.name, account.stats.get_counters())
+    logging.info('Stats averages (%s): %s', account.name, account.stats.get_averages_per_hour())
+    logging.info('Stats last hour (%s): %s', account.name, account.stats.get_window_rates_per_hour('1h'))
+    for name, histogram in account.stats.histograms.items():
+        logging.info(
+            'Latency %s (%s): p50 <= %.3fs, p95 <= %.3fs, count %d',
+            name,
+            account.name,
+            histogram.quantile(0.5),
+            histogram.quantile(_tail_quantile),
+            histogram.count,
+        )
+    logging.info('Send queue depth (%s): %d', account.name, account.sender.queue_depth)
+    if account.energy.wakeup_in is not None:
+        logging.info('Energy wakeup (%s) in %d seconds', account.name, account.energy.wakeup_in)
+
+    if account.settings.notifications_enabled:
+        _send_stats_notify(account)
+
+
+async def _show_stats_periodically(account: AccountContext) -> None:
+    while True:  # noqa: WPS457
+        await asyncio.sleep(account.settings.show_stats_every_seconds)
+        await show_stats(account)
+
+
+async def _watch_stalls(account: AccountContext) -> None:
+    while True:  # noqa: WPS457
+        # nothing is expected while actions run, the deadline is armed again when they are done
+        await account.actions.wait_idle()
+        idle_since = None if account.paused else account.actions.idle_since
+        if await account.watchdog.wait_deadline(idle_since):
+            await _check_stall(account)
+
+
+async def _check_stall(account: AccountContext) -> None:
+    idle_since = account.actions.idle_since
+    if account.paused or idle_since is None:
+        return
+
+    level = account.watchdog.check(idle_since)
+    if not level:
+        return
+
+    logging.warning(
+        'conversation (%s) is stalled after %s, expected %s; escalation level %d',
+        account.name,
+        account.watchdog.last_action,
+        account.watchdog.expected_states() or 'any state',
+        level,
+    )
+    try:
+        await _escalate(account, level)
+    except Exception:
+        logging.exception('stall escalation failed (%s)', account.name)
+
+
+async def _escalate(account: AccountContext, level: int) -> None:
+    if level == 1:
+        await action.common_actions.ping(account, account.settings.game_username)
+        return
 
-    while True:
-        if time_limit and execution_time >= time_limit:
-            logging.info('stop training by time left')
-            break
+    if level == _notify_stall_level:
+        last_action = account.watchdog.last_action
+        account.notifications.notify(f'farming is stalled ({account.name}), last action {last_action}')
+    await account.sender.send_message(account.settings.game_username, '/buttons')
 
-        if has_exit_request():
-            logging.info('stop training by request')
-            break
 
-        logging.debug('next wait iteration')
-        await asyncio.sleep(app_settings.wait_loop_iteration_seconds)
-        current_time = time.time()
-        execution_time = current_time - start_time
+def _send_stats_notify(account: AccountContext) -> None:
+    counters: list[str] = [
+        f'{name}: {counter_value}'
+        for name, counter_value in account.stats.get_counters()
+    ]
+    averages: list[str] = [
+        '%s per hour: %.2f' % (name, counter_value)
+        for name, counter_value in account.stats.get_window_rates_per_hour('1h')
+    ]
 
-        if int(current_time - stats_show_time) >= app_settings.show_stats_every_seconds:
-            stats_show_time = current_time
-            await stats.show_stats()
+    message = 'Stats {0}\n{1}\n{2}'.format(
+        account.name,
+        '\n'.join(counters),
+        '\n'.join(averages),
+    )
 
-    await stats.show_stats()
+    account.notifications.notify(message, Priority.LOW, key='stats')
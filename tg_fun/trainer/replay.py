@@ -0,0 +1,104 @@
+"""Replay of recorded events journal through the real handlers."""
+import argparse
+import asyncio
+import logging
+from typing import Iterable
+
+from tg_fun.account import AccountContext
+from tg_fun.sender import SendPipeline
+from tg_fun.settings import get_settings
+from tg_fun.simulator.bot import BotReply
+from tg_fun.simulator.client import ReplayClient, SimulatedEvent, SimulatedMessage
+from tg_fun.simulator.clock import AcceleratedEventLoop
+from tg_fun.trainer import farming
+from tg_fun.trainer.journal import JournalRecord, read_journal
+
+_actions_grace_seconds = 60
+_remembered_messages = 256
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Replay journal file."""
+    parser = argparse.ArgumentParser(description='Replay recorded events journal.')
+    parser.add_argument('path', help='events journal path')
+    parser.add_argument('--speed', type=float, default=10, help='time acceleration')
+    parser.add_argument('--account', default=None, help='replay events of one account only')
+    args = parser.parse_args(argv)
+    if args.account is None:
+        # events of different accounts would be mixed in one game state
+        account_names = _journal_accounts(args.path)
+        if len(account_names) > 1:
+            parser.error('journal holds several accounts, choose one of {0} with --account'.format(
+                ', '.join(sorted(account_names)),
+            ))
+
+    get_settings().fast_mode = True
+    with asyncio.Runner(loop_factory=lambda: AcceleratedEventLoop(args.speed)) as runner:
+        account = runner.run(replay(args.path, args.account))
+
+    logging.info('replay stats: %s', account.stats.get_counters())
+    logging.info('replay actions: %s', account.client.stats.most_common())
+
+
+async def replay(path: str, account_name: str | None = None) -> AccountContext:
+    """Feed journal events to the message handler keeping recorded intervals."""
+    client = ReplayClient()
+    account = AccountContext(session='replay', client=client, settings=get_settings())  # type: ignore
+    # recorded intervals already include the real send throttling
+    account.sender = SendPipeline(
+        client,  # type: ignore
+        account.stats,
+        account.entities,
+        buckets=[],
+        flood_wait_retries=0,
+    )
+    account.actions.start()
+
+    records = read_journal(path)
+    if account_name:
+        records = (record for record in records if record.account == account_name)
+    await _feed_events(account, client, records)
+
+    try:
+        await asyncio.wait_for(account.actions.wait_idle(), timeout=_actions_grace_seconds)
+    except TimeoutError:
+        logging.info('replay cancelled long running action')
+    account.energy.cancel()
+    account.actions.stop()
+    return account
+
+
+def _journal_accounts(path: str) -> set[str]:
+    return {record.account for record in read_journal(path)}
+
+
+async def _feed_events(account: AccountContext, client: ReplayClient, records: Iterable[JournalRecord]) -> None:
+    clock = asyncio.get_running_loop()
+    # loop time minus recorded time
+    offset: float | None = None
+    messages: dict[int, SimulatedMessage] = {}
+
+    for record in records:
+        if offset is None:
+            offset = clock.time() - record.received
+        delay = record.received + offset - clock.time()
+        await asyncio.sleep(max(0, delay))
+        await farming._message_handler(account, _make_event(client, record, messages))  # noqa: WPS437
+
+
+def _make_event(
+    client: ReplayClient,
+    record: JournalRecord,
+    messages: dict[int, SimulatedMessage],
+) -> SimulatedEvent:
+    reply = BotReply(record.message, record.buttons, inline=record.inline)
+    message = messages.get(record.message_id) if record.edited else None
+    if message:
+        message.update(reply)
+    else:
+        message = SimulatedMessage(client, record.message_id, reply)  # type: ignore
+        messages[record.message_id] = message
+        if len(messages) > _remembered_messages:
+            messages.pop(next(iter(messages)))
+    message.media = record.media  # type: ignore
+    return SimulatedEvent(message, edited=record.edited)
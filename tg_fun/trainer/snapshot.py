@@ -0,0 +1,146 @@
+"""Periodic snapshot of the account state for warm restarts."""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from tg_fun.account import AccountContext
+from tg_fun.game.buttons import is_inline_keyboard
+
+_version = 3
+
+
+class StoredButton:
+    """
+    Keyboard button of the stored message, pressed by its text.
+
+    The click is a message to the game itself, so it goes through the
+    account send pipeline and must not be wrapped by `SendPipeline.click`.
+    """
+
+    def __init__(self, account: AccountContext, text: str) -> None:
+        """Create button."""
+        self.text = text
+        self._account = account
+
+    async def click(self) -> None:
+        """Send button text like a user keyboard button does."""
+        await self._account.sender.send_message(self._account.settings.game_username, self.text)
+
+
+class StoredMessage:
+    """Last classified game message restored from the snapshot."""
+
+    def __init__(self, account: AccountContext, message: dict) -> None:
+        """Create message with the stored text and keyboard."""
+        self.id = message['id']  # noqa: WPS125
+        self.message = message['text']
+        self.media = None
+        self.buttons = None
+        if message['keyboard']:
+            self.buttons = [
+                [StoredButton(account, text) for text in row]
+                for row in message['keyboard']
+            ]
+
+
+class StoredEvent:
+    """Event of the stored message."""
+
+    def __init__(self, message: StoredMessage) -> None:
+        """Wrap message."""
+        self.message = message
+
+
+def path_for(account: AccountContext) -> str:
+    """Snapshot file of the account."""
+    return os.path.join(account.settings.snapshot_dir, f'{account.name}.json')
+
+
+def save(account: AccountContext) -> None:
+    """Write snapshot atomically, a crash never leaves a broken file."""
+    path = path_for(account)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    snapshot = {
+        'version': _version,
+        'saved_at': time.time(),
+        'entities': account.entities.dump(),
+        'state': account.last_state,
+        'message': _dump_message(account),
+        'buttons': account.buttons.dump(),
+        'energy': account.energy.dump(),
+        'stats': account.stats.dump(),
+    }
+
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as snapshot_file:
+        json.dump(snapshot, snapshot_file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temporary_path, path)
+
+
+def load(account: AccountContext) -> dict[str, Any] | None:
+    """Restore account state, return snapshot if it is fresh enough to resume."""
+    path = path_for(account)
+    try:
+        with open(path, encoding='utf-8') as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logging.warning('broken snapshot %s is ignored', path)
+        return None
+
+    if snapshot.get('version') != _version:
+        logging.info('snapshot %s of another version is ignored', path)
+        return None
+
+    account.stats.restore(snapshot['stats'])
+    account.energy.restore(snapshot['energy'])
+    account.entities.restore(snapshot['entities'])
+
+    age = time.time() - snapshot['saved_at']
+    if age > account.settings.snapshot_max_age_seconds:
+        logging.info('snapshot %s is %d seconds old, rediscover game state', path, age)
+        return None
+
+    account.buttons.restore(snapshot['buttons'])
+    account.last_state = snapshot['state']
+    logging.info('warm restart (%s) from state %s', account.name, account.last_state)
+    return snapshot
+
+
+def restored_event(account: AccountContext, snapshot: dict[str, Any]) -> StoredEvent | None:
+    """Event of the last classified message to resume from."""
+    message = snapshot['message']
+    if message is None or message['inline']:
+        # inline buttons can not be pressed without the original message
+        return None
+    return StoredEvent(StoredMessage(account, message))
+
+
+async def save_periodically(account: AccountContext) -> None:
+    """Save snapshot until cancelled."""
+    while True:
+        await asyncio.sleep(account.settings.snapshot_every_seconds)
+        try:
+            save(account)
+        except OSError:
+            logging.exception('snapshot is not saved (%s)', account.name)
+
+
+def _dump_message(account: AccountContext) -> dict[str, Any] | None:
+    if account.last_view is None:
+        return None
+
+    message = account.last_view.message
+    keyboard = None
+    if message.buttons:
+        keyboard = [[button.text for button in row] for row in message.buttons]
+    return {
+        'id': message.id,
+        'text': message.message,
+        'keyboard': keyboard,
+        'inline': is_inline_keyboard(message),
+    }
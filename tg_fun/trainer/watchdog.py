@@ -0,0 +1,137 @@
+"""Stalled conversation detection."""
+import asyncio
+import logging
+from collections import Counter, defaultdict
+
+from tg_fun.stats import StatsCollector
+
+_smoothing = 0.125
+_deviation_smoothing = 0.25
+_deviation_factor = 4
+
+
+class ResponseTimer:
+    """Smoothed response time and its deviation like TCP retransmission timer."""
+
+    def __init__(self, seconds: float) -> None:
+        """Start from the first response."""
+        self.seconds = seconds
+        self.deviation = seconds / 2
+
+    def observe(self, seconds: float) -> None:
+        """Update by the next response."""
+        self.deviation += _deviation_smoothing * (abs(seconds - self.seconds) - self.deviation)
+        self.seconds += _smoothing * (seconds - self.seconds)
+
+    @property
+    def timeout(self) -> float:
+        """Waiting longer than this is a stall."""
+        return self.seconds + _deviation_factor * self.deviation
+
+
+class StallWatchdog:  # noqa: WPS214
+    """
+    Detect that the game conversation is stuck.
+
+    Every handled event tells which action was taken. The watchdog learns
+    states that follow each action and how long the bot takes to answer,
+    a qualifying (classified) event must arrive within the learned timeout
+    after the account became idle. Each missed timeout raises the
+    escalation level until a qualifying event arrives. One timer is armed
+    for the deadline and every observation re-arms it.
+    """
+
+    def __init__(self, stats: StatsCollector, initial_timeout: float, min_timeout: float, max_timeout: float) -> None:
+        """Set up watchdog without learned response times."""
+        self.level = 0
+        self._stats = stats
+        self._initial_timeout = initial_timeout
+        self._min_timeout = min_timeout
+        self._max_timeout = max_timeout
+        self._timers: dict[str, ResponseTimer] = {}
+        self._next_states: defaultdict[str, Counter] = defaultdict(Counter)
+        self._last_action: str | None = None
+        self._progress_at = float(0)
+        self._stalled_since: float | None = None
+        self._changed = asyncio.Event()
+
+    @property
+    def last_action(self) -> str | None:
+        """Action taken for the last event."""
+        return self._last_action
+
+    def expected_states(self) -> list[str]:
+        """States seen after the last action, most common first."""
+        if self._last_action is None:
+            return []
+        return [next_state for next_state, _ in self._next_states[self._last_action].most_common()]
+
+    def timeout(self) -> float:
+        """Learned timeout of the last action."""
+        timer = self._timers.get(self._last_action or '')
+        if timer is None:
+            return self._initial_timeout
+        return min(max(timer.timeout, self._min_timeout), self._max_timeout)
+
+    def observe(self, state: str | None, action: str, idle_since: float | None) -> None:
+        """Learn handled event, events without known state are not a progress."""
+        now = _now()
+        if state is not None:
+            # responses after escalation are not learned, they answer our pings
+            if self._last_action is not None and not self.level:
+                self._next_states[self._last_action][state] += 1
+                if idle_since is not None:
+                    self._learn(self._last_action, now - max(idle_since, self._progress_at))
+            if self._stalled_since is not None:
+                stalled = now - self._stalled_since
+                logging.info('conversation is alive after %d seconds stall', stalled)
+                self._stats.inc_value('stall_seconds', round(stalled))
+            self._stalled_since = None
+            self.level = 0
+            self._progress_at = now
+        self._last_action = action
+        self._changed.set()
+
+    def progress(self) -> None:
+        """Account is busy or paused, nothing is expected meanwhile."""
+        self._progress_at = _now()
+        self._changed.set()
+
+    def deadline(self, idle_since: float) -> float:
+        """Get loop time when the missed response becomes a stall."""
+        return max(idle_since, self._progress_at) + self.timeout()
+
+    async def wait_deadline(self, idle_since: float | None) -> bool:
+        """Wait for the deadline or a change re-arming it, True when the deadline is missed."""
+        self._changed.clear()
+        deadline = None if idle_since is None else self.deadline(idle_since)
+        try:
+            async with asyncio.timeout_at(deadline):
+                await self._changed.wait()
+        except TimeoutError:
+            return True
+        return False
+
+    def check(self, idle_since: float) -> int:
+        """Raise and return escalation level after a missed timeout, 0 if nothing is missed."""
+        now = _now()
+        if now < self.deadline(idle_since):
+            return 0
+
+        if self._stalled_since is None:
+            self._stalled_since = max(idle_since, self._progress_at)
+            self._stats.inc_value('stalls')
+        self.level += 1
+        self._progress_at = now
+        return self.level
+
+    def _learn(self, action: str, seconds: float) -> None:
+        timer = self._timers.get(action)
+        if timer is None:
+            self._timers[action] = ResponseTimer(seconds)
+        else:
+            timer.observe(seconds)
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
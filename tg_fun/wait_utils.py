@@ -5,7 +5,8 @@ import enum
 import logging
 import random
 
-from tg_fun.settings import app_settings
+from tg_fun import tracing
+from tg_fun.settings import get_settings
 
 
 class WaitActions(enum.Enum):
@@ -18,8 +19,9 @@ class WaitActions(enum.Enum):
     COMMON = (1, 2, 9, 19)
 
 
-async def wait_for(timing: WaitActions = WaitActions.COMMON) -> None:
+async def wait_for(timing: WaitActions = WaitActions.COMMON) -> None:  # noqa: WPS210
     """Let wait like human."""
+    app_settings = get_settings()
     if app_settings.fast_mode:
         return
 
@@ -29,4 +31,5 @@ async def wait_for(timing: WaitActions = WaitActions.COMMON) -> None:
     else:
         sleep_time = random.randint(min_seconds, max_seconds)
     logging.debug('wait like human %d seconds before action', sleep_time)
-    await asyncio.sleep(sleep_time)
+    with tracing.span('human_delay', delay=True):
+        await asyncio.sleep(sleep_time)